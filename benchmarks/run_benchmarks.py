@@ -0,0 +1,313 @@
+#!/usr/bin/env python3
+"""
+Benchmarks de latence et de débit de l'API et du modèle.
+
+Exemples :
+    python benchmarks/run_benchmarks.py --output bench.json
+    python benchmarks/run_benchmarks.py --baseline bench.json --max-regression 0.2
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import socket
+import subprocess
+import sys
+import time
+from datetime import datetime
+
+import httpx
+import joblib
+import numpy as np
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src")
+
+
+def random_houses(n, seed=0):
+    rng = np.random.default_rng(seed)
+    return [
+        {
+            "surface": float(rng.uniform(20, 500)),
+            "rooms": int(rng.integers(1, 16)),
+            "age": float(rng.uniform(0, 100)),
+            "location_score": float(rng.uniform(1, 10)),
+            "garage": bool(rng.integers(0, 2)),
+        }
+        for _ in range(n)
+    ]
+
+
+def summarize(latencies, elapsed, rows_per_call=1):
+    latencies = np.asarray(latencies)
+    return {
+        "calls": len(latencies),
+        "p50_ms": float(np.percentile(latencies, 50) * 1000),
+        "p95_ms": float(np.percentile(latencies, 95) * 1000),
+        "p99_ms": float(np.percentile(latencies, 99) * 1000),
+        "mean_ms": float(latencies.mean() * 1000),
+        "requests_per_second": len(latencies) / elapsed,
+        "rows_per_second": len(latencies) * rows_per_call / elapsed,
+    }
+
+
+async def drive(client, path, payloads, concurrency, warmup=5):
+    """
+    Envoie chaque corps de `payloads` avec au plus `concurrency` requêtes en
+    vol ; les `warmup` premiers ne sont pas mesurés. Des corps tous
+    différents évitent de ne mesurer que le cache de prédictions.
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+
+    async def one(payload):
+        async with semaphore:
+            start = time.perf_counter()
+            response = await client.post(path, json=payload)
+            latencies.append(time.perf_counter() - start)
+            response.raise_for_status()
+
+    # Échauffement hors mesure
+    for payload in payloads[:warmup]:
+        (await client.post(path, json=payload)).raise_for_status()
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(payload) for payload in payloads[warmup:]))
+    return latencies, time.perf_counter() - start
+
+
+async def bench_http(client, args):
+    results = {}
+    latencies, elapsed = await drive(
+        client, "/predict", random_houses(args.requests + 5), args.concurrency
+    )
+    results["predict"] = summarize(latencies, elapsed)
+
+    for batch_size in args.batch_sizes:
+        n_requests = max(5, args.requests // max(1, batch_size // 10))
+        payloads = [
+            random_houses(batch_size, seed=seed) for seed in range(n_requests + 5)
+        ]
+        latencies, elapsed = await drive(
+            client, "/predict/batch", payloads, args.concurrency
+        )
+        results[f"predict_batch_{batch_size}"] = summarize(
+            latencies, elapsed, batch_size
+        )
+    return results
+
+
+async def bench_asgi(args):
+    """
+    Application FastAPI pilotée en mémoire, sans réseau
+    """
+    import main
+
+    await main.startup_event()
+    try:
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(
+            transport=transport, base_url="http://bench"
+        ) as client:
+            return await bench_http(client, args)
+    finally:
+        await main.shutdown_event()
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+async def bench_uvicorn(args):
+    """
+    Serveur uvicorn réel dans un sous-processus
+    """
+    port = free_port()
+    server = subprocess.Popen(
+        [
+            sys.executable,
+            "-m",
+            "uvicorn",
+            "main:app",
+            "--host",
+            "127.0.0.1",
+            "--port",
+            str(port),
+            "--log-level",
+            "warning",
+        ],
+        cwd=SRC_DIR,
+    )
+    base_url = f"http://127.0.0.1:{port}"
+    try:
+        async with httpx.AsyncClient(base_url=base_url, timeout=30) as client:
+            for _ in range(100):
+                try:
+                    if (await client.get("/health")).status_code == 200:
+                        break
+                except httpx.TransportError:
+                    pass
+                await asyncio.sleep(0.1)
+            else:
+                raise RuntimeError("Le serveur uvicorn n'a pas démarré")
+            return await bench_http(client, args)
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def bench_model(args):
+    """
+    Appel direct au modèle scikit-learn comparé au chemin de service
+    """
+    import main
+
+    main.load_model()
+    raw_info = joblib.load(main.MODEL_PATH)
+    model, scaler = raw_info["model"], raw_info["scaler"]
+
+    results = {}
+    for batch_size in [1] + list(args.batch_sizes):
+        X = main.features_to_matrix(
+            [main.HousingFeatures(**house) for house in random_houses(batch_size)]
+        )
+        n_calls = max(5, args.requests // max(1, batch_size // 10))
+        for name, fn in (
+            ("sklearn_predict", lambda: model.predict(scaler.transform(X))),
+            ("serving_predict", lambda: main.predict_matrix(X)),
+        ):
+            fn()
+            latencies = []
+            start = time.perf_counter()
+            for _ in range(n_calls):
+                call_start = time.perf_counter()
+                fn()
+                latencies.append(time.perf_counter() - call_start)
+            results[f"{name}_{batch_size}"] = summarize(
+                latencies, time.perf_counter() - start, batch_size
+            )
+    return results
+
+
+def compare(results, baseline, max_regression):
+    """
+    Liste des benchmarks dont le p99 dépasse celui de la référence de plus
+    de max_regression (0.2 = +20 %)
+    """
+    regressions = []
+    for suite, benchmarks in results.items():
+        for name, current in benchmarks.items():
+            previous = baseline.get("results", {}).get(suite, {}).get(name)
+            if previous is None:
+                continue
+            ratio = current["p99_ms"] / previous["p99_ms"]
+            if ratio > 1 + max_regression:
+                regressions.append((f"{suite}/{name}", previous["p99_ms"], ratio))
+    return regressions
+
+
+def print_results(results):
+    for suite, benchmarks in results.items():
+        print(f"\n[{suite}]")
+        print(
+            f"{'benchmark':<28}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'req/s':>12}"
+        )
+        for name, r in benchmarks.items():
+            print(
+                f"{name:<28}{r['p50_ms']:>10.3f}{r['p95_ms']:>10.3f}"
+                f"{r['p99_ms']:>10.3f}{r['requests_per_second']:>12.1f}"
+            )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmarks de l'API Housing")
+    parser.add_argument(
+        "--suites",
+        default="model,asgi,uvicorn",
+        help="Suites à lancer parmi model, asgi, uvicorn",
+    )
+    parser.add_argument("--requests", type=int, default=300)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument(
+        "--batch-sizes",
+        type=lambda value: [int(v) for v in value.split(",")],
+        default=[10, 100, 1000],
+    )
+    parser.add_argument("--output", help="Fichier JSON des résultats")
+    parser.add_argument("--baseline", help="Résultats JSON de référence")
+    parser.add_argument("--max-regression", type=float, default=0.2)
+    parser.add_argument(
+        "--cache",
+        default="none",
+        help="CACHE_BACKEND de l'API mesurée (none par défaut : on mesure "
+        "l'inférence, pas le cache)",
+    )
+    args = parser.parse_args()
+    # Avant l'import de main : l'API lit sa configuration à l'import, et le
+    # serveur uvicorn hérite de l'environnement
+    os.environ["CACHE_BACKEND"] = args.cache
+
+    output = os.path.abspath(args.output) if args.output else None
+    baseline_path = os.path.abspath(args.baseline) if args.baseline else None
+
+    # Les chemins du modèle sont relatifs à src/, comme pour l'API
+    sys.path.insert(0, SRC_DIR)
+    os.chdir(SRC_DIR)
+
+    import main as api
+
+    suites = args.suites.split(",")
+    results = {}
+    if "model" in suites:
+        results["model"] = bench_model(args)
+    if "asgi" in suites:
+        results["asgi"] = asyncio.run(bench_asgi(args))
+    if "uvicorn" in suites:
+        results["uvicorn"] = asyncio.run(bench_uvicorn(args))
+
+    print_results(results)
+
+    report = {
+        "metadata": {
+            "timestamp": datetime.now().isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+            "serving": {
+                "cache_backend": api.CACHE_BACKEND,
+                "micro_batching": api.MICRO_BATCHING,
+                "micro_batch_max_size": api.MICRO_BATCH_MAX_SIZE,
+                "micro_batch_max_wait_ms": api.MICRO_BATCH_MAX_WAIT_MS,
+                "inference_mode": api.INFERENCE_MODE,
+                "inference_engine": api.INFERENCE_ENGINE,
+                "engine_dtype": api.ENGINE_DTYPE,
+            },
+        },
+        "results": results,
+    }
+    if output:
+        with open(output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"\nRésultats sauvegardés dans '{output}'")
+
+    if baseline_path:
+        with open(baseline_path) as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.max_regression)
+        for name, previous_p99, ratio in regressions:
+            print(
+                f"❌ Régression {name}: p99 x{ratio:.2f} "
+                f"(référence {previous_p99:.3f} ms)"
+            )
+        if regressions:
+            sys.exit(1)
+        print("Aucune régression au-delà du seuil")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,164 @@
+import asyncio
+import math
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+
+# Motifs de rejet : file pleine à l'arrivée (429), attente trop longue dans la
+# file ou échéance du client dépassée avant le modèle (503)
+REJECTION_STATUS = {"queue_full": 429, "queue_timeout": 503, "deadline": 503}
+
+
+class AdmissionRejected(Exception):
+    def __init__(self, reason, retry_after):
+        super().__init__(reason)
+        self.reason = reason
+        self.status_code = REJECTION_STATUS[reason]
+        self.retry_after = retry_after
+
+
+class AdmissionController:
+    """
+    Contrôle d'admission devant le modèle, pondéré par le nombre de lignes :
+    au plus max_rows lignes en cours de prédiction, au plus max_queue_rows
+    lignes en attente (FIFO) ; au-delà la requête est rejetée aussitôt.
+    Une requête n'attend pas plus de queue_timeout_ms ni au-delà de son
+    échéance : le travail déjà en retard n'atteint jamais le modèle.
+    """
+
+    def __init__(self, max_rows=20_000, max_queue_rows=100_000, queue_timeout_ms=2000):
+        self.max_rows = max_rows
+        self.max_queue_rows = max_queue_rows
+        self.queue_timeout = queue_timeout_ms / 1000
+        self._waiters = deque()
+        self.in_flight_rows = 0
+        self.queued_rows = 0
+        self.max_queued_rows = 0
+        # Durée de service par ligne (moyenne mobile), pour Retry-After
+        self._seconds_per_row = None
+        self.admitted = 0
+        self.rejected = {reason: 0 for reason in REJECTION_STATUS}
+
+    @property
+    def saturated(self):
+        """
+        Même une requête d'une ligne serait rejetée par admit() : pas de
+        capacité libre tout de suite ni de place dans la file
+        """
+        return not (self._can_run(1) or self._can_queue(1))
+
+    def _can_run(self, weight):
+        return not self._waiters and self.in_flight_rows + weight <= self.max_rows
+
+    def _can_queue(self, weight):
+        return self.queued_rows + weight <= self.max_queue_rows
+
+    def retry_after(self):
+        """
+        Secondes estimées pour écouler le travail en cours et en attente
+        """
+        if self._seconds_per_row is None:
+            return 1
+        backlog = (self.in_flight_rows + self.queued_rows) * self._seconds_per_row
+        return min(60, max(1, math.ceil(backlog)))
+
+    def reject(self, reason):
+        self.rejected[reason] += 1
+        raise AdmissionRejected(reason, self.retry_after())
+
+    @asynccontextmanager
+    async def admit(self, rows, deadline=None):
+        """
+        Réserve `rows` lignes de capacité le temps du bloc ; `deadline` est
+        une échéance time.perf_counter(). Lève AdmissionRejected.
+        """
+        # Un lot plus grand que la capacité passe seul
+        weight = min(max(rows, 1), self.max_rows)
+        now = time.perf_counter()
+        if deadline is not None and now >= deadline:
+            self.reject("deadline")
+
+        if self._can_run(weight):
+            self.in_flight_rows += weight
+        else:
+            if not self._can_queue(weight):
+                self.reject("queue_full")
+            await self._wait(weight, now, deadline)
+
+        self.admitted += 1
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._release(weight, time.perf_counter() - start)
+
+    async def _wait(self, weight, now, deadline):
+        future = asyncio.get_running_loop().create_future()
+        waiter = (weight, future)
+        self._waiters.append(waiter)
+        self.queued_rows += weight
+        self.max_queued_rows = max(self.max_queued_rows, self.queued_rows)
+
+        timeout = self.queue_timeout
+        if deadline is not None:
+            timeout = min(timeout, deadline - now)
+        try:
+            await asyncio.wait({future}, timeout=timeout)
+        except asyncio.CancelledError:
+            self._abandon(waiter)
+            raise
+        if not future.done():
+            self._abandon(waiter)
+            expired = deadline is not None and time.perf_counter() >= deadline
+            self.reject("deadline" if expired else "queue_timeout")
+
+        if deadline is not None and time.perf_counter() >= deadline:
+            self._release(weight, None)
+            self.reject("deadline")
+
+    def _abandon(self, waiter):
+        weight, future = waiter
+        if future.done():
+            # Place attribuée juste avant l'annulation : elle est rendue
+            self._release(weight, None)
+            return
+        future.cancel()
+        self._waiters.remove(waiter)
+        self.queued_rows -= weight
+        self._wake()
+
+    def _wake(self):
+        while self._waiters:
+            weight, future = self._waiters[0]
+            if self.in_flight_rows + weight > self.max_rows:
+                break
+            self._waiters.popleft()
+            self.queued_rows -= weight
+            self.in_flight_rows += weight
+            future.set_result(None)
+
+    def _release(self, weight, seconds):
+        self.in_flight_rows -= weight
+        if seconds is not None:
+            per_row = seconds / weight
+            if self._seconds_per_row is None:
+                self._seconds_per_row = per_row
+            else:
+                self._seconds_per_row += 0.1 * (per_row - self._seconds_per_row)
+        self._wake()
+
+    def stats(self):
+        return {
+            "in_flight_rows": self.in_flight_rows,
+            "queued_rows": self.queued_rows,
+            "queued_requests": len(self._waiters),
+            "max_queued_rows": self.max_queued_rows,
+            "admitted": self.admitted,
+            "rejected": dict(self.rejected),
+            "retry_after_seconds": self.retry_after(),
+            "config": {
+                "max_rows": self.max_rows,
+                "max_queue_rows": self.max_queue_rows,
+                "queue_timeout_ms": self.queue_timeout * 1000,
+            },
+        }
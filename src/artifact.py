@@ -0,0 +1,81 @@
+import json
+import os
+import shutil
+
+import numpy as np
+
+from forest_engine import CompiledForest
+
+METADATA_FILE = "metadata.json"
+
+
+def save_mmap_artifact(serving_info, directory):
+    """
+    Écrit le moteur d'un artefact de service sous forme de fichiers .npy bruts
+    (en-tête aligné sur 64 octets) plus un petit fichier de métadonnées.
+
+    Le répertoire est construit à côté puis renommé, pour qu'un lecteur ne
+    voie jamais un artefact à moitié écrit.
+    """
+    if serving_info.get("scaler") is not None:
+        raise ValueError("L'artefact mmap attend un modèle sans scaler (replié)")
+
+    engine = serving_info["engine"]
+    directory = os.path.abspath(directory)
+    staging = directory + ".tmp"
+    shutil.rmtree(staging, ignore_errors=True)
+    os.makedirs(staging)
+
+    for name, array in engine.arrays().items():
+        np.save(os.path.join(staging, f"{name}.npy"), np.ascontiguousarray(array))
+
+    metadata = {
+        key: value
+        for key, value in serving_info.items()
+        if key not in ("engine", "scaler", "model")
+    }
+    metadata["engine"] = {
+        "max_depth": int(engine.max_depth),
+        "dtype": engine.dtype.name,
+        "input_dtype": engine.input_dtype.name,
+    }
+    with open(os.path.join(staging, METADATA_FILE), "w") as f:
+        json.dump(metadata, f, indent=2, default=float)
+
+    previous = directory + ".old"
+    shutil.rmtree(previous, ignore_errors=True)
+    if os.path.exists(directory):
+        os.rename(directory, previous)
+    os.rename(staging, directory)
+    shutil.rmtree(previous, ignore_errors=True)
+    return directory
+
+
+def load_mmap_artifact(directory):
+    """
+    Charge un artefact écrit par save_mmap_artifact. Les tableaux de noeuds
+    sont projetés en lecture seule (mmap) : tous les workers partagent les
+    mêmes pages du cache système au lieu d'en garder chacun une copie.
+    """
+    with open(os.path.join(directory, METADATA_FILE)) as f:
+        metadata = json.load(f)
+
+    engine_metadata = metadata.pop("engine")
+    arrays = {
+        name: np.load(os.path.join(directory, f"{name}.npy"), mmap_mode="r")
+        for name in ("feature", "threshold", "left", "right", "children", "value")
+    }
+    arrays["roots"] = np.load(os.path.join(directory, "roots.npy"))
+
+    metadata["engine"] = CompiledForest(
+        **arrays,
+        max_depth=engine_metadata["max_depth"],
+        dtype=engine_metadata["dtype"],
+        input_dtype=engine_metadata["input_dtype"],
+    )
+    metadata["scaler"] = None
+    return metadata
+
+
+def is_mmap_artifact(path):
+    return os.path.isfile(os.path.join(path, METADATA_FILE))
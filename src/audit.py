@@ -0,0 +1,238 @@
+import asyncio
+import logging
+import os
+import random
+import time
+import uuid
+from datetime import datetime
+
+import numpy as np
+
+from serialization import dumps
+
+logger = logging.getLogger(__name__)
+
+AUDIT_FORMATS = ("parquet", "ndjson")
+AUDIT_COLUMNS = ("predicted_price", "lower", "upper", "latency_ms", "timestamp")
+
+
+class AuditLog:
+    """
+    Journal d'audit des prédictions (features, prix, intervalle, version du
+    modèle, latence), pour l'analyse hors ligne.
+
+    record() ne fait que copier les lignes dans des tableaux préalloués, sur
+    la boucle asyncio : ni verrou ni entrée/sortie. Quand le tampon est
+    plein, les nouvelles lignes sont abandonnées (et comptées) plutôt que de
+    ralentir les requêtes. Une tâche de fond vide le tampon toutes les
+    flush_interval secondes (ou dès qu'il est à moitié plein) et écrit les
+    lignes en un seul bloc dans un fichier Parquet ou NDJSON, hors de la
+    boucle.
+    """
+
+    def __init__(
+        self,
+        directory,
+        feature_names,
+        capacity=100_000,
+        sample_rate=1.0,
+        flush_interval=30.0,
+        file_format="parquet",
+        max_files=1000,
+    ):
+        if file_format not in AUDIT_FORMATS:
+            raise ValueError(f"Format d'audit inconnu: {file_format}")
+        if file_format == "parquet":
+            try:
+                import pyarrow.parquet  # noqa: F401
+            except ImportError:
+                logger.warning("pyarrow absent : journal d'audit en NDJSON")
+                file_format = "ndjson"
+        self.directory = directory
+        self.feature_names = list(feature_names)
+        self.capacity = capacity
+        self.sample_rate = sample_rate
+        self.flush_interval = flush_interval
+        self.file_format = file_format
+        self.max_files = max_files
+        self._features = np.empty((capacity, len(self.feature_names)))
+        self._values = np.empty((capacity, len(AUDIT_COLUMNS)))
+        self._labels = np.empty((capacity, 2), dtype=object)
+        self._size = 0
+        self._rng = np.random.default_rng()
+        self._wakeup = None
+        self._worker = None
+        self._sequence = 0
+        # Plusieurs workers uvicorn partagent le répertoire : chaque journal
+        # a son identifiant dans le nom des fichiers
+        self._writer_id = uuid.uuid4().hex[:12]
+        self.recorded = 0
+        self.dropped = 0
+        self.written = 0
+        self.files = 0
+        self.write_errors = 0
+
+    @property
+    def running(self):
+        return self._worker is not None and not self._worker.done()
+
+    def record(self, feature_matrix, predictions, model_version, latency, endpoint):
+        """
+        Ajoute au tampon les lignes prédites (échantillonnées) ; latence en
+        secondes pour l'ensemble de l'appel
+        """
+        n_rows = len(feature_matrix)
+        if not n_rows or self.sample_rate <= 0:
+            return
+        rows = None
+        if self.sample_rate < 1:
+            if n_rows == 1:
+                if random.random() >= self.sample_rate:
+                    return
+            else:
+                rows = np.flatnonzero(self._rng.random(n_rows) < self.sample_rate)
+                n_rows = len(rows)
+
+        start = self._size
+        kept = min(n_rows, self.capacity - start)
+        self.dropped += n_rows - kept
+        if not kept:
+            return
+        if rows is not None:
+            rows = rows[:kept]
+        else:
+            rows = slice(0, kept)
+
+        end = start + kept
+        self._features[start:end] = feature_matrix[rows]
+        values = self._values[start:end]
+        for j, column in enumerate(predictions):
+            values[:, j] = np.asarray(column)[rows]
+        values[:, 3] = latency * 1000
+        values[:, 4] = time.time()
+        self._labels[start:end] = (model_version, endpoint)
+        self._size = end
+        self.recorded += kept
+
+        if self._wakeup is not None and end >= self.capacity // 2:
+            self._wakeup.set()
+
+    def drain(self):
+        """
+        Lignes en attente, en colonnes ; le tampon repart à vide
+        """
+        size = self._size
+        columns = {
+            name: self._features[:size, j].copy()
+            for j, name in enumerate(self.feature_names)
+        }
+        for j, name in enumerate(AUDIT_COLUMNS):
+            columns[name] = self._values[:size, j].copy()
+        columns["model_version"] = self._labels[:size, 0].tolist()
+        columns["endpoint"] = self._labels[:size, 1].tolist()
+        self._labels[:size] = None
+        self._size = 0
+        return columns
+
+    def write(self, columns):
+        """
+        Écrit un bloc de lignes dans un nouveau fichier, puis supprime les
+        plus anciens au-delà de max_files
+        """
+        os.makedirs(self.directory, exist_ok=True)
+        self._sequence += 1
+        stem = (
+            f"predictions-{datetime.now():%Y%m%d-%H%M%S}-{self._writer_id}-"
+            f"{self._sequence:06d}"
+        )
+        if self.file_format == "parquet":
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+
+            path = os.path.join(self.directory, f"{stem}.parquet")
+            pq.write_table(pa.table(columns), path)
+        else:
+            path = os.path.join(self.directory, f"{stem}.ndjson")
+            names = list(columns)
+            rows = zip(*(np.asarray(columns[name]).tolist() for name in names))
+            with open(path, "wb") as f:
+                for values in rows:
+                    f.write(dumps(dict(zip(names, values))) + b"\n")
+        self.written += len(columns["timestamp"])
+        self.files += 1
+        self._rotate()
+        return path
+
+    def _rotate(self):
+        """
+        Rotation partagée : max_files borne tout le répertoire, fichiers des
+        autres workers compris (les plus anciens d'abord, par date dans le nom)
+        """
+        if not self.max_files:
+            return
+        names = sorted(
+            name
+            for name in os.listdir(self.directory)
+            if name.startswith("predictions-")
+        )
+        for name in names[: -self.max_files]:
+            try:
+                os.remove(os.path.join(self.directory, name))
+            except FileNotFoundError:
+                # Déjà supprimé par la rotation d'un autre worker
+                pass
+
+    async def flush(self):
+        if not self._size:
+            return None
+        columns = self.drain()
+        try:
+            return await asyncio.to_thread(self.write, columns)
+        except Exception as e:
+            self.write_errors += 1
+            self.dropped += len(columns["timestamp"])
+            logger.error(f"❌ Écriture du journal d'audit impossible: {e}")
+            return None
+
+    async def start(self):
+        if self.running:
+            return
+        self._wakeup = asyncio.Event()
+        self._worker = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """
+        Arrête la tâche de fond et écrit les lignes restantes
+        """
+        if self.running:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+        self._worker = None
+        self._wakeup = None
+        await self.flush()
+
+    async def _run(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            await self.flush()
+
+    def stats(self):
+        return {
+            "format": self.file_format,
+            "directory": self.directory,
+            "sample_rate": self.sample_rate,
+            "capacity": self.capacity,
+            "pending": self._size,
+            "recorded": self.recorded,
+            "dropped": self.dropped,
+            "written": self.written,
+            "files": self.files,
+            "write_errors": self.write_errors,
+        }
@@ -0,0 +1,160 @@
+import asyncio
+import inspect
+import logging
+import time
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+class MicroBatcher:
+    """
+    Regroupe les appels /predict concurrents en un seul appel vectorisé.
+
+    Un lot part dès qu'il atteint max_batch_size lignes ou que max_wait_ms
+    est écoulé. L'attente est adaptative : quand le service est au repos
+    (dernier lot d'une seule ligne et file vide), la requête part aussitôt
+    sans payer le délai.
+
+    predict_fn peut être synchrone ou une coroutine (exécuteur d'inférence) ;
+    dans ce cas plusieurs lots peuvent être en vol en même temps.
+    """
+
+    def __init__(self, predict_fn, max_batch_size=64, max_wait_ms=2.0):
+        self.predict_fn = predict_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self._queue = None
+        self._worker = None
+        self._in_flight = set()
+        self._collecting = []
+        self._last_batch_size = 0
+        self.batches = 0
+        self.rows = 0
+        self.max_batch_seen = 0
+        self.batch_size_histogram = {}
+
+    @property
+    def running(self):
+        return self._worker is not None and not self._worker.done()
+
+    async def start(self):
+        if self.running:
+            return
+        self._queue = asyncio.Queue()
+        self._worker = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """
+        Arrête la collecte puis vide la file : les lignes en attente sont
+        prédites et les lots en vol terminent, aucun appelant ne reste bloqué
+        """
+        if not self.running:
+            return
+        self._worker.cancel()
+        try:
+            await self._worker
+        except asyncio.CancelledError:
+            pass
+        self._worker = None
+
+        pending, self._collecting = self._collecting, []
+        while not self._queue.empty():
+            pending.append(self._queue.get_nowait())
+        self._queue = None
+        for start in range(0, len(pending), self.max_batch_size):
+            await self._dispatch(pending[start : start + self.max_batch_size])
+        if self._in_flight:
+            await asyncio.gather(*self._in_flight, return_exceptions=True)
+
+    async def submit(self, row):
+        """
+        Ajoute une ligne de features à la file et attend son résultat
+        (prix, borne basse, borne haute)
+        """
+        if self._queue is None:
+            raise RuntimeError("Micro-batcher arrêté")
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((row, future))
+        return await future
+
+    async def _collect(self):
+        # Lignes retirées de la file mais pas encore envoyées : stop() les
+        # retrouve si la collecte est interrompue
+        self._collecting = batch = [await self._queue.get()]
+        await self._fill(batch)
+        # Quel que soit le chemin, le lot rendu part en vol : stop() ne doit
+        # plus l'envoyer
+        self._collecting = []
+        return batch
+
+    async def _fill(self, batch):
+        while len(batch) < self.max_batch_size and not self._queue.empty():
+            batch.append(self._queue.get_nowait())
+
+        if len(batch) == 1 and self._last_batch_size <= 1:
+            return
+
+        deadline = time.perf_counter() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+            except asyncio.TimeoutError:
+                break
+
+    async def _run(self):
+        while True:
+            batch = await self._collect()
+            self._record(len(batch))
+            task = asyncio.create_task(self._dispatch(batch))
+            self._in_flight.add(task)
+            task.add_done_callback(self._in_flight.discard)
+
+    async def _dispatch(self, batch):
+        try:
+            result = self.predict_fn(np.vstack([row for row, _ in batch]))
+            if inspect.isawaitable(result):
+                result = await result
+            predicted, lower, upper = result
+        except Exception as e:
+            logger.error(f"❌ Erreur lors du lot de {len(batch)} prédictions: {e}")
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for i, (_, future) in enumerate(batch):
+            if not future.done():
+                future.set_result(
+                    (float(predicted[i]), float(lower[i]), float(upper[i]))
+                )
+
+    def _record(self, batch_size):
+        self._last_batch_size = batch_size
+        self.batches += 1
+        self.rows += batch_size
+        self.max_batch_seen = max(self.max_batch_seen, batch_size)
+        bucket = 1 << (batch_size - 1).bit_length()
+        self.batch_size_histogram[bucket] = self.batch_size_histogram.get(bucket, 0) + 1
+
+    def stats(self):
+        return {
+            "queue_depth": self._queue.qsize() if self._queue is not None else 0,
+            "batches_in_flight": len(self._in_flight),
+            "batches": self.batches,
+            "rows": self.rows,
+            "mean_batch_size": self.rows / self.batches if self.batches else 0.0,
+            "max_batch_size": self.max_batch_seen,
+            "batch_size_histogram": {
+                str(size): count
+                for size, count in sorted(self.batch_size_histogram.items())
+            },
+            "config": {
+                "max_batch_size": self.max_batch_size,
+                "max_wait_ms": self.max_wait * 1000,
+            },
+        }
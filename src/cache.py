@@ -0,0 +1,196 @@
+import logging
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+class LocalCacheBackend:
+    """
+    Cache en mémoire du processus, LRU borné avec expiration (TTL)
+    """
+
+    name = "local"
+
+    def __init__(self, max_size=100_000, ttl_seconds=3600):
+        self.max_size = max_size
+        self.ttl = ttl_seconds
+        self._entries = OrderedDict()
+
+    def __len__(self):
+        return len(self._entries)
+
+    async def get_many(self, keys):
+        now = time.monotonic()
+        values = []
+        for key in keys:
+            entry = self._entries.get(key)
+            if entry is None:
+                values.append(None)
+            elif entry[0] < now:
+                del self._entries[key]
+                values.append(None)
+            else:
+                self._entries.move_to_end(key)
+                values.append(entry[1])
+        return values
+
+    async def set_many(self, items):
+        expires_at = time.monotonic() + self.ttl
+        for key, value in items.items():
+            self._entries[key] = (expires_at, value)
+            self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    async def close(self):
+        self._entries.clear()
+
+
+class RedisCacheBackend:
+    """
+    Cache partagé entre workers et conteneurs via le service `redis` de
+    docker-compose. Le client doit suivre l'API de redis.asyncio.
+    """
+
+    name = "redis"
+
+    def __init__(self, client, ttl_seconds=3600, prefix="housing:prediction:"):
+        self.client = client
+        self.ttl = ttl_seconds
+        self.prefix = prefix
+
+    @classmethod
+    def from_url(cls, url, **kwargs):
+        try:
+            import redis.asyncio as redis
+        except ImportError as e:
+            raise ImportError(
+                "Le backend de cache redis nécessite le paquet 'redis'"
+            ) from e
+        return cls(redis.from_url(url), **kwargs)
+
+    async def get_many(self, keys):
+        # MGET sans clé est une erreur de syntaxe côté Redis
+        if not keys:
+            return []
+        raw_values = await self.client.mget([self.prefix + key for key in keys])
+        return [_decode(raw) for raw in raw_values]
+
+    async def set_many(self, items):
+        if not items:
+            return
+        pipeline = self.client.pipeline(transaction=False)
+        for key, value in items.items():
+            pipeline.set(self.prefix + key, _encode(value), ex=self.ttl)
+        await pipeline.execute()
+
+    async def close(self):
+        await self.client.aclose()
+
+
+def _encode(value):
+    return ",".join(repr(float(v)) for v in value)
+
+
+def _decode(raw):
+    if raw is None:
+        return None
+    if isinstance(raw, bytes):
+        raw = raw.decode()
+    return tuple(float(v) for v in raw.split(","))
+
+
+class PredictionCache:
+    """
+    Cache de prédictions indexé par le tuple de features normalisé, et
+    cloisonné par version de modèle.
+
+    Avec `rounding`, les features flottantes sont arrondies à ce nombre de
+    décimales avant la clé *et* avant la prédiction, pour qu'une même clé
+    corresponde toujours au même résultat.
+    """
+
+    def __init__(self, backend, rounding=None):
+        self.backend = backend
+        self.rounding = rounding
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+
+    def normalize(self, feature_matrix):
+        feature_matrix = np.asarray(feature_matrix, dtype=np.float64)
+        if self.rounding is not None:
+            feature_matrix = np.round(feature_matrix, self.rounding)
+        return feature_matrix
+
+    def keys(self, feature_matrix, scope):
+        return [
+            f"{scope}:{','.join(repr(value) for value in row)}"
+            for row in feature_matrix.tolist()
+        ]
+
+    async def predict(self, feature_matrix, scope, compute):
+        """
+        Renvoie (prix, borne basse, borne haute) pour toutes les lignes :
+        le cache est interrogé en une fois et seules les lignes absentes sont
+        transmises à `compute`
+        """
+        feature_matrix = self.normalize(feature_matrix)
+        keys = self.keys(feature_matrix, scope)
+        results = np.empty((len(keys), 3))
+
+        try:
+            cached = await self.backend.get_many(keys)
+        except Exception as e:
+            self.errors += 1
+            logger.warning(f"Cache indisponible ({self.backend.name}): {e}")
+            cached = [None] * len(keys)
+
+        missing = np.array([value is None for value in cached], dtype=bool)
+        for i, value in enumerate(cached):
+            if value is not None:
+                results[i] = value
+
+        n_missing = int(missing.sum())
+        self.hits += len(keys) - n_missing
+        self.misses += n_missing
+
+        if n_missing:
+            computed = np.column_stack(await compute(feature_matrix[missing]))
+            results[missing] = computed
+            missing_keys = [key for key, miss in zip(keys, missing) if miss]
+            try:
+                await self.backend.set_many(
+                    dict(zip(missing_keys, map(tuple, computed.tolist())))
+                )
+            except Exception as e:
+                self.errors += 1
+                logger.warning(f"Écriture cache impossible ({self.backend.name}): {e}")
+
+        return results[:, 0], results[:, 1], results[:, 2]
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "backend": self.backend.name,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+            "errors": self.errors,
+            "rounding": self.rounding,
+        }
+
+
+def create_prediction_cache(backend, max_size, ttl_seconds, rounding, redis_url):
+    if backend == "none":
+        return None
+    if backend == "local":
+        return PredictionCache(LocalCacheBackend(max_size, ttl_seconds), rounding)
+    if backend == "redis":
+        return PredictionCache(
+            RedisCacheBackend.from_url(redis_url, ttl_seconds=ttl_seconds), rounding
+        )
+    raise ValueError(f"Backend de cache inconnu: {backend}")
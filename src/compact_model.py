@@ -0,0 +1,311 @@
+import argparse
+import copy
+import os
+import pickle
+from datetime import datetime
+
+import joblib
+import numpy as np
+from sklearn.ensemble import RandomForestRegressor
+from sklearn.metrics import mean_absolute_error, mean_squared_error, r2_score
+
+from export_model import (
+    MODEL_PATH,
+    export_serving_model,
+    remove_serving_artifacts,
+)
+from inference import (
+    calibrate_interval,
+    compile_model,
+    interval_coverage,
+    predict_with_bounds,
+)
+from train_model import (
+    DATA_PATH,
+    PARITY_SAMPLE_SIZE,
+    build_model,
+    load_dataset,
+    split_calibration,
+    split_dataset,
+)
+from tuning import measure_latency
+
+TEACHER_PATH = "../models/housing_model_teacher.joblib"
+METHODS = ("select", "distill")
+# Lignes du jeu d'entraînement utilisées pour la sélection gloutonne des arbres
+SELECTION_SAMPLE_SIZE = 50_000
+
+
+def select_trees(per_tree, y, max_trees=None, tolerance=0.01, in_bag=None):
+    """
+    Sélection gloutonne : ajoute à chaque étape l'arbre qui réduit le plus
+    l'erreur de la moyenne, jusqu'à max_trees arbres ou jusqu'à être à moins
+    de `tolerance` (relative) du RMSE de la forêt complète.
+    `per_tree` est de forme (n_arbres, n_lignes). Si `in_bag` (même forme)
+    est fourni, chaque ligne n'est prédite que par les arbres qui ne l'ont pas
+    vue à l'entraînement (erreur out-of-bag). Renvoie les indices choisis.
+    """
+    n_trees = per_tree.shape[0]
+    max_trees = min(max_trees or n_trees, n_trees)
+    y = np.asarray(y, dtype=np.float64)
+    weights = np.ones(per_tree.shape) if in_bag is None else (~in_bag).astype(float)
+    per_tree = per_tree * weights
+
+    def rmse(sums, counts):
+        with np.errstate(invalid="ignore", divide="ignore"):
+            squared = (sums / counts - y) ** 2
+        return np.sqrt(np.nanmean(squared, axis=-1))
+
+    target_rmse = rmse(per_tree.sum(axis=0), weights.sum(axis=0)) * (1 + tolerance)
+
+    selected = []
+    available = np.ones(n_trees, dtype=bool)
+    sums = np.zeros(per_tree.shape[1])
+    counts = np.zeros(per_tree.shape[1])
+    while len(selected) < max_trees:
+        errors = rmse(sums + per_tree, counts + weights)
+        errors[~available | np.isnan(errors)] = np.inf
+        best = int(np.argmin(errors))
+
+        selected.append(best)
+        available[best] = False
+        sums += per_tree[best]
+        counts += weights[best]
+        if errors[best] <= target_rmse:
+            break
+    return selected
+
+
+def in_bag_mask(model, n_rows):
+    """
+    (n_arbres, n_rows) : True si la ligne a été tirée dans l'échantillon
+    bootstrap de l'arbre
+    """
+    mask = np.zeros((len(model.estimators_), n_rows), dtype=bool)
+    for i, samples in enumerate(model.estimators_samples_):
+        mask[i, samples[samples < n_rows]] = True
+    return mask
+
+
+def subset_forest(model, indices):
+    """
+    RandomForestRegressor limité aux arbres `indices`, dans cet ordre
+    """
+    compact = copy.copy(model)
+    compact.estimators_ = [model.estimators_[i] for i in indices]
+    compact.n_estimators = len(indices)
+    return compact
+
+
+def distill_forest(teacher, X_train, student_type, max_trees, max_depth):
+    """
+    Entraîne un modèle plus petit sur les prédictions de la forêt
+    """
+    teacher_predictions = compile_model({"model": teacher})["engine"].predict(X_train)
+    params = {"max_depth": max_depth}
+    if max_trees or student_type == "random_forest":
+        params["n_estimators"] = max_trees or 20
+    student = build_model(student_type, len(X_train), params)
+    return student.fit(X_train, teacher_predictions)
+
+
+def evaluate(model, X_test, y_test):
+    y_pred = model.predict(X_test)
+    mse = mean_squared_error(y_test, y_pred)
+    return {
+        "r2_score": float(r2_score(y_test, y_pred)),
+        "mae": float(mean_absolute_error(y_test, y_pred)),
+        "rmse": float(np.sqrt(mse)),
+        "mse": float(mse),
+    }
+
+
+def serving_profile(info, X_raw):
+    """
+    Latence du chemin de service et taille sérialisée du modèle
+    """
+    info = compile_model(dict(info))
+    latency = measure_latency(lambda X: predict_with_bounds(info, X), X_raw)
+    return {**latency, "model_mb": len(pickle.dumps(info["model"])) / 2**20}
+
+
+def compact_model(
+    model_path=MODEL_PATH,
+    data_path=DATA_PATH,
+    output_path=MODEL_PATH,
+    method="select",
+    max_trees=None,
+    tolerance=0.01,
+    student_type="random_forest",
+    max_depth=8,
+):
+    """
+    Compacte la forêt de `model_path` et écrit un artefact au même format.
+    Le jeu de test est celui de train_model() (même fichier, même découpage).
+    """
+    if method not in METHODS:
+        raise ValueError(f"Méthode de compaction inconnue: {method}")
+    teacher_info = joblib.load(model_path)
+    teacher = teacher_info["model"]
+    if not isinstance(teacher, RandomForestRegressor):
+        raise ValueError("La compaction porte sur une forêt aléatoire")
+
+    # Même chargement et même découpage que l'entraînement du modèle ; les
+    # artefacts antérieurs à compact_data viennent du CSV et de train_test_split
+    compact = teacher_info.get("compact_data", False)
+    X, y = load_dataset(data_path, compact=compact)
+    X_train, X_test, y_train, y_test = split_dataset(X, y, compact)
+    X_raw = X_test[:PARITY_SAMPLE_SIZE].astype(np.float64)
+    scaler = teacher_info["scaler"]
+    if scaler is not None:
+        scaler.transform(X_train, copy=False)
+        scaler.transform(X_test, copy=False)
+    # Mêmes lignes de calibration que le modèle d'origine (les anciens
+    # artefacts, calibrés sur le jeu de test, n'en ont pas)
+    n_calibration = teacher_info.get("calibration_samples", 0)
+    X_train, X_calibration, y_train, y_calibration = split_calibration(
+        X_train, y_train, n_calibration
+    )
+
+    if method == "select":
+        n_rows = min(len(y_train), SELECTION_SAMPLE_SIZE)
+        engine = compile_model({"model": teacher})["engine"]
+        per_tree = engine.predict_trees(X_train[:n_rows])
+        in_bag = None
+        # Erreur out-of-bag si le jeu d'entraînement est bien celui du modèle
+        if teacher.bootstrap and teacher_info["training_samples"] == len(y_train):
+            in_bag = in_bag_mask(teacher, n_rows)
+        indices = select_trees(per_tree, y_train[:n_rows], max_trees, tolerance, in_bag)
+        student = subset_forest(teacher, indices)
+    else:
+        student = distill_forest(teacher, X_train, student_type, max_trees, max_depth)
+
+    metrics = evaluate(student, X_test, y_test)
+    student_info = {
+        key: value
+        for key, value in teacher_info.items()
+        if key not in ("model", "engine", "interval", "search")
+    }
+    compacted_at = datetime.now()
+    student_info.update(
+        model=student,
+        metrics=metrics,
+        model_version=compacted_at.strftime("1.0.%Y%m%d%H%M%S"),
+        hyperparameters=student.get_params(),
+    )
+    if isinstance(student, RandomForestRegressor):
+        if "interval" in teacher_info:
+            quantiles = teacher_info["interval"]["quantiles"]
+            if n_calibration:
+                compiled = compile_model({"model": student})
+                interval = calibrate_interval(
+                    compiled, X_calibration, y_calibration, quantiles
+                )
+                interval["coverage"] = interval_coverage(
+                    compiled, X_test, y_test, interval
+                )
+            else:
+                interval = {"quantiles": list(quantiles), "scale": 1.0}
+            student_info["interval"] = interval
+        student_info["feature_importance"] = [
+            {"feature": feature, "importance": float(importance)}
+            for feature, importance in zip(
+                teacher_info["features"], student.feature_importances_
+            )
+        ]
+
+    teacher_profile = serving_profile(teacher_info, X_raw)
+    student_profile = serving_profile(student_info, X_raw)
+    reference = teacher_info["metrics"]
+    report = {
+        "method": method,
+        "teacher": {**reference, **teacher_profile},
+        "student": {**metrics, **student_profile},
+        "r2_delta": metrics["r2_score"] - reference["r2_score"],
+        "rmse_delta": metrics["rmse"] - reference["rmse"],
+        "single_speedup": teacher_profile["single_p50_ms"]
+        / student_profile["single_p50_ms"],
+        "batch_speedup": teacher_profile["batch_p50_ms"]
+        / student_profile["batch_p50_ms"],
+        "memory_saving": 1 - student_profile["model_mb"] / teacher_profile["model_mb"],
+    }
+    if method == "select":
+        report["trees"] = len(indices)
+    student_info["compaction"] = report
+
+    if os.path.abspath(output_path) == os.path.abspath(model_path):
+        joblib.dump(teacher_info, TEACHER_PATH)
+    joblib.dump(student_info, output_path)
+
+    if os.path.abspath(output_path) == os.path.abspath(MODEL_PATH):
+        # L'API charge en priorité les artefacts de service : ils suivent
+        if isinstance(student, RandomForestRegressor):
+            export_serving_model(student_info, X_raw)
+        else:
+            remove_serving_artifacts()
+    return student_info
+
+
+def print_report(report):
+    teacher, student = report["teacher"], report["student"]
+    print(f"\nCompaction ({report['method']}):")
+    if "trees" in report:
+        print(f"- Arbres conservés: {report['trees']}")
+    print(
+        f"- R²: {teacher['r2_score']:.4f} -> {student['r2_score']:.4f} "
+        f"({report['r2_delta']:+.4f})"
+    )
+    print(
+        f"- RMSE: {teacher['rmse']:,.0f}€ -> {student['rmse']:,.0f}€ "
+        f"({report['rmse_delta']:+,.0f}€)"
+    )
+    print(
+        f"- Latence p50 1 ligne: {teacher['single_p50_ms']:.3f} -> "
+        f"{student['single_p50_ms']:.3f} ms (x{report['single_speedup']:.1f})"
+    )
+    print(
+        f"- Latence p50 lot: {teacher['batch_p50_ms']:.2f} -> "
+        f"{student['batch_p50_ms']:.2f} ms (x{report['batch_speedup']:.1f})"
+    )
+    print(
+        f"- Taille du modèle: {teacher['model_mb']:.1f} -> "
+        f"{student['model_mb']:.1f} Mo (-{report['memory_saving']:.0%})"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compaction de la forêt entraînée")
+    parser.add_argument("--model", default=MODEL_PATH, help="Artefact à compacter")
+    parser.add_argument("--data", default=DATA_PATH, help="Jeu de données d'origine")
+    parser.add_argument(
+        "--output",
+        default=MODEL_PATH,
+        help="Artefact compacté (par défaut remplace le modèle servi)",
+    )
+    parser.add_argument("--method", choices=METHODS, default="select")
+    parser.add_argument("--max-trees", type=int, default=None)
+    parser.add_argument("--tolerance", type=float, default=0.01)
+    parser.add_argument(
+        "--student",
+        choices=("random_forest", "hist_gradient_boosting"),
+        default="random_forest",
+    )
+    parser.add_argument("--max-depth", type=int, default=8)
+    args = parser.parse_args()
+
+    student_info = compact_model(
+        args.model,
+        args.data,
+        args.output,
+        args.method,
+        args.max_trees,
+        args.tolerance,
+        args.student,
+        args.max_depth,
+    )
+    print_report(student_info["compaction"])
+    print(f"\nArtefact compacté sauvegardé dans '{args.output}'")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,208 @@
+from datetime import datetime
+
+import numpy as np
+
+# Percentiles pour l'esquisse de quantiles (KS), déciles pour le PSI : les
+# déciles sont aussi des percentiles, l'histogramme se déduit de l'esquisse
+SKETCH_QUANTILES = np.arange(1, 100) / 100
+HISTOGRAM_QUANTILES = np.arange(1, 10) / 10
+# Au-delà, quantiles et histogrammes de référence portent sur un échantillon
+REFERENCE_SAMPLE_SIZE = 1_000_000
+PSI_THRESHOLDS = (0.1, 0.25)
+MIN_ROWS = 100
+_EPSILON = 1e-4
+
+
+def _bin_proportions(values, edges):
+    counts = np.bincount(
+        np.searchsorted(edges, values, side="right"), minlength=len(edges) + 1
+    )
+    return counts / max(len(values), 1)
+
+
+def reference_statistics(X, feature_names):
+    """
+    Statistiques compactes de chaque feature du jeu d'entraînement, stockées
+    dans l'artefact : moyenne, variance, esquisse de quantiles et histogramme
+    sur les déciles. Les bornes des classes sont des quantiles de référence
+    (classes ouvertes aux extrémités) : les mêmes servent en production.
+    """
+    stats = {}
+    for j, name in enumerate(feature_names):
+        column = np.asarray(X[:, j], dtype=np.float64)
+        sample = column[:REFERENCE_SAMPLE_SIZE]
+        histogram_edges = np.unique(np.quantile(sample, HISTOGRAM_QUANTILES))
+        sketch_edges = np.unique(np.quantile(sample, SKETCH_QUANTILES))
+        stats[name] = {
+            "count": len(column),
+            "mean": float(column.mean()),
+            "variance": float(column.var()),
+            "min": float(column.min()),
+            "max": float(column.max()),
+            "histogram_edges": histogram_edges.tolist(),
+            "histogram": _bin_proportions(sample, histogram_edges).tolist(),
+            "sketch_edges": sketch_edges.tolist(),
+            "sketch": _bin_proportions(sample, sketch_edges).tolist(),
+        }
+    return stats
+
+
+def psi(expected, actual):
+    """
+    Population Stability Index entre deux distributions sur les mêmes classes
+    """
+    expected = np.clip(expected, _EPSILON, None)
+    actual = np.clip(actual, _EPSILON, None)
+    return float(np.sum((actual - expected) * np.log(actual / expected)))
+
+
+def ks_distance(expected, actual):
+    """
+    Écart maximal entre les fonctions de répartition, évaluées aux bornes
+    de l'esquisse
+    """
+    return float(np.max(np.abs(np.cumsum(expected) - np.cumsum(actual))))
+
+
+def drift_status(score, n_rows):
+    if n_rows < MIN_ROWS:
+        return "insufficient_data"
+    if score < PSI_THRESHOLDS[0]:
+        return "stable"
+    if score < PSI_THRESHOLDS[1]:
+        return "moderate"
+    return "drift"
+
+
+class _FlatBins:
+    """
+    Classes de toutes les features dans un seul tableau trié : chaque feature
+    est bornée puis décalée dans sa propre plage, séparée de la suivante, si
+    bien qu'un seul searchsorted et un seul bincount classent toute la matrice
+    """
+
+    def __init__(self, edges_per_feature):
+        edges_per_feature = [np.asarray(e, dtype=np.float64) for e in edges_per_feature]
+        self.lower = np.array([edges[0] - 1 for edges in edges_per_feature])
+        self.upper = np.array([edges[-1] + 1 for edges in edges_per_feature])
+        starts = np.concatenate([[0.0], np.cumsum(self.upper - self.lower + 1)])
+        self.offset = starts[:-1] - self.lower
+
+        flat, self.slices = [], []
+        for j, edges in enumerate(edges_per_feature):
+            self.slices.append(slice(len(flat), len(flat) + len(edges) + 1))
+            flat.extend(edges + self.offset[j])
+            flat.append(starts[j + 1] - 0.5)
+        self.edges = np.array(flat)
+        self.size = len(self.edges) + 1
+
+    def count(self, feature_matrix):
+        shifted = np.clip(feature_matrix, self.lower, self.upper) + self.offset
+        indices = np.searchsorted(self.edges, shifted.ravel(), side="right")
+        return np.bincount(indices, minlength=self.size)
+
+
+class DriftMonitor:
+    """
+    Statistiques des features reçues en production, comparées à celles de
+    référence de l'artefact.
+
+    Chaque lot met à jour en une passe vectorisée la moyenne et la variance
+    (Welford, fusion de Chan) et les comptes de l'esquisse de quantiles : le
+    coût est constant par ligne, l'état ne dépend pas du nombre de requêtes
+    et deux moniteurs se fusionnent par simple addition (merge).
+    """
+
+    def __init__(self, reference, feature_names, model_version=None):
+        self.reference = reference
+        self.feature_names = list(feature_names)
+        self.model_version = model_version
+        self._sketch = _FlatBins(
+            [reference[name]["sketch_edges"] for name in self.feature_names]
+        )
+        # Début de chaque classe de l'histogramme dans les classes de l'esquisse
+        self._histogram_starts = []
+        for name in self.feature_names:
+            positions = np.searchsorted(
+                reference[name]["sketch_edges"], reference[name]["histogram_edges"]
+            )
+            self._histogram_starts.append(np.concatenate([[0], positions + 1]))
+        self.reset()
+
+    def reset(self):
+        n_features = len(self.feature_names)
+        self.count = 0
+        self.mean = np.zeros(n_features)
+        self.m2 = np.zeros(n_features)
+        self.sketch_counts = np.zeros(self._sketch.size, np.int64)
+        self.since = datetime.now().isoformat()
+
+    def _merge_moments(self, count, mean, m2):
+        total = self.count + count
+        delta = mean - self.mean
+        self.mean = self.mean + delta * (count / total)
+        self.m2 = self.m2 + m2 + delta**2 * (self.count * count / total)
+        self.count = total
+
+    def update(self, feature_matrix):
+        n_rows = len(feature_matrix)
+        if not n_rows:
+            return
+        if n_rows == 1:
+            # Welford ligne à ligne, moins coûteux pour /predict
+            self.count += 1
+            delta = feature_matrix[0] - self.mean
+            self.mean = self.mean + delta / self.count
+            self.m2 = self.m2 + delta * (feature_matrix[0] - self.mean)
+        else:
+            batch_mean = feature_matrix.mean(axis=0)
+            batch_m2 = ((feature_matrix - batch_mean) ** 2).sum(axis=0)
+            self._merge_moments(n_rows, batch_mean, batch_m2)
+        self.sketch_counts += self._sketch.count(feature_matrix)
+
+    def merge(self, other):
+        """
+        Ajoute l'état d'un autre moniteur (autre worker) sur la même référence
+        """
+        if other.count:
+            self._merge_moments(other.count, other.mean, other.m2)
+        self.sketch_counts += other.sketch_counts
+
+    def report(self):
+        features = {}
+        for j, name in enumerate(self.feature_names):
+            reference = self.reference[name]
+            reference_std = np.sqrt(reference["variance"])
+            if self.count:
+                live_mean = float(self.mean[j])
+                live_std = float(np.sqrt(self.m2[j] / self.count))
+                sketch = self.sketch_counts[self._sketch.slices[j]] / self.count
+                histogram = np.add.reduceat(sketch, self._histogram_starts[j])
+                score = psi(np.asarray(reference["histogram"]), histogram)
+                ks = ks_distance(np.asarray(reference["sketch"]), sketch)
+                shift = (
+                    float((live_mean - reference["mean"]) / reference_std)
+                    if reference_std
+                    else 0.0
+                )
+            else:
+                live_mean = live_std = score = ks = shift = None
+            features[name] = {
+                "reference_mean": reference["mean"],
+                "reference_std": float(reference_std),
+                "live_mean": live_mean,
+                "live_std": live_std,
+                "mean_shift": shift,
+                "psi": score,
+                "ks": ks,
+                "status": drift_status(score or 0.0, self.count),
+            }
+        return {
+            "model_version": self.model_version,
+            "since": self.since,
+            "rows": self.count,
+            "drifted_features": [
+                name for name, f in features.items() if f["status"] == "drift"
+            ],
+            "features": features,
+        }
@@ -0,0 +1,91 @@
+import asyncio
+import logging
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+logger = logging.getLogger(__name__)
+
+INFERENCE_MODES = ("inline", "thread", "process")
+
+
+def _ping():
+    return os.getpid()
+
+
+class InferenceExecutor:
+    """
+    Exécute l'inférence hors de la boucle asyncio.
+
+    - inline : appel direct dans la boucle (pas de surcoût, mais bloquant)
+    - thread : pool de threads, NumPy relâche le GIL pendant les calculs
+    - process : pool de processus, chaque worker charge le modèle une seule
+      fois via `initializer`
+    """
+
+    def __init__(self, mode="inline", workers=None, initializer=None, initargs=()):
+        if mode not in INFERENCE_MODES:
+            raise ValueError(
+                f"Mode d'inférence inconnu: {mode} (attendu: {INFERENCE_MODES})"
+            )
+        self.mode = mode
+        self.workers = workers or os.cpu_count() or 1
+        self.initializer = initializer
+        self.initargs = initargs
+        self._pool = None
+
+    @property
+    def running(self):
+        return self._pool is not None
+
+    async def start(self):
+        if self.mode == "inline" or self.running:
+            return
+
+        if self.mode == "thread":
+            self._pool = ThreadPoolExecutor(
+                max_workers=self.workers, thread_name_prefix="inference"
+            )
+        else:
+            self._pool = await self._start_process_pool()
+
+        logger.info(f"Exécuteur d'inférence: {self.mode} ({self.workers} workers)")
+
+    async def _start_process_pool(self):
+        # spawn : pas de fork d'un processus qui a déjà des threads
+        pool = ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=self.initializer,
+            initargs=self.initargs,
+        )
+        # Démarre les workers (et charge le modèle) avant la 1re requête
+        loop = asyncio.get_running_loop()
+        pids = await asyncio.gather(
+            *(loop.run_in_executor(pool, _ping) for _ in range(self.workers))
+        )
+        logger.info(f"Workers d'inférence démarrés: {sorted(set(pids))}")
+        return pool
+
+    async def restart(self):
+        """
+        Remplace les workers de processus (qui rechargent le modèle) : le
+        nouveau pool est prêt avant la bascule et l'ancien termine les calculs
+        déjà soumis
+        """
+        if self.mode != "process" or self._pool is None:
+            return
+        pool = await self._start_process_pool()
+        previous, self._pool = self._pool, pool
+        previous.shutdown(wait=False)
+
+    def shutdown(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+    async def run(self, fn, *args):
+        if self._pool is None:
+            return fn(*args)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._pool, fn, *args)
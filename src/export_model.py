@@ -0,0 +1,123 @@
+import os
+import shutil
+
+import joblib
+import numpy as np
+
+from artifact import save_mmap_artifact
+from forest_engine import CompiledForest
+
+MODEL_PATH = "../models/housing_model.joblib"
+SERVING_MODEL_PATH = "../models/housing_model_serving.joblib"
+MMAP_MODEL_DIR = "../models/housing_model_mmap"
+# Précision de l'artefact mmap : celle servie par l'API (ENGINE_DTYPE), pour
+# que les workers projettent les tableaux sans en faire de copie privée
+MMAP_DTYPE = os.getenv("ENGINE_DTYPE", "float64")
+
+
+def build_serving_artifact(model_info):
+    """
+    Artefact de service sans scaler : les seuils de la forêt sont réécrits
+    dans l'espace des features brutes
+    """
+    scaler = model_info["scaler"]
+    engine = CompiledForest.from_sklearn(model_info["model"])
+
+    serving_info = {
+        key: value
+        for key, value in model_info.items()
+        if key not in ("model", "scaler", "engine")
+    }
+    serving_info["engine"] = engine.fold_scaler(scaler.mean_, scaler.scale_)
+    serving_info["scaler"] = None
+    return serving_info
+
+
+def boundary_samples(serving_info, base_row):
+    """
+    Lignes placées exactement sur chaque seuil brut et juste au-dessus, là où
+    une erreur de réécriture changerait le chemin suivi
+    """
+    engine = serving_info["engine"]
+    internal = np.isfinite(engine.threshold)
+    features = engine.feature[internal]
+    thresholds = engine.threshold[internal].astype(np.float64)
+
+    rows = np.repeat(np.asarray(base_row, dtype=np.float64)[None, :], 2, axis=0)
+    samples = np.tile(rows, (len(thresholds), 1))
+    on_threshold = np.arange(len(thresholds)) * 2
+    samples[on_threshold, features] = thresholds
+    samples[on_threshold + 1, features] = np.nextafter(thresholds, np.inf)
+    return samples
+
+
+def check_parity(model_info, serving_info, X_raw):
+    """
+    Vérifie que l'artefact de service prédit exactement comme
+    scaler.transform + model.predict. Lève AssertionError sinon.
+    """
+    X_raw = np.asarray(X_raw, dtype=np.float64)
+    X_check = np.vstack([X_raw, boundary_samples(serving_info, X_raw[0])])
+
+    model = model_info["model"]
+    n_jobs = model.n_jobs
+    # En multi-thread, scikit-learn additionne les arbres dans un ordre
+    # non déterministe : la référence est calculée en séquentiel
+    model.n_jobs = 1
+    try:
+        expected = model.predict(model_info["scaler"].transform(X_check))
+    finally:
+        model.n_jobs = n_jobs
+
+    predicted = serving_info["engine"].predict(X_check)
+    mismatches = int(np.count_nonzero(predicted != expected))
+    if mismatches:
+        raise AssertionError(
+            f"{mismatches}/{len(X_check)} prédictions diffèrent après repliement"
+        )
+    return len(X_check)
+
+
+def export_serving_model(
+    model_info,
+    X_raw,
+    path=SERVING_MODEL_PATH,
+    mmap_dir=MMAP_MODEL_DIR,
+    mmap_dtype=MMAP_DTYPE,
+):
+    serving_info = build_serving_artifact(model_info)
+    n_checked = check_parity(model_info, serving_info, X_raw)
+    print(f"Parité vérifiée sur {n_checked} lignes (prédictions identiques)")
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    joblib.dump(serving_info, path)
+    print(f"Artefact de service sauvegardé dans '{path}'")
+
+    if mmap_dir:
+        engine = serving_info["engine"].astype(mmap_dtype)
+        save_mmap_artifact({**serving_info, "engine": engine}, mmap_dir)
+        print(
+            f"Artefact mmap {mmap_dtype} (partagé entre workers) sauvegardé "
+            f"dans '{mmap_dir}'"
+        )
+    return serving_info
+
+
+def remove_serving_artifacts(path=SERVING_MODEL_PATH, mmap_dir=MMAP_MODEL_DIR):
+    """
+    Supprime les artefacts de service d'un modèle précédent, que l'API
+    chargerait sinon à la place du nouveau housing_model.joblib
+    """
+    if os.path.exists(path):
+        os.remove(path)
+    if os.path.isdir(mmap_dir):
+        shutil.rmtree(mmap_dir)
+
+
+if __name__ == "__main__":
+    import pandas as pd
+
+    print("Export de l'artefact de service sans scaler")
+    model_info = joblib.load(MODEL_PATH)
+    df = pd.read_csv("../data/housing_data.csv")
+    export_serving_model(model_info, df[model_info["features"]].to_numpy())
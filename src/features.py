@@ -0,0 +1,119 @@
+from typing import NamedTuple
+
+import numpy as np
+from pydantic import Field, TypeAdapter, ValidationError
+
+
+class FeatureSpec(NamedTuple):
+    name: str
+    type: type
+    lower: float
+    upper: float
+    description: str
+
+
+# Source unique des bornes : HousingFeatures (validation Pydantic) et la
+# validation vectorisée des lots en dérivent toutes les deux
+FEATURE_SPECS = (
+    FeatureSpec("surface", float, 20, 500, "Surface du bien en m²"),
+    FeatureSpec("rooms", int, 1, 15, "Nombre de pièces"),
+    FeatureSpec("age", float, 0, 100, "Âge du bien en années"),
+    FeatureSpec(
+        "location_score",
+        float,
+        1,
+        10,
+        "Score de localisation (1=mauvais, 10=excellent)",
+    ),
+    FeatureSpec("garage", bool, 0, 1, "Présence d'un garage"),
+)
+FEATURE_NAMES = [spec.name for spec in FEATURE_SPECS]
+_SPECS_BY_NAME = {spec.name: spec for spec in FEATURE_SPECS}
+# Coercition booléenne de Pydantic ("true", "yes", 1...), la même que celle
+# de HousingFeatures
+_BOOL = TypeAdapter(bool)
+
+
+def feature_field(name):
+    """
+    Field Pydantic d'une feature, avec les bornes de FEATURE_SPECS
+    """
+    spec = _SPECS_BY_NAME[name]
+    if spec.type is bool:
+        return Field(..., description=spec.description)
+    return Field(..., ge=spec.lower, le=spec.upper, description=spec.description)
+
+
+def feature_constraints():
+    """
+    (nom, min, max, entier) pour chaque feature, dans l'ordre de la matrice
+    """
+    return [
+        (spec.name, spec.lower, spec.upper, spec.type in (int, bool))
+        for spec in FEATURE_SPECS
+    ]
+
+
+def check_constraints(feature_matrix, constraints):
+    """
+    Vérifie les bornes de chaque feature sur toute la matrice et renvoie
+    {indice de ligne: message} pour les lignes invalides
+    """
+    errors = {}
+    for j, (name, lower, upper, integer) in enumerate(constraints):
+        column = feature_matrix[:, j]
+        invalid = ~((column >= lower) & (column <= upper))
+        if integer:
+            invalid |= column != np.round(column)
+        for i in np.flatnonzero(invalid):
+            errors.setdefault(
+                int(i), f"{name}={column[i]} hors bornes [{lower}, {upper}]"
+            )
+    return errors
+
+
+def records_to_matrix(records, feature_names=FEATURE_NAMES):
+    """
+    Assemble une liste d'objets JSON en matrice (N, features) colonne par
+    colonne. Les lignes mal formées (champ absent, valeur non numérique)
+    sont à NaN et renvoyées dans {indice de ligne: message}.
+    """
+    matrix = np.full((len(records), len(feature_names)), np.nan)
+    errors = {}
+    for i, record in enumerate(records):
+        if not isinstance(record, dict):
+            errors[i] = "Objet JSON attendu"
+
+    for j, name in enumerate(feature_names):
+        values = [
+            record.get(name) if isinstance(record, dict) else None for record in records
+        ]
+        boolean = name in _SPECS_BY_NAME and _SPECS_BY_NAME[name].type is bool
+        try:
+            column = np.array(values, dtype=np.float64)
+            # Une chaîne dans une colonne booléenne passe par _BOOL
+            if (
+                column.ndim == 1
+                and not any(value is None for value in values)
+                and not (boolean and any(isinstance(value, str) for value in values))
+            ):
+                matrix[:, j] = column
+                continue
+        except (TypeError, ValueError):
+            pass
+
+        # Chemin lent : isole les valeurs invalides de la colonne
+        for i, value in enumerate(values):
+            if value is None:
+                errors.setdefault(i, f"{name} manquant")
+            elif boolean:
+                try:
+                    matrix[i, j] = float(_BOOL.validate_python(value))
+                except ValidationError:
+                    errors.setdefault(i, f"{name}={value!r} n'est pas un booléen")
+            else:
+                try:
+                    matrix[i, j] = float(value)
+                except (TypeError, ValueError):
+                    errors.setdefault(i, f"{name}={value!r} n'est pas un nombre")
+    return matrix, errors
@@ -0,0 +1,249 @@
+import numpy as np
+
+# Nombre de lignes traitées à la fois, pour borner la mémoire de la
+# matrice (n_arbres, n_lignes) des noeuds courants
+CHUNK_SIZE = 4096
+
+
+class CompiledForest:
+    """
+    Forêt aplatie en tableaux NumPy contigus (feature, seuil, fils gauche/droit,
+    valeur de feuille) et parcourue de façon vectorisée pour tout un batch.
+
+    En float64, les prédictions sont identiques bit à bit à celles de
+    RandomForestRegressor.predict (accumulation dans l'ordre des arbres).
+    En float32, les seuils sont arrondis vers le bas pour conserver exactement
+    les mêmes chemins, seules les valeurs de feuilles perdent en précision.
+    Les seuils suivent la précision des entrées (input_dtype) : ceux d'un
+    moteur replié sur le scaler restent en float64, comme ses entrées.
+    """
+
+    def __init__(
+        self,
+        feature,
+        threshold,
+        left,
+        right,
+        value,
+        roots,
+        max_depth,
+        dtype=np.float64,
+        input_dtype=np.float32,
+        children=None,
+    ):
+        self.feature = feature
+        self.threshold = threshold
+        self.left = left
+        self.right = right
+        self.value = value
+        self.roots = roots
+        self.max_depth = max_depth
+        self.dtype = np.dtype(dtype)
+        self.input_dtype = np.dtype(input_dtype)
+        # Fils gauche/droit entrelacés : children[2 * noeud + aller_a_droite]
+        if children is None:
+            children = np.column_stack([left, right]).ravel()
+        self.children = children
+
+    @property
+    def n_estimators(self):
+        return len(self.roots)
+
+    @property
+    def n_nodes(self):
+        return len(self.feature)
+
+    @classmethod
+    def from_sklearn(cls, model, dtype=np.float64):
+        """
+        Aplatit les arbres d'un RandomForestRegressor entraîné
+        """
+        features, thresholds, lefts, rights, values, roots = [], [], [], [], [], []
+        offset = 0
+        max_depth = 0
+
+        for estimator in model.estimators_:
+            tree = estimator.tree_
+            node_ids = np.arange(tree.node_count) + offset
+            is_leaf = tree.children_left == -1
+
+            # Les feuilles bouclent sur elles-mêmes : le parcours peut faire
+            # max_depth itérations sans test de fin
+            features.append(np.where(is_leaf, 0, tree.feature))
+            thresholds.append(np.where(is_leaf, np.inf, tree.threshold))
+            lefts.append(np.where(is_leaf, node_ids, tree.children_left + offset))
+            rights.append(np.where(is_leaf, node_ids, tree.children_right + offset))
+            values.append(tree.value[:, 0, 0])
+            roots.append(offset)
+
+            offset += tree.node_count
+            max_depth = max(max_depth, tree.max_depth)
+
+        threshold = np.concatenate(thresholds)
+        if np.dtype(dtype) == np.float32:
+            threshold = _round_down_float32(threshold)
+
+        return cls(
+            feature=np.ascontiguousarray(np.concatenate(features), dtype=np.intp),
+            threshold=np.ascontiguousarray(threshold),
+            left=np.ascontiguousarray(np.concatenate(lefts), dtype=np.intp),
+            right=np.ascontiguousarray(np.concatenate(rights), dtype=np.intp),
+            value=np.ascontiguousarray(np.concatenate(values), dtype=dtype),
+            roots=np.asarray(roots, dtype=np.intp),
+            max_depth=max_depth,
+            dtype=dtype,
+        )
+
+    def arrays(self):
+        """
+        Tableaux de noeuds du moteur, par nom d'argument du constructeur
+        """
+        return {
+            "feature": self.feature,
+            "threshold": self.threshold,
+            "left": self.left,
+            "right": self.right,
+            "children": self.children,
+            "value": self.value,
+            "roots": self.roots,
+        }
+
+    def astype(self, dtype):
+        """
+        Moteur dans une autre précision (float32 ou float64). Les tableaux
+        déjà du bon type sont repris tels quels : un moteur projeté (mmap)
+        exporté dans la précision servie n'est pas copié.
+        """
+        threshold = self.threshold.astype(np.float64, copy=False)
+        if np.dtype(dtype) == np.float32 and self.input_dtype == np.float32:
+            threshold = _round_down_float32(threshold)
+        return CompiledForest(
+            feature=self.feature,
+            threshold=threshold,
+            left=self.left,
+            right=self.right,
+            value=self.value.astype(dtype, copy=False),
+            roots=self.roots,
+            max_depth=self.max_depth,
+            dtype=dtype,
+            input_dtype=self.input_dtype,
+            children=self.children,
+        )
+
+    def fold_scaler(self, mean, scale):
+        """
+        Réécrit les seuils dans l'espace des features brutes d'un StandardScaler
+        (x - mean) / scale, pour servir sans étape de normalisation.
+
+        Le seuil brut retenu est le plus grand float64 x tel que
+        float32((x - mean) / scale) <= seuil, ce qui reproduit exactement les
+        chemins de scikit-learn pour toute entrée float64.
+        """
+        mean = np.asarray(mean, dtype=np.float64)[self.feature]
+        scale = np.asarray(scale, dtype=np.float64)[self.feature]
+        threshold = self.threshold.astype(np.float64)
+        internal = np.isfinite(threshold)
+
+        def goes_left(x):
+            return ((x - mean) / scale).astype(np.float32) <= threshold
+
+        guess = np.where(internal, threshold * scale + mean, 0.0)
+        step = np.abs(guess) * 1e-6 + 1e-9
+        lo, hi = guess - step, guess + step
+        while not np.all(goes_left(lo) | ~internal):
+            lo = np.where(goes_left(lo), lo, lo - 2 * (hi - lo))
+        while np.any(goes_left(hi) & internal):
+            hi = np.where(goes_left(hi), hi + 2 * (hi - lo), hi)
+
+        # Bisection jusqu'à ce que lo et hi soient deux float64 adjacents
+        converged = ~internal
+        while not np.all(converged):
+            mid = lo + (hi - lo) / 2
+            converged |= (mid == lo) | (mid == hi)
+            left_mid = goes_left(mid)
+            lo = np.where(left_mid, mid, lo)
+            hi = np.where(left_mid, hi, mid)
+
+        # Les entrées brutes restent en float64 : arrondir ces seuils en
+        # float32 changerait le chemin des valeurs proches d'un seuil
+        return CompiledForest(
+            feature=self.feature,
+            threshold=np.where(internal, lo, np.inf),
+            left=self.left,
+            right=self.right,
+            value=self.value,
+            roots=self.roots,
+            max_depth=self.max_depth,
+            dtype=self.dtype,
+            input_dtype=np.float64,
+            children=self.children,
+        )
+
+    def apply(self, X):
+        """
+        Indices globaux des feuilles atteintes, de forme (n_arbres, n_lignes)
+        """
+        X = np.ascontiguousarray(X, dtype=self.input_dtype)
+        n_rows, n_features = X.shape
+        flat_X = X.ravel()
+        row_offsets = np.arange(n_rows) * n_features
+
+        nodes = np.repeat(self.roots[:, None], n_rows, axis=1)
+        for _ in range(self.max_depth):
+            values = flat_X.take(row_offsets + self.feature.take(nodes))
+            go_right = values > self.threshold.take(nodes)
+            nodes = self.children.take(2 * nodes + go_right)
+        return nodes
+
+    def predict_trees(self, X):
+        """
+        Prédictions individuelles de chaque arbre, de forme (n_arbres, n_lignes)
+        """
+        X = np.asarray(X, dtype=self.input_dtype)
+        out = np.empty((self.n_estimators, X.shape[0]), dtype=self.dtype)
+        for start in range(0, X.shape[0], CHUNK_SIZE):
+            chunk = slice(start, start + CHUNK_SIZE)
+            out[:, chunk] = self.value.take(self.apply(X[chunk]))
+        return out
+
+    def predict(self, X):
+        """
+        Moyenne des arbres, accumulée dans le même ordre que scikit-learn
+        """
+        X = np.asarray(X, dtype=self.input_dtype)
+        predictions = np.zeros(X.shape[0], dtype=self.dtype)
+        for start in range(0, X.shape[0], CHUNK_SIZE):
+            chunk = slice(start, start + CHUNK_SIZE)
+            y_hat = predictions[chunk]
+            for tree_values in self.value.take(self.apply(X[chunk])):
+                y_hat += tree_values
+        predictions /= self.n_estimators
+        return predictions
+
+    def predict_quantiles(self, X, quantiles):
+        """
+        Moyenne (identique à predict) et quantiles des sorties des arbres,
+        calculés sur les mêmes feuilles en une seule passe.
+        Les quantiles sont de forme (len(quantiles), n_lignes).
+        """
+        X = np.asarray(X, dtype=self.input_dtype)
+        predictions = np.zeros(X.shape[0], dtype=self.dtype)
+        bounds = np.empty((len(quantiles), X.shape[0]), dtype=self.dtype)
+        for start in range(0, X.shape[0], CHUNK_SIZE):
+            chunk = slice(start, start + CHUNK_SIZE)
+            per_tree = self.value.take(self.apply(X[chunk]))
+            y_hat = predictions[chunk]
+            for tree_values in per_tree:
+                y_hat += tree_values
+            bounds[:, chunk] = np.quantile(per_tree, quantiles, axis=0)
+        predictions /= self.n_estimators
+        return predictions, bounds
+
+
+def _round_down_float32(threshold):
+    # x <= t en float64 équivaut à x <= t32 en float32 si t32 est le plus
+    # grand float32 inférieur ou égal à t
+    threshold32 = threshold.astype(np.float32)
+    too_high = threshold32.astype(np.float64) > threshold
+    threshold32[too_high] = np.nextafter(threshold32[too_high], np.float32(-np.inf))
+    return threshold32
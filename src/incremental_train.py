@@ -0,0 +1,255 @@
+import argparse
+import os
+from datetime import datetime
+
+import joblib
+import numpy as np
+from sklearn.ensemble import RandomForestRegressor
+
+from compact_model import evaluate
+from export_model import MODEL_PATH, export_serving_model, remove_serving_artifacts
+from inference import calibrate_interval, compile_model, interval_coverage
+from train_model import (
+    FEATURES,
+    HOLDOUT_PATH,
+    HOLDOUT_SIZE,
+    PARITY_SAMPLE_SIZE,
+    StageProfiler,
+    calibration_size,
+    load_dataset,
+    load_holdout,
+    save_holdout,
+    split_calibration,
+    split_in_place,
+)
+
+VERSIONS_DIR = "../models/versions"
+DEFAULT_NEW_TREES = 20
+
+
+def version_path(model_version, versions_dir=VERSIONS_DIR):
+    return os.path.join(versions_dir, f"housing_model_{model_version}.joblib")
+
+
+def new_version(trained_at, versions_dir=VERSIONS_DIR):
+    """
+    Version horodatée à la seconde, suffixée (.2, .3...) si une autre passe
+    l'a déjà archivée : une version archivée n'est jamais écrasée
+    """
+    base = trained_at.strftime("1.0.%Y%m%d%H%M%S")
+    version, n = base, 1
+    while os.path.exists(version_path(version, versions_dir)):
+        n += 1
+        version = f"{base}.{n}"
+    return version
+
+
+def grow_forest(model, X, y, n_new_trees, max_trees=None, seed=42):
+    """
+    Ajoute n_new_trees arbres entraînés sur (X, y) seulement (warm_start),
+    puis retire les plus anciens au-delà de max_trees. Les arbres existants
+    ne sont pas réentraînés : le coût ne dépend que de la taille de (X, y).
+    Renvoie le nombre d'arbres retirés.
+    """
+    if not isinstance(model, RandomForestRegressor):
+        raise ValueError("L'entraînement incrémental porte sur une forêt aléatoire")
+    # warm_start avance le générateur d'un tirage par arbre existant : une
+    # graine propre à chaque passe évite de réutiliser celles des arbres retirés
+    model.set_params(
+        warm_start=True,
+        n_estimators=len(model.estimators_) + n_new_trees,
+        random_state=seed,
+    )
+    model.fit(X, y)
+    model.set_params(warm_start=False)
+
+    dropped = 0
+    if max_trees is not None and len(model.estimators_) > max_trees:
+        dropped = len(model.estimators_) - max_trees
+        model.estimators_ = model.estimators_[dropped:]
+        model.n_estimators = max_trees
+    return dropped
+
+
+def incremental_train(
+    delta_path,
+    model_path=MODEL_PATH,
+    output_path=MODEL_PATH,
+    n_new_trees=DEFAULT_NEW_TREES,
+    max_trees=None,
+    holdout_fraction=0.2,
+    holdout_path=HOLDOUT_PATH,
+    versions_dir=VERSIONS_DIR,
+):
+    """
+    Fait grandir la forêt de `model_path` avec les nouvelles ventes de
+    `delta_path` (mêmes colonnes que le jeu d'entraînement). Une part du
+    delta rejoint le jeu de test glissant, sur lequel l'ancien et le nouveau
+    modèle sont évalués. Écrit un artefact versionné au même format.
+    """
+    profiler = StageProfiler()
+    previous_info = joblib.load(model_path)
+    model = previous_info["model"]
+    if not isinstance(model, RandomForestRegressor):
+        raise ValueError("L'entraînement incrémental porte sur une forêt aléatoire")
+    scaler = previous_info["scaler"]
+    os.makedirs(versions_dir, exist_ok=True)
+    # Le modèle remplacé reste disponible pour un retour arrière
+    parent_path = version_path(previous_info.get("model_version"), versions_dir)
+    if not os.path.exists(parent_path):
+        joblib.dump(previous_info, parent_path)
+
+    with profiler.stage("chargement du delta"):
+        X, y = load_dataset(delta_path)
+        X_train, X_new_holdout, y_train, y_new_holdout = split_in_place(
+            X, y, holdout_fraction
+        )
+        # Le jeu de test glissant garde les lignes les plus récentes
+        holdout = load_holdout(holdout_path)
+        if holdout is not None:
+            X_holdout = np.concatenate([holdout[0], X_new_holdout])
+            y_holdout = np.concatenate([holdout[1], y_new_holdout])
+        else:
+            X_holdout, y_holdout = X_new_holdout, y_new_holdout
+        X_holdout, y_holdout = X_holdout[-HOLDOUT_SIZE:], y_holdout[-HOLDOUT_SIZE:]
+        X_raw_holdout = X_holdout
+        X_raw = X_holdout[-PARITY_SAMPLE_SIZE:].astype(np.float64)
+        if scaler is not None:
+            # Scaler de l'entraînement initial, figé : les seuils des arbres
+            # existants sont exprimés dans cet espace
+            scaler.transform(X_train, copy=False)
+            X_holdout = scaler.transform(X_holdout)
+        # Modèle calibré : une part des nouvelles lignes recalibre
+        # l'intervalle, le jeu de test glissant reste réservé à l'évaluation
+        n_calibration = 0
+        if "interval" in previous_info and previous_info.get("calibration_samples"):
+            n_calibration = calibration_size(len(y_train))
+        X_train, X_calibration, y_train, y_calibration = split_calibration(
+            X_train, y_train, n_calibration
+        )
+
+    with profiler.stage("évaluation du modèle précédent"):
+        previous_metrics = evaluate(model, X_holdout, y_holdout)
+
+    previous = previous_info.get("incremental", {})
+    rounds = previous.get("rounds", 0) + 1
+    with profiler.stage("entraînement incrémental"):
+        dropped = grow_forest(
+            model, X_train, y_train, n_new_trees, max_trees, seed=42 + rounds
+        )
+
+    with profiler.stage("évaluation"):
+        metrics = evaluate(model, X_holdout, y_holdout)
+
+    trained_at = datetime.now()
+    model_info = {
+        key: value
+        for key, value in previous_info.items()
+        if key not in ("engine", "interval", "search", "compaction")
+    }
+    model_info.update(
+        model=model,
+        metrics=metrics,
+        training_date=trained_at.isoformat(),
+        model_version=new_version(trained_at, versions_dir),
+        training_samples=previous_info["training_samples"] + len(y_train),
+        hyperparameters=model.get_params(),
+        feature_importance=[
+            {"feature": feature, "importance": float(importance)}
+            for feature, importance in zip(FEATURES, model.feature_importances_)
+        ],
+        incremental={
+            "rounds": rounds,
+            "parent_version": previous_info.get("model_version"),
+            "delta_samples": len(y),
+            "trees_added": n_new_trees,
+            "trees_dropped": dropped,
+            "n_trees": len(model.estimators_),
+            "holdout_samples": len(y_holdout),
+            "calibration_samples": n_calibration,
+            "previous_metrics": previous_metrics,
+            "profile": profiler.stages,
+        },
+    )
+    if "interval" in previous_info:
+        compiled = compile_model({"model": model})
+        interval = dict(previous_info["interval"])
+        if n_calibration:
+            interval = calibrate_interval(
+                compiled, X_calibration, y_calibration, interval["quantiles"]
+            )
+        interval["coverage"] = interval_coverage(
+            compiled, X_holdout, y_holdout, interval
+        )
+        model_info["interval"] = interval
+
+    with profiler.stage("sauvegarde"):
+        save_holdout(X_raw_holdout, y_holdout, holdout_path)
+        joblib.dump(model_info, version_path(model_info["model_version"], versions_dir))
+        joblib.dump(model_info, output_path)
+
+        if os.path.abspath(output_path) == os.path.abspath(MODEL_PATH):
+            # L'API charge en priorité les artefacts de service : ils suivent
+            if scaler is not None:
+                export_serving_model(model_info, X_raw)
+            else:
+                remove_serving_artifacts()
+    return model_info
+
+
+def print_report(model_info):
+    report = model_info["incremental"]
+    previous, metrics = report["previous_metrics"], model_info["metrics"]
+    print(f"\nEntraînement incrémental n°{report['rounds']}:")
+    print(f"- Version: {report['parent_version']} -> {model_info['model_version']}")
+    print(
+        f"- Arbres: +{report['trees_added']} -{report['trees_dropped']} "
+        f"= {report['n_trees']}"
+    )
+    print(
+        f"- Delta: {report['delta_samples']:,} lignes, "
+        f"jeu de test glissant: {report['holdout_samples']:,} lignes"
+    )
+    print(
+        f"- R²: {previous['r2_score']:.4f} -> {metrics['r2_score']:.4f}, "
+        f"RMSE: {previous['rmse']:,.0f}€ -> {metrics['rmse']:,.0f}€"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Ajoute à la forêt des arbres entraînés sur de nouvelles ventes"
+    )
+    parser.add_argument(
+        "--delta", required=True, help="Nouvelles ventes (.csv ou .parquet, avec price)"
+    )
+    parser.add_argument("--model", default=MODEL_PATH, help="Artefact à compléter")
+    parser.add_argument(
+        "--output",
+        default=MODEL_PATH,
+        help="Nouvel artefact (par défaut remplace le modèle servi)",
+    )
+    parser.add_argument("--new-trees", type=int, default=DEFAULT_NEW_TREES)
+    parser.add_argument(
+        "--max-trees",
+        type=int,
+        default=None,
+        help="Taille maximale de la forêt, les arbres les plus anciens sont retirés",
+    )
+    parser.add_argument("--holdout-fraction", type=float, default=0.2)
+    args = parser.parse_args()
+
+    model_info = incremental_train(
+        args.delta,
+        args.model,
+        args.output,
+        args.new_trees,
+        args.max_trees,
+        args.holdout_fraction,
+    )
+    print_report(model_info)
+    print(f"\nArtefact sauvegardé dans '{args.output}'")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+import time
+
+import numpy as np
+from sklearn.ensemble import RandomForestRegressor
+
+from forest_engine import CompiledForest
+
+DEFAULT_INTERVAL_QUANTILES = (0.05, 0.95)
+
+
+def compile_model(info, dtype="float64"):
+    """
+    Ajoute à l'artefact le moteur compilé (ou l'adapte à la précision voulue).
+    Les modèles autres que les forêts aléatoires restent servis par sklearn.
+    """
+    if info.get("engine") is None and not isinstance(
+        info.get("model"), RandomForestRegressor
+    ):
+        return info
+    if info.get("engine") is not None:
+        if info["engine"].dtype != dtype:
+            info["engine"] = info["engine"].astype(dtype)
+    else:
+        info["engine"] = CompiledForest.from_sklearn(info["model"], dtype)
+    return info
+
+
+def predict_with_bounds(info, feature_matrix, timings=None):
+    """
+    Prédit toute la matrice en un seul appel scaler + modèle et renvoie
+    (prix, borne basse, borne haute) sous forme de tableaux. Les bornes
+    viennent des quantiles des arbres si l'artefact définit `interval`.
+    Si `timings` est fourni, la durée de chaque étape y est ajoutée.
+    """
+    start = time.perf_counter()
+    scaler = info.get("scaler")
+    if scaler is not None:
+        # Même calcul que StandardScaler.transform, sans la validation sklearn
+        feature_matrix_scaled = (feature_matrix - scaler.mean_) / scaler.scale_
+    else:
+        feature_matrix_scaled = feature_matrix
+    scaled = time.perf_counter()
+
+    interval = info.get("interval")
+    if interval is not None:
+        predicted, lower, upper = _predict_tree_interval(
+            info, feature_matrix_scaled, interval
+        )
+    else:
+        engine = info.get("engine")
+        if engine is not None:
+            predicted = engine.predict(feature_matrix_scaled)
+        else:
+            predicted = info["model"].predict(feature_matrix_scaled)
+        # Anciens artefacts sans intervalle : largeur constante
+        rmse = info["metrics"]["rmse"]
+        lower = np.maximum(predicted - rmse, 0)
+        upper = predicted + rmse
+
+    if timings is not None:
+        timings["scaling"] = scaled - start
+        timings["model_predict"] = time.perf_counter() - scaled
+    return predicted, lower, upper
+
+
+def _tree_quantiles(info, feature_matrix_scaled, quantiles):
+    engine = info.get("engine")
+    if engine is not None:
+        return engine.predict_quantiles(feature_matrix_scaled, quantiles)
+
+    # Moteur scikit-learn : une passe vectorisée par arbre, sur tout le lot
+    model = info["model"]
+    per_tree = np.stack([tree.predict(feature_matrix_scaled) for tree in model])
+    return model.predict(feature_matrix_scaled), np.quantile(
+        per_tree, quantiles, axis=0
+    )
+
+
+def _predict_tree_interval(info, feature_matrix_scaled, interval):
+    predicted, (low, high) = _tree_quantiles(
+        info, feature_matrix_scaled, interval["quantiles"]
+    )
+    scale = interval.get("scale", 1.0)
+    lower = np.maximum(predicted - scale * np.maximum(predicted - low, 0), 0)
+    upper = predicted + scale * np.maximum(high - predicted, 0)
+    return predicted, lower, upper
+
+
+def calibrate_interval(info, X_scaled, y, quantiles=DEFAULT_INTERVAL_QUANTILES):
+    """
+    Intervalle issu des quantiles des arbres, élargi (ou resserré) sur un jeu
+    de calibration pour que la couverture atteigne la couverture nominale
+    (quantiles[1] - quantiles[0]), comme une prédiction conforme. Le jeu de
+    calibration ne doit servir ni à l'entraînement ni à mesurer la
+    couverture (interval_coverage).
+    """
+    low_q, high_q = quantiles
+    coverage = high_q - low_q
+    y = np.asarray(y, dtype=np.float64)
+    predicted, (low, high) = _tree_quantiles(info, X_scaled, [low_q, high_q])
+
+    # Facteur d'échelle minimal pour couvrir chaque observation
+    tiny = np.finfo(np.float64).tiny
+    below = (predicted - y) / np.maximum(predicted - low, tiny)
+    above = (y - predicted) / np.maximum(high - predicted, tiny)
+    scores = np.maximum(np.maximum(below, above), 0)
+
+    n = len(scores)
+    level = min(1.0, np.ceil((n + 1) * coverage) / n)
+    scale = float(np.quantile(scores, level, method="higher"))
+
+    return {"quantiles": [float(low_q), float(high_q)], "scale": scale}
+
+
+def interval_coverage(info, X_scaled, y, interval):
+    """
+    Part des prix observés dans l'intervalle, sur un jeu distinct de celui
+    de la calibration
+    """
+    y = np.asarray(y, dtype=np.float64)
+    _, lower, upper = _predict_tree_interval(info, X_scaled, interval)
+    return float(np.mean((y >= lower) & (y <= upper)))
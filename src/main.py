@@ -1,12 +1,68 @@
-from fastapi import FastAPI, HTTPException
-from pydantic import BaseModel, Field
+from fastapi import Depends, FastAPI, Header, HTTPException, Query, Request
+from fastapi.exceptions import RequestValidationError
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+from pydantic import BaseModel, Field, TypeAdapter, ValidationError
 import joblib
 import numpy as np
 import os
 from typing import Dict
+import asyncio
+import hmac
 import logging
+import time
+from contextlib import asynccontextmanager
 from datetime import datetime
 
+import metrics
+from admission import AdmissionController, AdmissionRejected
+from audit import AuditLog
+from artifact import is_mmap_artifact, load_mmap_artifact
+from batching import MicroBatcher
+from cache import create_prediction_cache
+from drift import DriftMonitor
+from executor import InferenceExecutor
+from features import (
+    FEATURE_NAMES,
+    check_constraints,
+    feature_constraints,
+    feature_field,
+    records_to_matrix,
+)
+from inference import compile_model, predict_with_bounds
+from model_reload import (
+    CANARY_ROWS,
+    ArtifactWatcher,
+    artifact_fingerprint,
+    check_canary,
+    validate_candidate,
+    warmup_batches,
+)
+from serialization import (
+    ARROW_STREAM_MEDIA_TYPE,
+    BINARY_MEDIA_TYPES,
+    NPY_MEDIA_TYPE,
+    RESPONSE_FORMATS,
+    VALIDATION_MODES,
+    FastJSONResponse,
+    batch_payload,
+    decode_binary_matrix,
+    encode_binary_predictions,
+    loads,
+    prediction_record,
+)
+from streaming import (
+    CSV_HEADER,
+    CSV_MEDIA_TYPES,
+    NDJSON_MEDIA_TYPES,
+    CsvChunkParser,
+    LineTooLong,
+    NdjsonChunkParser,
+    format_csv,
+    format_ndjson,
+    iter_line_chunks,
+)
+from variants import PRIMARY, ModelVariants, parse_variants
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
@@ -20,15 +76,55 @@ app = FastAPI(
 
 model_info = None
 
+MAX_BATCH_SIZE = int(os.getenv("MAX_BATCH_SIZE", "10000"))
+INFERENCE_ENGINE = os.getenv("INFERENCE_ENGINE", "compiled")
+ENGINE_DTYPE = os.getenv("ENGINE_DTYPE", "float64")
+MICRO_BATCHING = os.getenv("MICRO_BATCHING", "true").lower() == "true"
+MICRO_BATCH_MAX_SIZE = int(os.getenv("MICRO_BATCH_MAX_SIZE", "64"))
+MICRO_BATCH_MAX_WAIT_MS = float(os.getenv("MICRO_BATCH_MAX_WAIT_MS", "2"))
+INFERENCE_MODE = os.getenv("INFERENCE_MODE", "thread")
+INFERENCE_WORKERS = int(os.getenv("INFERENCE_WORKERS", "0")) or None
+CACHE_BACKEND = os.getenv("CACHE_BACKEND", "local")
+CACHE_MAX_SIZE = int(os.getenv("CACHE_MAX_SIZE", "100000"))
+CACHE_TTL_SECONDS = int(os.getenv("CACHE_TTL_SECONDS", "3600"))
+CACHE_ROUNDING = (
+    int(os.environ["CACHE_ROUNDING"]) if os.getenv("CACHE_ROUNDING") else None
+)
+STREAM_CHUNK_SIZE = int(os.getenv("STREAM_CHUNK_SIZE", "5000"))
+REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+MODEL_PATH = os.getenv("MODEL_PATH", "../models/housing_model.joblib")
+SERVING_MODEL_PATH = os.getenv(
+    "SERVING_MODEL_PATH", "../models/housing_model_serving.joblib"
+)
+MMAP_MODEL_DIR = os.getenv("MMAP_MODEL_DIR", "../models/housing_model_mmap")
+MODEL_WATCH_INTERVAL = float(os.getenv("MODEL_WATCH_INTERVAL", "10"))
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN")
+READINESS_INTERVAL = float(os.getenv("READINESS_INTERVAL", "30"))
+ADMISSION_CONTROL = os.getenv("ADMISSION_CONTROL", "true").lower() == "true"
+ADMISSION_MAX_ROWS = int(os.getenv("ADMISSION_MAX_ROWS", "20000"))
+ADMISSION_MAX_QUEUE_ROWS = int(os.getenv("ADMISSION_MAX_QUEUE_ROWS", "100000"))
+ADMISSION_QUEUE_TIMEOUT_MS = float(os.getenv("ADMISSION_QUEUE_TIMEOUT_MS", "2000"))
+DEFAULT_DEADLINE_MS = float(os.getenv("DEFAULT_DEADLINE_MS", "0"))
+AUDIT_LOG = os.getenv("AUDIT_LOG", "true").lower() == "true"
+AUDIT_LOG_DIR = os.getenv("AUDIT_LOG_DIR", "../logs/audit")
+AUDIT_FORMAT = os.getenv("AUDIT_FORMAT", "parquet")
+AUDIT_SAMPLE_RATE = float(os.getenv("AUDIT_SAMPLE_RATE", "1.0"))
+AUDIT_BUFFER_SIZE = int(os.getenv("AUDIT_BUFFER_SIZE", "100000"))
+AUDIT_FLUSH_INTERVAL = float(os.getenv("AUDIT_FLUSH_INTERVAL", "30"))
+AUDIT_MAX_FILES = int(os.getenv("AUDIT_MAX_FILES", "1000"))
+MODEL_VARIANTS = os.getenv("MODEL_VARIANTS", "")
+CANDIDATE_MODEL = os.getenv("CANDIDATE_MODEL") or None
+CANDIDATE_TRAFFIC_SHARE = float(os.getenv("CANDIDATE_TRAFFIC_SHARE", "0"))
+SHADOW_MODEL = os.getenv("SHADOW_MODEL") or None
+SHADOW_MAX_PENDING_ROWS = int(os.getenv("SHADOW_MAX_PENDING_ROWS", "10000"))
+
 
 class HousingFeatures(BaseModel):
-    surface: float = Field(..., ge=20, le=500, description="Surface du bien en m²")
-    rooms: int = Field(..., ge=1, le=15, description="Nombre de pièces")
-    age: float = Field(..., ge=0, le=100, description="Âge du bien en années")
-    location_score: float = Field(
-        ..., ge=1, le=10, description="Score de localisation (1=mauvais, 10=excellent)"
-    )
-    garage: bool = Field(..., description="Présence d'un garage")
+    surface: float = feature_field("surface")
+    rooms: int = feature_field("rooms")
+    age: float = feature_field("age")
+    location_score: float = feature_field("location_score")
+    garage: bool = feature_field("garage")
 
     class Config:
         schema_extra = {
@@ -60,17 +156,45 @@ class ModelInfo(BaseModel):
     feature_importance: list
 
 
-def load_model():
-    global model_info
+def resolve_model_path():
+    """
+    Artefact à servir : les artefacts sans scaler produits par export_model.py
+    sont préférés, le format mmap étant partagé entre workers
+    """
+    if INFERENCE_ENGINE == "compiled":
+        if is_mmap_artifact(MMAP_MODEL_DIR):
+            return MMAP_MODEL_DIR
+        if os.path.exists(SERVING_MODEL_PATH):
+            return SERVING_MODEL_PATH
+    return MODEL_PATH
 
-    model_path = "../models/housing_model.joblib"
 
+def read_model(model_path):
+    """
+    Charge et prépare un artefact sans toucher au modèle en service
+    """
     if not os.path.exists(model_path):
         logger.error(f"Modèle non trouvé: {model_path}")
         raise FileNotFoundError(f"Le fichier de modèle {model_path} n'existe pas")
 
+    start = time.perf_counter()
+    if is_mmap_artifact(model_path):
+        info = load_mmap_artifact(model_path)
+    else:
+        info = joblib.load(model_path)
+    info = build_serving_engine(info)
+    # Les anciens artefacts n'ont pas de version : la date d'entraînement la
+    # remplace pour distinguer deux modèles
+    info.setdefault("model_version", f"1.0.0+{info['training_date']}")
+    metrics.MODEL_LOAD_SECONDS.set(time.perf_counter() - start)
+    return info
+
+
+def load_model():
+    global model_info
+
     try:
-        model_info = joblib.load(model_path)
+        model_info = read_model(resolve_model_path())
         logger.info("Modèle chargé avec succès")
         return True
     except Exception as e:
@@ -78,26 +202,523 @@ def load_model():
         raise e
 
 
+def build_serving_engine(info):
+    """
+    Compile la forêt en tableaux NumPy pour éviter RandomForestRegressor.predict
+    """
+    if INFERENCE_ENGINE != "compiled":
+        return info
+
+    compile_model(info, ENGINE_DTYPE)
+    if info.get("engine") is None:
+        logger.info(f"Pas de moteur compilé pour {type(info['model']).__name__}")
+        return info
+    logger.info(
+        f"Moteur compilé: {info['engine'].n_nodes} noeuds, dtype {ENGINE_DTYPE}"
+    )
+    return info
+
+
+def features_to_matrix(features_list):
+    """
+    Assemble une matrice (N, 5) à partir d'une liste de HousingFeatures
+    """
+    feature_matrix = np.empty((len(features_list), len(FEATURE_NAMES)))
+    for i, features in enumerate(features_list):
+        feature_matrix[i] = (
+            features.surface,
+            features.rooms,
+            features.age,
+            features.location_score,
+            1 if features.garage else 0,
+        )
+    return feature_matrix
+
+
+def predict_matrix(feature_matrix, timings=None):
+    return predict_with_bounds(model_info, feature_matrix, timings)
+
+
+def _predict_matrix_timed(feature_matrix):
+    # Les durées sont renvoyées avec le résultat pour être observées dans le
+    # processus principal, quel que soit le mode de l'exécuteur
+    timings = {}
+    return predict_matrix(feature_matrix, timings), timings
+
+
+def _init_inference_worker():
+    # Exécuté une fois par processus du pool : chaque worker a son modèle
+    load_model()
+
+
+executor = InferenceExecutor(
+    INFERENCE_MODE, INFERENCE_WORKERS, initializer=_init_inference_worker
+)
+
+
+async def run_inference(feature_matrix):
+    """
+    Exécute predict_matrix sur l'exécuteur configuré, sans bloquer la boucle
+    """
+    result, timings = await executor.run(_predict_matrix_timed, feature_matrix)
+    metrics.observe_inference(len(feature_matrix), timings)
+    # Même mesure que pour les variantes : l'appel au modèle seul, sans
+    # l'attente du micro-batcher ni le passage par l'exécuteur
+    variants.observe(PRIMARY, timings["scaling"] + timings["model_predict"], result)
+    return result
+
+
+batcher = MicroBatcher(
+    run_inference,
+    max_batch_size=MICRO_BATCH_MAX_SIZE,
+    max_wait_ms=MICRO_BATCH_MAX_WAIT_MS,
+)
+
+prediction_cache = create_prediction_cache(
+    CACHE_BACKEND, CACHE_MAX_SIZE, CACHE_TTL_SECONDS, CACHE_ROUNDING, REDIS_URL
+)
+
+
+def model_cache_scope():
+    return model_info["model_version"]
+
+
+async def compute_predictions(feature_matrix):
+    """
+    Une ligne seule passe par le micro-batcher, un lot directement par
+    l'exécuteur
+    """
+    if batcher.running and len(feature_matrix) == 1:
+        predicted, lower, upper = await batcher.submit(feature_matrix)
+        return np.array([predicted]), np.array([lower]), np.array([upper])
+    return await run_inference(feature_matrix)
+
+
+async def predict_rows(feature_matrix, variant=None):
+    """
+    Prédictions pour une matrice de features, par le modèle principal ou la
+    variante nommée, via le cache s'il est activé
+    """
+    if variant is None:
+        compute, scope = compute_predictions, model_cache_scope()
+    else:
+
+        async def compute(rows):
+            return await variants.predict(variant, rows)
+
+        scope = variants.version(variant)
+    if prediction_cache is None:
+        return await compute(feature_matrix)
+    return await prediction_cache.predict(feature_matrix, scope, compute)
+
+
+def served_version(variant):
+    if variant is None:
+        return model_info["model_version"]
+    return variants.version(variant)
+
+
+admission = (
+    AdmissionController(
+        ADMISSION_MAX_ROWS, ADMISSION_MAX_QUEUE_ROWS, ADMISSION_QUEUE_TIMEOUT_MS
+    )
+    if ADMISSION_CONTROL
+    else None
+)
+if admission is not None:
+    metrics.ADMISSION_ROWS.labels("in_flight").set_function(
+        lambda: admission.in_flight_rows
+    )
+    metrics.ADMISSION_ROWS.labels("queued").set_function(lambda: admission.queued_rows)
+
+
+def check_admin_token(x_admin_token: str | None = Header(default=None)):
+    """
+    Endpoints d'administration : désactivés (404) tant qu'ADMIN_TOKEN n'est
+    pas défini, 403 si l'en-tête X-Admin-Token ne le fournit pas
+    """
+    if not ADMIN_TOKEN:
+        raise HTTPException(
+            status_code=404, detail="Administration désactivée (ADMIN_TOKEN absent)"
+        )
+    if x_admin_token is None or not hmac.compare_digest(
+        x_admin_token.encode(), ADMIN_TOKEN.encode()
+    ):
+        raise HTTPException(status_code=403, detail="Jeton d'administration invalide")
+
+
+def check_admission(
+    request: Request,
+    x_deadline_ms: float | None = Header(
+        default=None,
+        description="Budget de la requête en ms, au-delà elle n'atteint pas le modèle",
+    ),
+):
+    """
+    Avant la validation du corps : fixe l'échéance de la requête et rejette
+    aussitôt si la file d'attente est pleine ou l'échéance déjà dépassée
+    """
+    request.state.deadline = None
+    if x_deadline_ms is not None or DEFAULT_DEADLINE_MS > 0:
+        budget_ms = DEFAULT_DEADLINE_MS if x_deadline_ms is None else x_deadline_ms
+        request.state.deadline = request.state.received_at + budget_ms / 1000
+    if admission is None:
+        return
+    if request.state.deadline is not None and (
+        time.perf_counter() >= request.state.deadline
+    ):
+        admission.reject("deadline")
+    if admission.saturated:
+        admission.reject("queue_full")
+
+
+@asynccontextmanager
+async def admitted(request, rows):
+    """
+    Réserve la capacité du modèle pour `rows` lignes le temps du bloc
+    """
+    if admission is None:
+        yield
+        return
+    async with admission.admit(rows, request.state.deadline):
+        yield
+
+
+variants = ModelVariants(
+    CANDIDATE_MODEL,
+    CANDIDATE_TRAFFIC_SHARE,
+    SHADOW_MODEL,
+    SHADOW_MAX_PENDING_ROWS,
+    workers=INFERENCE_WORKERS,
+    # Le shadow cède la place dès que des requêtes attendent le modèle
+    busy=lambda: admission is not None and admission.queued_rows > 0,
+)
+
+
+async def load_variants():
+    """
+    Charge et valide (canari) les modèles nommés de MODEL_VARIANTS ; une
+    variante invalide est ignorée sans empêcher le démarrage
+    """
+    try:
+        paths = parse_variants(MODEL_VARIANTS)
+    except ValueError as e:
+        logger.error(f"❌ MODEL_VARIANTS ignoré: {e}")
+        return
+    for name, path in paths.items():
+        try:
+            info = await asyncio.to_thread(read_model, path)
+            await asyncio.to_thread(validate_candidate, info, predict_with_bounds)
+        except Exception as e:
+            logger.error(f"❌ Variante {name} ignorée: {e}")
+            continue
+        variants.add(name, info)
+        logger.info(f"Variante {name} chargée: {info['model_version']}")
+
+
+audit_log = (
+    AuditLog(
+        AUDIT_LOG_DIR,
+        FEATURE_NAMES,
+        capacity=AUDIT_BUFFER_SIZE,
+        sample_rate=AUDIT_SAMPLE_RATE,
+        flush_interval=AUDIT_FLUSH_INTERVAL,
+        file_format=AUDIT_FORMAT,
+        max_files=AUDIT_MAX_FILES,
+    )
+    if AUDIT_LOG
+    else None
+)
+
+
+drift_monitor = None
+
+
+def current_drift_monitor():
+    """
+    Moniteur de dérive du modèle en service, recréé quand la référence change
+    (rechargement) ; None pour un artefact sans statistiques de référence
+    """
+    global drift_monitor
+
+    reference = model_info.get("reference_stats") if model_info else None
+    if reference is None:
+        return None
+    if drift_monitor is None or drift_monitor.reference is not reference:
+        drift_monitor = DriftMonitor(
+            reference, FEATURE_NAMES, model_info["model_version"]
+        )
+    return drift_monitor
+
+
+def observe_predictions(request, feature_matrix, predictions, endpoint, variant=None):
+    """
+    Met à jour le suivi de dérive, trace les prédictions dans le journal
+    d'audit et les confie au modèle shadow ; ne bloque jamais
+    """
+    monitor = current_drift_monitor()
+    if monitor is not None:
+        monitor.update(feature_matrix)
+    if variant is None:
+        variants.mirror(feature_matrix, predictions)
+    if audit_log is None:
+        return
+    latency = time.perf_counter() - request.state.received_at
+    audit_log.record(
+        feature_matrix, predictions, served_version(variant), latency, endpoint
+    )
+
+
+_reload_lock = asyncio.Lock()
+reload_status = {"status": "never", "reason": None, "timestamp": None, "error": None}
+
+
+def current_model_fingerprint():
+    return artifact_fingerprint(resolve_model_path())
+
+
+async def reload_model(reason):
+    """
+    Charge le nouvel artefact en arrière-plan, l'échauffe, le valide par des
+    prédictions canari puis le met en service par une simple réaffectation :
+    les requêtes en cours terminent sur l'ancien modèle
+    """
+    global model_info
+
+    async with _reload_lock:
+        fingerprint = current_model_fingerprint()
+        reload_status.update(
+            reason=reason, timestamp=datetime.now().isoformat(), error=None
+        )
+        try:
+            candidate = await asyncio.to_thread(read_model, resolve_model_path())
+            await asyncio.to_thread(validate_candidate, candidate, predict_with_bounds)
+        except Exception as e:
+            reload_status.update(status="rejected", error=str(e))
+            raise
+
+        previous_version = model_info["model_version"] if model_info else None
+        # Workers de processus remplacés avant la bascule : aucune prédiction
+        # de l'ancien modèle n'est servie ni mise en cache sous la nouvelle
+        # version
+        await executor.restart()
+        model_info = candidate
+        watcher.current = fingerprint
+
+        reload_status["status"] = "reloaded"
+        await check_readiness()
+        logger.info(
+            f"Modèle rechargé ({reason}): {previous_version} -> "
+            f"{candidate['model_version']}"
+        )
+        return {
+            "previous_version": previous_version,
+            "model_version": candidate["model_version"],
+        }
+
+
+readiness = {
+    "ready": False,
+    "status": "starting",
+    "model_version": None,
+    "canary": None,
+    "error": None,
+    "checked_at": None,
+}
+_readiness_task = None
+
+
+async def check_readiness(warm_up=False):
+    """
+    Prédictions canari sur le chemin de service (exécuteur configuré), dont
+    le résultat est mis en cache pour les sondes. Avec warm_up, chaque worker
+    prédit d'abord les tailles de lot représentatives.
+    """
+    try:
+        if model_info is None:
+            raise RuntimeError(readiness["error"] or "Modèle non chargé")
+        if warm_up:
+            n_calls = executor.workers if executor.mode == "process" else 1
+            for batch in warmup_batches():
+                await asyncio.gather(
+                    *(executor.run(predict_matrix, batch) for _ in range(n_calls))
+                )
+        predicted = check_canary(*await executor.run(predict_matrix, CANARY_ROWS))
+        readiness.update(
+            ready=True,
+            status="ready",
+            model_version=model_info["model_version"],
+            canary=predicted.tolist(),
+            error=None,
+        )
+    except Exception as e:
+        readiness.update(ready=False, status="not_ready", error=str(e))
+        logger.error(f"❌ Service non prêt: {e}")
+    readiness["checked_at"] = datetime.now().isoformat()
+    return readiness["ready"]
+
+
+async def _refresh_readiness():
+    while True:
+        await asyncio.sleep(READINESS_INTERVAL)
+        await check_readiness()
+
+
+watcher = ArtifactWatcher(
+    current_model_fingerprint,
+    lambda: reload_model("file_watch"),
+    MODEL_WATCH_INTERVAL,
+)
+
+
+_instrumented_paths = None
+
+
+def mark_validated(request):
+    """
+    Fin de l'étape de validation : corps lu et validé par Pydantic
+    """
+    now = time.perf_counter()
+    received_at = getattr(request.state, "received_at", None)
+    if received_at is not None:
+        metrics.observe_stage("validation", now - received_at)
+    return now
+
+
+def mark_serialization_start(request):
+    request.state.serialization_start = time.perf_counter()
+
+
+@app.exception_handler(AdmissionRejected)
+async def admission_rejected_handler(request: Request, exc: AdmissionRejected):
+    metrics.REJECTED.labels(request.url.path, exc.reason).inc()
+    detail = {
+        "queue_full": "Service saturé, réessayer plus tard",
+        "queue_timeout": "Capacité indisponible dans le délai d'attente",
+        "deadline": "Échéance de la requête dépassée avant la prédiction",
+    }[exc.reason]
+    return JSONResponse(
+        status_code=exc.status_code,
+        content={"detail": detail, "reason": exc.reason},
+        headers={"Retry-After": str(exc.retry_after)},
+    )
+
+
+@app.middleware("http")
+async def record_request_metrics(request: Request, call_next):
+    global _instrumented_paths
+    if _instrumented_paths is None:
+        _instrumented_paths = {route.path for route in app.routes}
+    # Chemins inconnus regroupés pour borner la cardinalité des labels
+    path = request.url.path
+    endpoint = path if path in _instrumented_paths else "other"
+
+    request.state.received_at = time.perf_counter()
+    metrics.IN_FLIGHT.labels(endpoint).inc()
+    try:
+        response = await call_next(request)
+    except Exception:
+        metrics.ERRORS.labels(endpoint, "500").inc()
+        raise
+    finally:
+        metrics.IN_FLIGHT.labels(endpoint).dec()
+
+    done = time.perf_counter()
+    serialization_start = getattr(request.state, "serialization_start", None)
+    if serialization_start is not None:
+        metrics.observe_stage("serialization", done - serialization_start)
+    metrics.REQUEST_LATENCY.labels(endpoint).observe(done - request.state.received_at)
+    if response.status_code >= 400:
+        metrics.ERRORS.labels(endpoint, str(response.status_code)).inc()
+    return response
+
+
 @app.on_event("startup")
 async def startup_event():
     """
-    Événement de démarrage - charge le modèle
+    Événement de démarrage - charge le modèle puis l'échauffe sur le chemin
+    de service ; /health/ready ne répond 200 qu'ensuite
     """
+    global _readiness_task
+
     logger.info("Démarrage de l'API Housing Price Prediction")
     try:
         load_model()
         logger.info(f"Modèle prêt - R² Score: {model_info['metrics']['r2_score']:.3f}")
     except Exception as e:
         logger.error(f"❌ Impossible de charger le modèle: {e}")
+        readiness["error"] = f"Chargement du modèle impossible: {e}"
+
+    await executor.start()
+    if MICRO_BATCHING:
+        await batcher.start()
+    start = time.perf_counter()
+    if await check_readiness(warm_up=True):
+        logger.info(f"Échauffement terminé en {time.perf_counter() - start:.2f}s")
+    await load_variants()
+    await variants.start()
+    await watcher.start(current_model_fingerprint())
+    if READINESS_INTERVAL > 0:
+        _readiness_task = asyncio.create_task(_refresh_readiness())
+    if audit_log is not None:
+        await audit_log.start()
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    global _readiness_task
+
+    if _readiness_task is not None:
+        _readiness_task.cancel()
+        _readiness_task = None
+    await watcher.stop()
+    await batcher.stop()
+    await variants.stop()
+    executor.shutdown()
+    if audit_log is not None:
+        await audit_log.stop()
+    if prediction_cache is not None:
+        await prediction_cache.backend.close()
 
 
 @app.get("/health")
 async def health_check():
-    return {
-        "status": "healthy",
-        "timestamp": datetime.now().isoformat(),
-        "model_loaded": model_info is not None,
-    }
+    ready = readiness["ready"]
+    return JSONResponse(
+        status_code=200 if ready else 503,
+        content={
+            "status": "healthy" if ready else "unhealthy",
+            "timestamp": datetime.now().isoformat(),
+            "model_loaded": model_info is not None,
+            "error": readiness["error"],
+        },
+    )
+
+
+@app.get("/health/live")
+async def liveness():
+    """
+    Le processus répond : la boucle asyncio n'est pas bloquée
+    """
+    return {"status": "alive"}
+
+
+@app.get("/health/ready")
+async def readiness_check():
+    """
+    Résultat en cache de la dernière vérification canari (démarrage,
+    rechargement, puis toutes les READINESS_INTERVAL secondes) : une sonde ne
+    déclenche aucune prédiction
+    """
+    return JSONResponse(
+        status_code=200 if readiness["ready"] else 503, content=readiness
+    )
+
+
+@app.get("/metrics")
+async def get_metrics():
+    content, content_type = metrics.render()
+    return Response(content=content, media_type=content_type)
 
 
 @app.get("/model/info", response_model=ModelInfo)
@@ -106,7 +727,7 @@ async def get_model_info():
         raise HTTPException(status_code=503, detail="Modèle non chargé")
 
     return ModelInfo(
-        model_version="1.0.0",
+        model_version=model_info["model_version"],
         training_date=model_info["training_date"],
         training_samples=model_info["training_samples"],
         features=model_info["features"],
@@ -115,99 +736,327 @@ async def get_model_info():
     )
 
 
-@app.post("/predict", response_model=PredictionResponse)
-async def predict_price(features: HousingFeatures):
+@app.get("/model/drift")
+async def get_model_drift():
+    """
+    Écart des features reçues depuis le chargement du modèle (ou la dernière
+    remise à zéro) avec le jeu d'entraînement : PSI sur les déciles, distance
+    KS sur les percentiles, décalage de la moyenne en écarts-types
+    """
     if model_info is None:
         raise HTTPException(status_code=503, detail="Modèle non chargé")
+    monitor = current_drift_monitor()
+    if monitor is None:
+        raise HTTPException(
+            status_code=404,
+            detail="Artefact sans statistiques de référence, réentraîner le modèle",
+        )
+    return monitor.report()
 
-    try:
-        garage_numeric = 1 if features.garage else 0
 
-        feature_array = np.array(
-            [
-                [
-                    features.surface,
-                    features.rooms,
-                    features.age,
-                    features.location_score,
-                    garage_numeric,
-                ]
-            ]
+@app.post("/model/drift/reset", dependencies=[Depends(check_admin_token)])
+async def reset_model_drift():
+    monitor = current_drift_monitor()
+    if monitor is None:
+        raise HTTPException(status_code=404, detail="Aucun suivi de dérive actif")
+    monitor.reset()
+    return {"status": "reset", "since": monitor.since}
+
+
+@app.post("/admin/model/reload", dependencies=[Depends(check_admin_token)])
+async def admin_reload_model():
+    """
+    Recharge l'artefact du modèle sans redémarrage
+    """
+    try:
+        result = await reload_model("admin")
+    except Exception as e:
+        logger.error(f"❌ Rechargement du modèle refusé: {e}")
+        raise HTTPException(
+            status_code=500,
+            detail=f"Rechargement refusé, modèle précédent conservé: {str(e)}",
         )
+    return {**reload_status, **result}
 
-        feature_array_scaled = model_info["scaler"].transform(feature_array)
 
-        predicted_price = model_info["model"].predict(feature_array_scaled)[0]
+@app.get("/admin/model/reload")
+async def admin_reload_status():
+    return {
+        **reload_status,
+        "model_version": model_info["model_version"] if model_info else None,
+    }
 
-        rmse = model_info["metrics"]["rmse"]
-        confidence_lower = max(0, predicted_price - rmse)
-        confidence_upper = predicted_price + rmse
 
-        logger.info(f"Prédiction effectuée: {predicted_price:,.0f}€")
+@app.get("/predict/batching/stats")
+async def get_batching_stats():
+    return {"enabled": batcher.running, **batcher.stats()}
 
-        return PredictionResponse(
-            predicted_price=float(predicted_price),
-            confidence_interval={
-                "lower": float(confidence_lower),
-                "upper": float(confidence_upper),
-            },
-            model_version="1.0.0",
-            prediction_timestamp=datetime.now().isoformat(),
+
+@app.get("/predict/cache/stats")
+async def get_cache_stats():
+    if prediction_cache is None:
+        return {"enabled": False}
+    return {"enabled": True, **prediction_cache.stats()}
+
+
+@app.get("/predict/audit/stats")
+async def get_audit_stats():
+    if audit_log is None:
+        return {"enabled": False}
+    return {"enabled": audit_log.running, **audit_log.stats()}
+
+
+@app.get("/predict/admission/stats")
+async def get_admission_stats():
+    if admission is None:
+        return {"enabled": False}
+    return {"enabled": True, **admission.stats()}
+
+
+@app.get("/predict/variants/stats")
+async def get_variants_stats():
+    """
+    Latence et prix prédits par modèle, écarts du modèle shadow avec le
+    modèle principal sur les mêmes lignes
+    """
+    primary_version = model_info["model_version"] if model_info else None
+    return {"enabled": bool(variants.models), **variants.stats(primary_version)}
+
+
+@app.post("/admin/model/routing", dependencies=[Depends(check_admin_token)])
+async def admin_model_routing(
+    candidate_share: float | None = Query(default=None, ge=0, le=1),
+    shadow: bool | None = Query(default=None),
+):
+    """
+    Modifie à chaud la part de trafic du candidat et active ou coupe le
+    modèle shadow, par exemple pour revenir à 0 sans redémarrage
+    """
+    if candidate_share is not None:
+        variants.candidate_share = candidate_share
+    if shadow is not None:
+        variants.shadow_enabled = shadow
+    logger.info(f"Routage des modèles: {variants.routing()}")
+    return variants.routing()
+
+
+@app.post(
+    "/predict",
+    response_model=PredictionResponse,
+    dependencies=[Depends(check_admission)],
+)
+async def predict_price(features: HousingFeatures, request: Request):
+    assembly_start = mark_validated(request)
+    if model_info is None:
+        raise HTTPException(status_code=503, detail="Modèle non chargé")
+
+    try:
+        feature_matrix = features_to_matrix([features])
+        metrics.observe_stage("feature_assembly", time.perf_counter() - assembly_start)
+        variant = variants.route()
+        async with admitted(request, 1):
+            predictions = await predict_rows(feature_matrix, variant)
+        observe_predictions(request, feature_matrix, predictions, "predict", variant)
+        predicted, lower, upper = predictions
+        predicted_price = predicted[0]
+        confidence_lower = lower[0]
+        confidence_upper = upper[0]
+
+        mark_serialization_start(request)
+        # Construit directement : pas de revalidation par response_model
+        return FastJSONResponse(
+            prediction_record(
+                float(predicted_price),
+                float(confidence_lower),
+                float(confidence_upper),
+                served_version(variant),
+                datetime.now().isoformat(),
+            )
         )
 
+    except AdmissionRejected:
+        raise
     except Exception as e:
         logger.error(f"❌ Erreur lors de la prédiction: {e}")
         raise HTTPException(status_code=500, detail=f"Erreur de prédiction: {str(e)}")
 
 
-@app.post("/predict/batch")
-async def predict_batch(features_list: list[HousingFeatures]):
-    if model_info is None:
-        raise HTTPException(status_code=503, detail="Modèle non chargé")
+_batch_adapter = TypeAdapter(list[HousingFeatures])
 
-    if len(features_list) > 100:
-        raise HTTPException(status_code=400, detail="Maximum 100 prédictions par batch")
 
-    try:
-        predictions = []
+def _batch_openapi():
+    schema = _batch_adapter.json_schema(ref_template="#/components/schemas/{model}")
+    schema.pop("$defs", None)
+    binary = {"schema": {"type": "string", "format": "binary"}}
+    return {
+        "requestBody": {
+            "required": True,
+            "content": {
+                "application/json": {"schema": schema},
+                ARROW_STREAM_MEDIA_TYPE: binary,
+                NPY_MEDIA_TYPE: binary,
+            },
+        }
+    }
+
+
+def _reject_rows(errors):
+    raise HTTPException(
+        status_code=422,
+        detail=[
+            {"row": row, "msg": message}
+            for row, message in sorted(errors.items())[:100]
+        ],
+    )
 
-        for features in features_list:
-            garage_numeric = 1 if features.garage else 0
 
-            feature_array = np.array(
+async def read_batch_matrix(request, media_type, partial):
+    """
+    Matrice (N, 5) du corps de /predict/batch : liste JSON de HousingFeatures,
+    flux Arrow IPC (une colonne par feature) ou matrice .npy.
+    Renvoie (matrice, {ligne: message}) ; en mode strict, toute ligne
+    invalide rejette la requête.
+    """
+    body = await request.body()
+    if media_type in BINARY_MEDIA_TYPES:
+        try:
+            feature_matrix = decode_binary_matrix(media_type, body, FEATURE_NAMES)
+        except ImportError as e:
+            raise HTTPException(status_code=415, detail=f"Format indisponible: {e}")
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        errors = {}
+    elif partial:
+        try:
+            records = loads(body)
+        except ValueError as e:
+            raise HTTPException(status_code=422, detail=f"JSON invalide: {e}")
+        if not isinstance(records, list):
+            raise HTTPException(status_code=422, detail="Liste JSON attendue")
+        feature_matrix, errors = records_to_matrix(records)
+    else:
+        try:
+            features_list = _batch_adapter.validate_json(body)
+        except ValidationError as e:
+            raise RequestValidationError(
                 [
-                    [
-                        features.surface,
-                        features.rooms,
-                        features.age,
-                        features.location_score,
-                        garage_numeric,
-                    ]
+                    {**error, "loc": ("body", *error["loc"])}
+                    for error in e.errors(include_url=False)
                 ]
             )
+        # Bornes déjà vérifiées par Pydantic, à partir des mêmes définitions
+        return features_to_matrix(features_list), {}
 
-            feature_array_scaled = model_info["scaler"].transform(feature_array)
-            predicted_price = model_info["model"].predict(feature_array_scaled)[0]
-
-            rmse = model_info["metrics"]["rmse"]
-            confidence_lower = max(0, predicted_price - rmse)
-            confidence_upper = predicted_price + rmse
-
-            predictions.append(
-                PredictionResponse(
-                    predicted_price=float(predicted_price),
-                    confidence_interval={
-                        "lower": float(confidence_lower),
-                        "upper": float(confidence_upper),
-                    },
-                    model_version="1.0.0",
-                    prediction_timestamp=datetime.now().isoformat(),
-                )
-            )
+    # Comparaisons vectorisées sur toute la matrice
+    errors = {**check_constraints(feature_matrix, feature_constraints()), **errors}
+    if errors and not partial:
+        _reject_rows(errors)
+    return feature_matrix, errors
+
+
+@app.post(
+    "/predict/batch",
+    openapi_extra=_batch_openapi(),
+    dependencies=[Depends(check_admission)],
+)
+async def predict_batch(
+    request: Request,
+    response_format: str = Query(
+        "records",
+        alias="format",
+        pattern=f"^({'|'.join(RESPONSE_FORMATS)})$",
+        description="records (un objet par maison) ou columnar (un tableau par champ)",
+    ),
+    validation: str = Query(
+        "strict",
+        pattern=f"^({'|'.join(VALIDATION_MODES)})$",
+        description=(
+            "strict (une ligne invalide rejette le lot) ou partial (les lignes "
+            "valides sont prédites, les autres listées dans `errors`)"
+        ),
+    ),
+):
+    """
+    Prédiction en lot. Le format de la requête suit son Content-Type
+    (JSON, Arrow IPC ou .npy) ; les formats binaires reçoivent une réponse
+    dans le même format.
+    """
+    media_type = request.headers.get("content-type", "").split(";")[0].strip()
+    if media_type not in ("", "application/json", *BINARY_MEDIA_TYPES):
+        raise HTTPException(
+            status_code=415, detail=f"Content-Type non supporté: {media_type}"
+        )
 
-        logger.info(f"Batch de {len(predictions)} prédictions effectué")
-        return {"predictions": predictions}
+    partial = validation == "partial"
+    feature_matrix, errors = await read_batch_matrix(request, media_type, partial)
+    assembly_start = mark_validated(request)
+    if model_info is None:
+        raise HTTPException(status_code=503, detail="Modèle non chargé")
+
+    if len(feature_matrix) > MAX_BATCH_SIZE:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Maximum {MAX_BATCH_SIZE} prédictions par batch",
+        )
+
+    try:
+        rows = None
+        if partial:
+            valid = np.ones(len(feature_matrix), dtype=bool)
+            valid[list(errors)] = False
+            rows = np.flatnonzero(valid)
+            feature_matrix = feature_matrix[valid]
+        metrics.observe_stage("feature_assembly", time.perf_counter() - assembly_start)
+        variant = variants.route()
+        async with admitted(request, len(feature_matrix)):
+            predictions = await predict_rows(feature_matrix, variant)
+        observe_predictions(
+            request, feature_matrix, predictions, "predict_batch", variant
+        )
 
+        mark_serialization_start(request)
+        # Un seul horodatage pour tout le lot
+        model_version = served_version(variant)
+        timestamp = datetime.now().isoformat()
+        logger.info(
+            f"Batch de {len(feature_matrix)} prédictions effectué"
+            + (f", {len(errors)} lignes rejetées" if errors else "")
+        )
+
+        if media_type in BINARY_MEDIA_TYPES:
+            if partial:
+                # Une ligne de sortie par ligne d'entrée, NaN si rejetée
+                full = np.full((len(valid), 3), np.nan)
+                full[rows] = np.column_stack(predictions)
+                predictions = tuple(full.T)
+            metadata = {
+                "model_version": model_version,
+                "prediction_timestamp": timestamp,
+            }
+            return Response(
+                content=encode_binary_predictions(
+                    media_type, predictions, metadata, errors if partial else None
+                ),
+                media_type=media_type,
+                headers={
+                    "X-Model-Version": model_version,
+                    "X-Prediction-Timestamp": timestamp,
+                    "X-Rejected-Rows": str(len(errors)),
+                },
+            )
+        return FastJSONResponse(
+            batch_payload(
+                predictions,
+                model_version,
+                timestamp,
+                response_format,
+                rows,
+                errors if partial else None,
+            )
+        )
+
+    except AdmissionRejected:
+        raise
     except Exception as e:
         logger.error(f"❌ Erreur lors de la prédiction batch: {e}")
         raise HTTPException(
@@ -215,6 +1064,83 @@ async def predict_batch(features_list: list[HousingFeatures]):
         )
 
 
+@app.post("/predict/stream", dependencies=[Depends(check_admission)])
+async def predict_stream(request: Request):
+    """
+    Scoring en flux d'un corps NDJSON ou CSV (colonnes de housing_data.csv),
+    traité par paquets de STREAM_CHUNK_SIZE lignes : la mémoire reste constante
+    quelle que soit la taille du fichier. Chaque paquet passe par le contrôle
+    d'admission ; un rejet en cours de flux termine la réponse par une ligne
+    d'erreur.
+    """
+    if model_info is None:
+        raise HTTPException(status_code=503, detail="Modèle non chargé")
+
+    media_type = request.headers.get("content-type", "").split(";")[0].strip()
+    if media_type in CSV_MEDIA_TYPES:
+        parser, formatter = CsvChunkParser(FEATURE_NAMES), format_csv
+    elif media_type in NDJSON_MEDIA_TYPES:
+        parser, formatter = NdjsonChunkParser(FEATURE_NAMES), format_ndjson
+    else:
+        raise HTTPException(
+            status_code=415,
+            detail=f"Content-Type non supporté: {media_type or 'absent'}",
+        )
+
+    constraints = feature_constraints()
+    chunks = iter_line_chunks(request.stream(), STREAM_CHUNK_SIZE)
+    try:
+        first_chunk = await anext(chunks, None)
+        first_parsed = parser.parse(first_chunk) if first_chunk else None
+    except LineTooLong as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    async def score_chunk(first_row, table, errors):
+        errors = {**check_constraints(table, constraints), **errors}
+        valid = np.ones(len(table), dtype=bool)
+        valid[list(errors)] = False
+        if valid.any():
+            async with admitted(request, int(valid.sum())):
+                predictions = await run_inference(table[valid])
+            observe_predictions(request, table[valid], predictions, "predict_stream")
+        else:
+            predictions = (np.empty(0),) * 3
+        return formatter(first_row, predictions, errors, len(table))
+
+    async def generate():
+        if formatter is format_csv:
+            yield CSV_HEADER
+        if first_parsed is None:
+            return
+
+        first_row = 0
+        table, errors = first_parsed
+        try:
+            yield await score_chunk(first_row, table, errors)
+            first_row += len(table)
+
+            async for lines in chunks:
+                table, errors = parser.parse(lines)
+                yield await score_chunk(first_row, table, errors)
+                first_row += len(table)
+        except (AdmissionRejected, LineTooLong) as e:
+            # Statut déjà envoyé : la dernière ligne porte le motif de l'arrêt
+            if isinstance(e, AdmissionRejected):
+                metrics.REJECTED.labels(request.url.path, e.reason).inc()
+                message = f"Flux interrompu par le contrôle d'admission: {e.reason}"
+            else:
+                message = f"Flux interrompu: {e}"
+            logger.warning(f"Scoring en flux interrompu à la ligne {first_row}: {e}")
+            yield formatter(first_row, (np.empty(0),) * 3, {0: message}, 1)
+            return
+
+        logger.info(f"Scoring en flux terminé: {first_row} lignes")
+
+    return StreamingResponse(generate(), media_type=media_type)
+
+
 if __name__ == "__main__":
     import uvicorn
 
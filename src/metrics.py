@@ -0,0 +1,86 @@
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+)
+
+LATENCY_BUCKETS = (
+    0.00001,
+    0.00005,
+    0.0001,
+    0.00025,
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+)
+BATCH_SIZE_BUCKETS = tuple(2**i for i in range(17))
+
+# Étapes du chemin d'inférence : validation (lecture + Pydantic), assemblage
+# de la matrice, normalisation, prédiction du modèle, sérialisation
+STAGES = ("validation", "feature_assembly", "scaling", "model_predict", "serialization")
+
+REQUEST_LATENCY = Histogram(
+    "housing_request_latency_seconds",
+    "Latence totale des requêtes HTTP",
+    ["endpoint"],
+    buckets=LATENCY_BUCKETS,
+)
+STAGE_LATENCY = Histogram(
+    "housing_inference_stage_seconds",
+    "Latence de chaque étape du chemin d'inférence",
+    ["stage"],
+    buckets=LATENCY_BUCKETS,
+)
+BATCH_SIZE = Histogram(
+    "housing_inference_batch_size",
+    "Nombre de lignes par appel au modèle",
+    buckets=BATCH_SIZE_BUCKETS,
+)
+IN_FLIGHT = Gauge(
+    "housing_requests_in_flight", "Requêtes en cours de traitement", ["endpoint"]
+)
+MODEL_LOAD_SECONDS = Gauge(
+    "housing_model_load_seconds", "Durée du dernier chargement du modèle"
+)
+ERRORS = Counter(
+    "housing_request_errors_total",
+    "Réponses en erreur (4xx/5xx) par endpoint",
+    ["endpoint", "status"],
+)
+
+REJECTED = Counter(
+    "housing_requests_rejected_total",
+    "Requêtes rejetées par le contrôle d'admission (file pleine, attente, échéance)",
+    ["endpoint", "reason"],
+)
+ADMISSION_ROWS = Gauge(
+    "housing_admission_rows",
+    "Lignes admises en cours de prédiction (in_flight) et en attente (queued)",
+    ["state"],
+)
+
+
+def observe_stage(stage, seconds):
+    STAGE_LATENCY.labels(stage).observe(seconds)
+
+
+def observe_inference(batch_size, timings):
+    BATCH_SIZE.observe(batch_size)
+    for stage, seconds in timings.items():
+        STAGE_LATENCY.labels(stage).observe(seconds)
+
+
+def render():
+    return generate_latest(), CONTENT_TYPE_LATEST
@@ -0,0 +1,112 @@
+import asyncio
+import logging
+import os
+
+import numpy as np
+
+from artifact import METADATA_FILE
+
+logger = logging.getLogger(__name__)
+
+# Biens représentatifs (surface, rooms, age, location_score, garage)
+CANARY_ROWS = np.array(
+    [
+        [85.0, 4, 10.0, 7.5, 1],
+        [45.0, 2, 60.0, 3.0, 0],
+        [250.0, 8, 2.0, 9.5, 1],
+    ]
+)
+# Tailles de lot représentatives : une ligne, un micro-lot, un gros lot
+WARMUP_BATCH_SIZES = (1, 64, 1000)
+
+
+def artifact_fingerprint(path):
+    """
+    (chemin, mtime, taille) de l'artefact, ou None s'il n'existe pas
+    """
+    target = os.path.join(path, METADATA_FILE) if os.path.isdir(path) else path
+    try:
+        stat = os.stat(target)
+    except FileNotFoundError:
+        return None
+    return (path, stat.st_mtime_ns, stat.st_size)
+
+
+def warmup_batches():
+    return [
+        np.resize(CANARY_ROWS, (batch_size, CANARY_ROWS.shape[1]))
+        for batch_size in WARMUP_BATCH_SIZES
+    ]
+
+
+def validate_candidate(info, predict_fn):
+    """
+    Échauffe un modèle candidat puis vérifie des prédictions canari.
+    Lève ValueError si le modèle ne doit pas être mis en service.
+    """
+    for batch in warmup_batches():
+        predict_fn(info, batch)
+    return check_canary(*predict_fn(info, CANARY_ROWS))
+
+
+def check_canary(predicted, lower, upper):
+    """
+    Vérifie les prédictions des lignes CANARY_ROWS ; lève ValueError
+    """
+    if not np.all(np.isfinite(predicted)) or np.any(predicted <= 0):
+        raise ValueError(f"Prédictions canari invalides: {predicted.tolist()}")
+    bounds_ok = np.isfinite(lower) & np.isfinite(upper)
+    if not np.all(bounds_ok & (lower <= predicted) & (predicted <= upper)):
+        raise ValueError("Intervalle de confiance canari incohérent")
+    return predicted
+
+
+class ArtifactWatcher:
+    """
+    Surveille l'empreinte de l'artefact servi et déclenche `on_change` quand
+    elle a changé et est restée stable pendant un intervalle complet (pour ne
+    pas recharger un fichier en cours d'écriture).
+    """
+
+    def __init__(self, fingerprint_fn, on_change, interval):
+        self.fingerprint_fn = fingerprint_fn
+        self.on_change = on_change
+        self.interval = interval
+        self.current = None
+        self._candidate = None
+        self._task = None
+
+    async def start(self, current):
+        self.current = current
+        if self.interval > 0 and self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            fingerprint = self.fingerprint_fn()
+            if fingerprint is None or fingerprint == self.current:
+                self._candidate = None
+                continue
+            if fingerprint != self._candidate:
+                self._candidate = fingerprint
+                continue
+
+            logger.info(f"Nouvel artefact détecté: {fingerprint[0]}")
+            # L'empreinte est mémorisée même en cas d'échec : un artefact
+            # refusé n'est retenté qu'après une nouvelle modification
+            self.current = fingerprint
+            self._candidate = None
+            try:
+                await self.on_change()
+            except Exception as e:
+                logger.error(f"❌ Rechargement automatique refusé: {e}")
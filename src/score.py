@@ -0,0 +1,170 @@
+import argparse
+import multiprocessing
+import os
+import resource
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import joblib
+import numpy as np
+import pandas as pd
+
+from inference import compile_model, predict_with_bounds
+
+MODEL_PATH = "../models/housing_model.joblib"
+
+# Modèle chargé une fois par processus du pool
+_worker_model_info = None
+
+
+def _init_worker(model_path):
+    global _worker_model_info
+    _worker_model_info = compile_model(joblib.load(model_path))
+
+
+def _score_chunk(feature_matrix):
+    return np.column_stack(predict_with_bounds(_worker_model_info, feature_matrix))
+
+
+def read_chunks(path, chunk_size):
+    """
+    Lit un fichier CSV ou Parquet par paquets de chunk_size lignes
+    """
+    if path.endswith(".parquet"):
+        try:
+            import pyarrow.parquet as pq
+        except ImportError as e:
+            raise ImportError("La lecture Parquet nécessite le paquet 'pyarrow'") from e
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunk_size):
+            yield batch.to_pandas()
+    else:
+        yield from pd.read_csv(path, chunksize=chunk_size)
+
+
+class ChunkWriter:
+    """
+    Écrit les paquets scorés à la suite, en CSV ou en Parquet
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.parquet = path.endswith(".parquet")
+        self._writer = None
+        self._header = True
+
+    def write(self, df):
+        if self.parquet:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+
+            table = pa.Table.from_pandas(df, preserve_index=False)
+            if self._writer is None:
+                self._writer = pq.ParquetWriter(self.path, table.schema)
+            self._writer.write_table(table)
+        else:
+            df.to_csv(
+                self.path,
+                mode="w" if self._header else "a",
+                header=self._header,
+                index=False,
+            )
+            self._header = False
+
+    def close(self):
+        if self._writer is not None:
+            self._writer.close()
+
+
+def peak_memory_mb():
+    """
+    Pic de mémoire résidente (Mo) du processus principal et des workers
+    """
+    parent = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    children = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / 1024
+    return parent, children
+
+
+def score_file(
+    input_path, output_path, model_path=MODEL_PATH, chunk_size=100_000, workers=None
+):
+    """
+    Score un fichier par paquets sur un pool de processus, en conservant
+    l'ordre des lignes d'entrée
+    """
+    features = joblib.load(model_path)["features"]
+    workers = workers or os.cpu_count() or 1
+    writer = ChunkWriter(output_path)
+    n_rows = 0
+    start = time.perf_counter()
+
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=_init_worker,
+        initargs=(model_path,),
+    ) as pool:
+        # Au plus 2 paquets en vol par worker : la mémoire reste bornée
+        pending = deque()
+
+        def flush_oldest():
+            chunk, future = pending.popleft()
+            scored = future.result()
+            chunk = chunk.assign(
+                predicted_price=scored[:, 0], lower=scored[:, 1], upper=scored[:, 2]
+            )
+            writer.write(chunk)
+            return len(chunk)
+
+        try:
+            for chunk in read_chunks(input_path, chunk_size):
+                feature_matrix = chunk[features].to_numpy(dtype=np.float64)
+                pending.append((chunk, pool.submit(_score_chunk, feature_matrix)))
+                if len(pending) >= 2 * workers:
+                    n_rows += flush_oldest()
+            while pending:
+                n_rows += flush_oldest()
+        finally:
+            writer.close()
+
+    elapsed = time.perf_counter() - start
+    parent_mb, workers_mb = peak_memory_mb()
+    return {
+        "rows": n_rows,
+        "seconds": elapsed,
+        "rows_per_second": n_rows / elapsed if elapsed else 0.0,
+        "peak_memory_mb": parent_mb,
+        "peak_worker_memory_mb": workers_mb,
+        "workers": workers,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Scoring hors ligne d'un fichier CSV ou Parquet"
+    )
+    parser.add_argument("input", help="Fichier d'entrée (.csv ou .parquet)")
+    parser.add_argument("output", help="Fichier de sortie (.csv ou .parquet)")
+    parser.add_argument("--model", default=MODEL_PATH, help="Artefact du modèle")
+    parser.add_argument("--chunk-size", type=int, default=100_000)
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
+
+    print(f"Scoring de {args.input} avec {args.model}...")
+    report = score_file(
+        args.input, args.output, args.model, args.chunk_size, args.workers
+    )
+
+    print(f"Prédictions sauvegardées dans '{args.output}'")
+    print(f"- Lignes: {report['rows']:,}")
+    print(
+        f"- Durée: {report['seconds']:.2f}s ({report['rows_per_second']:,.0f} lignes/s)"
+    )
+    print(
+        f"- Pic mémoire: {report['peak_memory_mb']:.0f} Mo (principal), "
+        f"{report['peak_worker_memory_mb']:.0f} Mo (worker)"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,190 @@
+import io
+import json
+
+import numpy as np
+from fastapi.responses import Response
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - repli sur la bibliothèque standard
+    orjson = None
+
+RESPONSE_FORMATS = ("records", "columnar")
+VALIDATION_MODES = ("strict", "partial")
+
+ARROW_STREAM_MEDIA_TYPE = "application/vnd.apache.arrow.stream"
+NPY_MEDIA_TYPE = "application/x-npy"
+BINARY_MEDIA_TYPES = (ARROW_STREAM_MEDIA_TYPE, NPY_MEDIA_TYPE)
+PREDICTION_COLUMNS = ("predicted_price", "lower", "upper")
+
+
+def dumps(content):
+    """
+    Encode en JSON (octets) ; orjson sérialise directement les tableaux NumPy
+    """
+    if orjson is not None:
+        return orjson.dumps(content, option=orjson.OPT_SERIALIZE_NUMPY)
+    return json.dumps(content, separators=(",", ":"), default=_to_builtin).encode()
+
+
+def loads(content):
+    if orjson is not None:
+        return orjson.loads(content)
+    return json.loads(content)
+
+
+def _to_builtin(value):
+    if isinstance(value, (np.ndarray, np.generic)):
+        return value.tolist()
+    raise TypeError(f"Type non sérialisable en JSON: {type(value).__name__}")
+
+
+class FastJSONResponse(Response):
+    """
+    Réponse JSON déjà construite : ni validation Pydantic ni jsonable_encoder
+    """
+
+    media_type = "application/json"
+
+    def render(self, content):
+        return dumps(content)
+
+
+def prediction_record(predicted, lower, upper, model_version, timestamp):
+    return {
+        "predicted_price": predicted,
+        "confidence_interval": {"lower": lower, "upper": upper},
+        "model_version": model_version,
+        "prediction_timestamp": timestamp,
+    }
+
+
+def batch_payload(
+    predictions,
+    model_version,
+    timestamp,
+    response_format="records",
+    rows=None,
+    errors=None,
+):
+    """
+    Corps de /predict/batch à partir des tableaux (prix, borne basse, borne
+    haute). "columnar" renvoie les tableaux tels quels, sans objet par ligne.
+    En validation partielle, `rows` donne l'indice d'entrée de chaque
+    prédiction et `errors` les lignes rejetées.
+    """
+    predicted, lower, upper = predictions
+    if response_format == "columnar":
+        payload = {
+            "predicted_price": np.ascontiguousarray(predicted, dtype=np.float64),
+            "lower": np.ascontiguousarray(lower, dtype=np.float64),
+            "upper": np.ascontiguousarray(upper, dtype=np.float64),
+            "model_version": model_version,
+            "prediction_timestamp": timestamp,
+        }
+        if rows is not None:
+            payload["rows"] = np.ascontiguousarray(rows, dtype=np.int64)
+    else:
+        records = [
+            prediction_record(price, low, up, model_version, timestamp)
+            for price, low, up in zip(
+                predicted.tolist(), lower.tolist(), upper.tolist()
+            )
+        ]
+        if rows is not None:
+            for record, row in zip(records, rows.tolist()):
+                record["row"] = row
+        payload = {"predictions": records}
+
+    if errors is not None:
+        payload["errors"] = [
+            {"row": row, "msg": message} for row, message in sorted(errors.items())
+        ]
+    return payload
+
+
+def decode_npy_matrix(body, n_features):
+    """
+    Matrice (N, n_features) au format .npy (np.save), vue directe sur le corps
+    de la requête sans copie pour du float64 little-endian
+    """
+    buffer = io.BytesIO(body)
+    try:
+        version = np.lib.format.read_magic(buffer)
+        if version == (1, 0):
+            shape, fortran_order, dtype = np.lib.format.read_array_header_1_0(buffer)
+        else:
+            shape, fortran_order, dtype = np.lib.format.read_array_header_2_0(buffer)
+    except ValueError as e:
+        raise ValueError(f"En-tête .npy invalide: {e}") from e
+
+    if dtype.kind not in "fiub" or len(shape) != 2 or shape[1] != n_features:
+        raise ValueError(
+            f"Matrice numérique (N, {n_features}) attendue, reçu {shape} {dtype}"
+        )
+    count = shape[0] * shape[1]
+    if len(body) - buffer.tell() < count * dtype.itemsize:
+        raise ValueError("Corps .npy tronqué")
+
+    matrix = np.frombuffer(body, dtype=dtype, count=count, offset=buffer.tell())
+    matrix = matrix.reshape(shape, order="F" if fortran_order else "C")
+    return matrix.astype(np.float64, copy=False)
+
+
+def decode_arrow_features(body, feature_names):
+    """
+    Matrice (N, features) à partir d'un flux Arrow IPC avec une colonne par
+    feature ; les colonnes sont lues sans copie puis rangées dans la matrice
+    """
+    import pyarrow as pa
+
+    try:
+        table = pa.ipc.open_stream(body).read_all()
+    except pa.ArrowInvalid as e:
+        raise ValueError(f"Flux Arrow invalide: {e}") from e
+
+    missing = [name for name in feature_names if name not in table.column_names]
+    if missing:
+        raise ValueError(f"Colonnes manquantes dans le flux Arrow: {missing}")
+
+    matrix = np.empty((table.num_rows, len(feature_names)))
+    for j, name in enumerate(feature_names):
+        column = table.column(name)
+        if column.null_count:
+            raise ValueError(f"Valeurs nulles dans la colonne {name}")
+        try:
+            matrix[:, j] = column.to_numpy()
+        except (TypeError, ValueError, pa.ArrowException) as e:
+            raise ValueError(f"Colonne {name} non numérique") from e
+    return matrix
+
+
+def decode_binary_matrix(media_type, body, feature_names):
+    if media_type == ARROW_STREAM_MEDIA_TYPE:
+        return decode_arrow_features(body, feature_names)
+    return decode_npy_matrix(body, len(feature_names))
+
+
+def encode_binary_predictions(media_type, predictions, metadata, errors=None):
+    """
+    Prédictions (prix, borne basse, borne haute) dans le format de la requête :
+    flux Arrow à trois colonnes, ou matrice .npy (N, 3). Les lignes rejetées
+    (`errors`) sont à NaN ; en Arrow, une colonne `error` donne le motif.
+    """
+    if media_type == ARROW_STREAM_MEDIA_TYPE:
+        import pyarrow as pa
+
+        columns = dict(zip(PREDICTION_COLUMNS, predictions))
+        if errors is not None:
+            columns["error"] = pa.array(
+                [errors.get(i) for i in range(len(predictions[0]))], pa.string()
+            )
+        table = pa.table(columns, metadata=metadata)
+        sink = pa.BufferOutputStream()
+        with pa.ipc.new_stream(sink, table.schema) as writer:
+            writer.write_table(table)
+        return sink.getvalue().to_pybytes()
+
+    buffer = io.BytesIO()
+    np.save(buffer, np.column_stack(predictions).astype("<f8"), allow_pickle=False)
+    return buffer.getvalue()
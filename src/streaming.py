@@ -0,0 +1,153 @@
+import io
+
+import numpy as np
+
+from features import records_to_matrix
+from serialization import dumps, loads
+
+NDJSON_MEDIA_TYPES = ("application/x-ndjson", "application/jsonl")
+CSV_MEDIA_TYPES = ("text/csv",)
+
+CSV_HEADER = "row,predicted_price,lower,upper,error\n"
+
+# Une ligne de features tient en une centaine d'octets
+MAX_LINE_BYTES = 64 * 1024
+
+
+class LineTooLong(ValueError):
+    pass
+
+
+async def iter_line_chunks(byte_stream, chunk_size, max_line_bytes=MAX_LINE_BYTES):
+    """
+    Découpe un flux d'octets en paquets d'au plus chunk_size lignes non vides,
+    sans jamais garder plus d'un paquet et d'une ligne partielle en mémoire.
+    Lève LineTooLong dès qu'une ligne dépasse max_line_bytes.
+    """
+    buffer = b""
+    lines = []
+    async for data in byte_stream:
+        buffer += data
+        *complete, buffer = buffer.split(b"\n")
+        if len(buffer) > max_line_bytes:
+            raise LineTooLong(f"Ligne de plus de {max_line_bytes} octets")
+        for line in complete:
+            if len(line) > max_line_bytes:
+                raise LineTooLong(f"Ligne de plus de {max_line_bytes} octets")
+            if line.strip():
+                lines.append(line)
+                if len(lines) >= chunk_size:
+                    yield lines
+                    lines = []
+    if buffer.strip():
+        lines.append(buffer)
+    if lines:
+        yield lines
+
+
+class CsvChunkParser:
+    """
+    Lit des lignes CSV au format de data/housing_data.csv : la première ligne
+    est l'en-tête, les colonnes supplémentaires (price...) sont ignorées
+    """
+
+    def __init__(self, feature_names):
+        self.feature_names = feature_names
+        self.columns = None
+
+    def parse(self, lines):
+        if self.columns is None:
+            header = lines[0].decode().strip().split(",")
+            missing = [name for name in self.feature_names if name not in header]
+            if missing:
+                raise ValueError(f"Colonnes manquantes dans l'en-tête CSV: {missing}")
+            self.columns = [header.index(name) for name in self.feature_names]
+            lines = lines[1:]
+
+        if not lines:
+            return np.empty((0, len(self.feature_names))), {}
+
+        try:
+            table = np.loadtxt(
+                io.BytesIO(b"\n".join(lines)),
+                delimiter=",",
+                usecols=self.columns,
+                ndmin=2,
+            )
+            if len(table) == len(lines):
+                return table, {}
+        except ValueError:
+            pass
+
+        # Chemin lent : mêmes conversions et mêmes messages que /predict/batch
+        # en validation partielle (booléens "true", "yes"...)
+        records = []
+        for line in lines:
+            values = line.decode().strip().split(",")
+            records.append(
+                {
+                    name: values[j].strip()
+                    for name, j in zip(self.feature_names, self.columns)
+                    if j < len(values)
+                }
+            )
+        return records_to_matrix(records, self.feature_names)
+
+
+class NdjsonChunkParser:
+    """
+    Lit des lignes JSON, un objet HousingFeatures par ligne
+    """
+
+    def __init__(self, feature_names):
+        self.feature_names = feature_names
+
+    def parse(self, lines):
+        records = []
+        decode_errors = {}
+        for i, line in enumerate(lines):
+            try:
+                records.append(loads(line))
+            except ValueError as e:
+                records.append(None)
+                decode_errors[i] = f"Ligne JSON invalide: {e}"
+        # Mêmes conversions et mêmes messages que /predict/batch en validation
+        # partielle
+        table, errors = records_to_matrix(records, self.feature_names)
+        return table, {**errors, **decode_errors}
+
+
+def format_ndjson(first_row, predictions, errors, n_rows):
+    predicted, lower, upper = (values.tolist() for values in predictions)
+    out = []
+    position = 0
+    for i in range(n_rows):
+        if i in errors:
+            record = {"row": first_row + i, "error": errors[i]}
+        else:
+            record = {
+                "row": first_row + i,
+                "predicted_price": predicted[position],
+                "lower": lower[position],
+                "upper": upper[position],
+            }
+            position += 1
+        out.append(dumps(record))
+    return (b"\n".join(out) + b"\n").decode()
+
+
+def format_csv(first_row, predictions, errors, n_rows):
+    predicted, lower, upper = (values.tolist() for values in predictions)
+    out = []
+    position = 0
+    for i in range(n_rows):
+        if i in errors:
+            message = errors[i].replace('"', "'")
+            out.append(f'{first_row + i},,,,"{message}"')
+        else:
+            out.append(
+                f"{first_row + i},{predicted[position]!r},"
+                f"{lower[position]!r},{upper[position]!r},"
+            )
+            position += 1
+    return "\n".join(out) + "\n"
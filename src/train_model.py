@@ -1,31 +1,74 @@
 import pandas as pd
 import numpy as np
-from sklearn.model_selection import train_test_split
-from sklearn.ensemble import RandomForestRegressor
+from sklearn.ensemble import HistGradientBoostingRegressor, RandomForestRegressor
+from sklearn.inspection import permutation_importance
 from sklearn.preprocessing import StandardScaler
 from sklearn.metrics import mean_absolute_error, mean_squared_error, r2_score
+from sklearn.model_selection import train_test_split
+import argparse
 import joblib
 import os
+import resource
+import time
+from contextlib import contextmanager
 from datetime import datetime
 
+from drift import reference_statistics
+from export_model import export_serving_model, remove_serving_artifacts
+from inference import (
+    DEFAULT_INTERVAL_QUANTILES,
+    calibrate_interval,
+    compile_model,
+    interval_coverage,
+)
+from tuning import save_search_report, search_hyperparameters
 
-def generate_synthetic_data(n_samples=1000):
-    np.random.seed(42)
+DATA_PATH = "../data/housing_data.csv"
+SEARCH_REPORT_PATH = "../models/housing_model_search.json"
+# Jeu de test glissant (features brutes), réutilisé par incremental_train.py
+HOLDOUT_PATH = "../models/housing_holdout.npz"
+HOLDOUT_SIZE = 20_000
+DEFAULT_FOREST_PARAMS = {"n_estimators": 100, "max_depth": 10}
+FEATURES = ["surface", "rooms", "age", "location_score", "garage"]
+
+# Types compacts : 14 octets par ligne au lieu de 48 en float64
+COMPACT_DTYPES = {
+    "surface": np.float32,
+    "rooms": np.uint8,
+    "age": np.float32,
+    "location_score": np.float32,
+    "garage": np.uint8,
+    "price": np.float32,
+}
 
-    surface = np.random.normal(100, 30, n_samples)
+MODEL_TYPES = ("random_forest", "hist_gradient_boosting")
+# Lignes brutes gardées pour le contrôle de parité de l'artefact de service
+PARITY_SAMPLE_SIZE = 100_000
+# Part du jeu d'entraînement réservée à la calibration de l'intervalle
+CALIBRATION_FRACTION = 0.1
+CALIBRATION_MAX_ROWS = 100_000
+IMPORTANCE_SAMPLE_SIZE = 10_000
+
+
+def _simulate(random, n_samples):
+    """
+    Tire un jeu de données avec `random`, le module np.random (graine globale)
+    ou un np.random.Generator
+    """
+    surface = random.normal(100, 30, n_samples)
     surface = np.clip(surface, 20, 300)
 
-    rooms = np.random.poisson(4, n_samples)
+    rooms = random.poisson(4, n_samples)
     rooms = np.clip(rooms, 1, 10)
 
-    age = np.random.exponential(20, n_samples)
+    age = random.exponential(20, n_samples)
     age = np.clip(age, 0, 100)
 
-    location_score = np.random.uniform(1, 10, n_samples)
+    location_score = random.uniform(1, 10, n_samples)
 
-    garage = np.random.binomial(1, 0.6, n_samples)
+    garage = random.binomial(1, 0.6, n_samples)
 
-    price_per_sqm = np.random.uniform(2000, 5000, n_samples)
+    price_per_sqm = random.uniform(2000, 5000, n_samples)
 
     price = (
         surface
@@ -35,11 +78,11 @@ def generate_synthetic_data(n_samples=1000):
         * (1 + garage * 0.1)
     )
 
-    noise = np.random.normal(0, price * 0.1, n_samples)
+    noise = random.normal(0, price * 0.1, n_samples)
     price = price + noise
     price = np.clip(price, 50000, 2000000)
 
-    df = pd.DataFrame(
+    return pd.DataFrame(
         {
             "surface": surface,
             "rooms": rooms,
@@ -50,52 +93,340 @@ def generate_synthetic_data(n_samples=1000):
         }
     )
 
-    return df
 
+def generate_synthetic_data(n_samples=1000):
+    np.random.seed(42)
+    return _simulate(np.random, n_samples)
+
+
+def iter_synthetic_chunks(n_samples, chunk_size=1_000_000, seed=42):
+    """
+    Génère le jeu de données par paquets aux types compacts ; chaque paquet a
+    sa propre graine, la mémoire reste bornée à un paquet
+    """
+    n_chunks = -(-n_samples // chunk_size)
+    seeds = np.random.SeedSequence(seed).spawn(n_chunks)
+    for i, chunk_seed in enumerate(seeds):
+        n_rows = min(chunk_size, n_samples - i * chunk_size)
+        yield _simulate(np.random.default_rng(chunk_seed), n_rows).astype(
+            COMPACT_DTYPES
+        )
 
-def train_model():
-    print("Génération des données d'entraînement...")
-    df = generate_synthetic_data(2000)
 
-    os.makedirs("../data", exist_ok=True)
-    df.to_csv("../data/housing_data.csv", index=False)
-    print(f"Données sauvegardées: {len(df)} échantillons")
+def write_dataset(path, n_samples, chunk_size=1_000_000):
+    """
+    Parquet écrit paquet par paquet ; le CSV historique est généré d'un bloc
+    """
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    if not path.endswith(".parquet"):
+        generate_synthetic_data(n_samples).to_csv(path, index=False)
+        return
+
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    writer = None
+    try:
+        for chunk in iter_synthetic_chunks(n_samples, chunk_size):
+            table = pa.Table.from_pandas(chunk, preserve_index=False)
+            if writer is None:
+                writer = pq.ParquetWriter(path, table.schema)
+            writer.write_table(table)
+    finally:
+        if writer is not None:
+            writer.close()
+
+
+def load_dataset(path, chunk_size=1_000_000, compact=None):
+    """
+    Charge features et prix. Par défaut (CSV) en float64 d'un bloc ; en mode
+    compact (défaut pour Parquet) dans deux tableaux float32 remplis paquet
+    par paquet, sans DataFrame complet intermédiaire
+    """
+    if compact is None:
+        compact = path.endswith(".parquet")
+    if not compact:
+        if path.endswith(".parquet"):
+            df = pd.read_parquet(path, columns=FEATURES + ["price"])
+        else:
+            df = pd.read_csv(path)
+        return (
+            df[FEATURES].to_numpy(dtype=np.float64, copy=True),
+            df["price"].to_numpy(dtype=np.float64, copy=True),
+        )
+
+    if path.endswith(".parquet"):
+        import pyarrow.parquet as pq
+
+        parquet_file = pq.ParquetFile(path)
+        n_rows = parquet_file.metadata.num_rows
+        X = np.empty((n_rows, len(FEATURES)), dtype=np.float32)
+        y = np.empty(n_rows, dtype=np.float32)
+        position = 0
+        for batch in parquet_file.iter_batches(
+            batch_size=chunk_size, columns=FEATURES + ["price"]
+        ):
+            rows = slice(position, position + batch.num_rows)
+            for j, name in enumerate(FEATURES):
+                X[rows, j] = batch.column(name).to_numpy()
+            y[rows] = batch.column("price").to_numpy()
+            position += batch.num_rows
+        return X, y
+
+    X_parts, y_parts = [], []
+    for chunk in pd.read_csv(path, chunksize=chunk_size, dtype=COMPACT_DTYPES):
+        X_parts.append(chunk[FEATURES].to_numpy(dtype=np.float32))
+        y_parts.append(chunk["price"].to_numpy(dtype=np.float32))
+    return np.concatenate(X_parts), np.concatenate(y_parts)
+
+
+def split_in_place(X, y, test_size=0.2, seed=42):
+    """
+    Permute X et y en place, colonne par colonne (une seule colonne
+    temporaire), et renvoie des vues (X_train, X_test, y_train, y_test) :
+    aucune copie du jeu complet
+    """
+    permutation = np.random.default_rng(seed).permutation(len(y))
+    for j in range(X.shape[1]):
+        X[:, j] = X[permutation, j]
+    y[:] = y[permutation]
+
+    n_test = int(round(len(y) * test_size))
+    return X[n_test:], X[:n_test], y[n_test:], y[:n_test]
+
+
+def split_dataset(X, y, compact, test_size=0.2, seed=42):
+    """
+    Découpage train/test : train_test_split en mémoire par défaut,
+    split_in_place (vues, sans copie) en mode compact
+    """
+    if compact:
+        return split_in_place(X, y, test_size, seed)
+    return train_test_split(X, y, test_size=test_size, random_state=seed)
+
+
+def calibration_size(n_train):
+    return min(int(round(n_train * CALIBRATION_FRACTION)), CALIBRATION_MAX_ROWS)
+
+
+def split_calibration(X_train, y_train, n_calibration):
+    """
+    Vues (X_fit, X_calibration, y_fit, y_calibration) : les n_calibration
+    dernières lignes d'entraînement ne servent qu'à calibrer l'intervalle
+    """
+    n_fit = len(y_train) - n_calibration
+    return X_train[:n_fit], X_train[n_fit:], y_train[:n_fit], y_train[n_fit:]
+
+
+def save_holdout(X, y, path=HOLDOUT_PATH):
+    """
+    Garde les HOLDOUT_SIZE lignes les plus récentes (features brutes, prix)
+    """
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    np.savez(path, X=X[-HOLDOUT_SIZE:], y=y[-HOLDOUT_SIZE:])
+
+
+def load_holdout(path=HOLDOUT_PATH):
+    if not os.path.exists(path):
+        return None
+    with np.load(path) as holdout:
+        return holdout["X"], holdout["y"]
+
+
+def current_rss_mb():
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+    except (OSError, ValueError):
+        return float("nan")
+
 
-    X = df[["surface", "rooms", "age", "location_score", "garage"]]
-    y = df["price"]
+def peak_rss_mb():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
 
-    X_train, X_test, y_train, y_test = train_test_split(
-        X, y, test_size=0.2, random_state=42
+
+class StageProfiler:
+    """
+    Durée et mémoire résidente (courante et pic) de chaque étape
+    """
+
+    def __init__(self):
+        self.stages = []
+
+    @contextmanager
+    def stage(self, name):
+        start = time.perf_counter()
+        yield
+        record = {
+            "stage": name,
+            "seconds": time.perf_counter() - start,
+            "rss_mb": current_rss_mb(),
+            "peak_rss_mb": peak_rss_mb(),
+        }
+        self.stages.append(record)
+        print(
+            f"[{name}] {record['seconds']:.2f}s, RSS {record['rss_mb']:.0f} Mo, "
+            f"pic {record['peak_rss_mb']:.0f} Mo"
+        )
+
+
+def build_model(model_type, n_samples, params=None):
+    """
+    `params` est exprimé comme pour la forêt ; pour le boosting,
+    n_estimators devient max_iter (max_depth et min_samples_leaf gardent
+    leur nom)
+    """
+    if model_type == "hist_gradient_boosting":
+        params = dict(params or {})
+        # Features discrétisées en 255 classes (uint8) : adapté aux gros volumes
+        return HistGradientBoostingRegressor(
+            max_iter=params.pop("n_estimators", 300),
+            learning_rate=0.1,
+            early_stopping=n_samples > 10_000,
+            random_state=42,
+            **params,
+        )
+    return RandomForestRegressor(
+        **(params or DEFAULT_FOREST_PARAMS), random_state=42, n_jobs=-1
     )
 
-    print("Préprocessing des données...")
-    scaler = StandardScaler()
-    X_train_scaled = scaler.fit_transform(X_train)
-    X_test_scaled = scaler.transform(X_test)
 
-    print("Entraînement du modèle...")
-    model = RandomForestRegressor(
-        n_estimators=100, max_depth=10, random_state=42, n_jobs=-1
+def compute_feature_importance(model, X_test, y_test):
+    if hasattr(model, "feature_importances_"):
+        importances = model.feature_importances_
+    else:
+        n_rows = min(len(y_test), IMPORTANCE_SAMPLE_SIZE)
+        importances = permutation_importance(
+            model, X_test[:n_rows], y_test[:n_rows], n_repeats=3, random_state=42
+        ).importances_mean
+    return pd.DataFrame({"feature": FEATURES, "importance": importances}).sort_values(
+        "importance", ascending=False
+    )
+
+
+def train_model(
+    n_samples=2000,
+    model_type="random_forest",
+    data_path=DATA_PATH,
+    chunk_size=1_000_000,
+    interval_quantiles=DEFAULT_INTERVAL_QUANTILES,
+    calibrate=False,
+    search_budget=None,
+    compact=None,
+):
+    """
+    `calibrate` réserve CALIBRATION_FRACTION des lignes d'entraînement (au plus
+    CALIBRATION_MAX_ROWS) à la calibration de l'intervalle : la forêt servie
+    est alors entraînée sur moins de lignes. Sans calibration, l'intervalle
+    est celui des quantiles bruts des arbres.
+
+    `compact` (défaut : vrai pour un fichier Parquet) charge les données en
+    float32 paquet par paquet et les découpe en place, pour les gros volumes.
+
+    Si `search_budget` est fourni (max_p99_ms, max_batch_p99_ms,
+    max_artifact_mb, n_iter, cv_folds, workers), les hyperparamètres de la
+    forêt sont choisis par tuning.search_hyperparameters
+    """
+    if model_type not in MODEL_TYPES:
+        raise ValueError(f"Type de modèle inconnu: {model_type}")
+    if search_budget is not None and model_type != "random_forest":
+        raise ValueError("La recherche d'hyperparamètres porte sur la forêt")
+    profiler = StageProfiler()
+
+    print("Génération des données d'entraînement...")
+    with profiler.stage("génération"):
+        write_dataset(data_path, n_samples, chunk_size)
+    print(f"Données sauvegardées: {n_samples:,} échantillons dans '{data_path}'")
+
+    with profiler.stage("chargement"):
+        if compact is None:
+            compact = data_path.endswith(".parquet")
+        X, y = load_dataset(data_path, chunk_size, compact)
+
+    with profiler.stage("découpage"):
+        X_train, X_test, y_train, y_test = split_dataset(X, y, compact)
+        del X, y
+        X_parity = X_test[:PARITY_SAMPLE_SIZE].astype(np.float64)
+        holdout = X_test[:HOLDOUT_SIZE].copy(), y_test[:HOLDOUT_SIZE].copy()
+
+    with profiler.stage("statistiques de référence"):
+        # Avant normalisation : l'API compare les features brutes reçues
+        reference_stats = reference_statistics(X_train, FEATURES)
+
+    scaler = None
+    if model_type == "random_forest":
+        print("Préprocessing des données...")
+        with profiler.stage("normalisation"):
+            # Normalisation en place (en mode compact, des vues du jeu chargé)
+            scaler = StandardScaler().fit(X_train)
+            scaler.transform(X_train, copy=False)
+            scaler.transform(X_test, copy=False)
+
+    params, search = None, None
+    if search_budget is not None:
+        print("Recherche d'hyperparamètres...")
+        with profiler.stage("recherche"):
+            best, candidates, front = search_hyperparameters(
+                X_train,
+                y_train,
+                **search_budget,
+                interval_quantiles=interval_quantiles,
+            )
+            save_search_report(
+                SEARCH_REPORT_PATH, best, candidates, front, search_budget
+            )
+        params = best["params"]
+        search = {"selected": best, "pareto_front": front}
+        print(
+            f"Configuration retenue: {params} ({len(front)} candidats sur le "
+            f"front de Pareto, détail dans '{SEARCH_REPORT_PATH}')"
+        )
+
+    n_calibration = 0
+    if model_type == "random_forest" and calibrate:
+        n_calibration = calibration_size(len(y_train))
+    X_train, X_calibration, y_train, y_calibration = split_calibration(
+        X_train, y_train, n_calibration
     )
 
-    model.fit(X_train_scaled, y_train)
+    print("Entraînement du modèle...")
+    model = build_model(model_type, n_samples, params)
+    with profiler.stage("entraînement"):
+        model.fit(X_train, y_train)
+
+    with profiler.stage("évaluation"):
+        y_pred = model.predict(X_test)
 
-    y_pred = model.predict(X_test_scaled)
+        mae = mean_absolute_error(y_test, y_pred)
+        mse = mean_squared_error(y_test, y_pred)
+        r2 = r2_score(y_test, y_pred)
+        rmse = np.sqrt(mse)
 
-    mae = mean_absolute_error(y_test, y_pred)
-    mse = mean_squared_error(y_test, y_pred)
-    r2 = r2_score(y_test, y_pred)
-    rmse = np.sqrt(mse)
+        interval = None
+        if model_type == "random_forest":
+            compiled = compile_model({"model": model})
+            if calibrate:
+                # Calibré sur des lignes écartées de l'entraînement
+                interval = calibrate_interval(
+                    compiled, X_calibration, y_calibration, interval_quantiles
+                )
+            else:
+                interval = {"quantiles": list(interval_quantiles), "scale": 1.0}
+            # Couverture toujours mesurée sur le jeu de test
+            interval["coverage"] = interval_coverage(compiled, X_test, y_test, interval)
+
+        feature_importance = compute_feature_importance(model, X_test, y_test)
 
     print("\nMétriques du modèle:")
     print(f"- R² Score: {r2:.3f}")
     print(f"- MAE: {mae:,.0f}€")
     print(f"- RMSE: {rmse:,.0f}€")
     print(f"- MSE: {mse:,.0f}")
-
-    feature_importance = pd.DataFrame(
-        {"feature": X.columns, "importance": model.feature_importances_}
-    ).sort_values("importance", ascending=False)
+    if interval is not None:
+        print(
+            f"- Intervalle quantiles {interval['quantiles']}: "
+            f"facteur {interval['scale']:.2f}, couverture {interval['coverage']:.1%}"
+        )
 
     print("\nImportance des features:")
     for _, row in feature_importance.iterrows():
@@ -103,23 +434,109 @@ def train_model():
 
     os.makedirs("../models", exist_ok=True)
 
+    trained_at = datetime.now()
     model_info = {
         "model": model,
         "scaler": scaler,
-        "features": list(X.columns),
-        "metrics": {"r2_score": r2, "mae": mae, "rmse": rmse, "mse": mse},
+        "features": FEATURES,
+        "metrics": {
+            "r2_score": float(r2),
+            "mae": float(mae),
+            "rmse": float(rmse),
+            "mse": float(mse),
+        },
         "feature_importance": feature_importance.to_dict("records"),
-        "training_date": datetime.now().isoformat(),
-        "training_samples": len(X_train),
+        "training_date": trained_at.isoformat(),
+        "model_version": trained_at.strftime("1.0.%Y%m%d%H%M%S"),
+        "training_samples": len(y_train),
+        "calibration_samples": n_calibration,
+        "compact_data": compact,
+        "training_profile": profiler.stages,
+        "hyperparameters": model.get_params(),
+        "reference_stats": reference_stats,
     }
+    if search is not None:
+        model_info["search"] = search
+    if interval is not None:
+        model_info["interval"] = interval
 
-    joblib.dump(model_info, "../models/housing_model.joblib")
-    print("Modèle sauvegardé dans '../models/housing_model.joblib'")
+    with profiler.stage("sauvegarde"):
+        joblib.dump(model_info, "../models/housing_model.joblib")
+        print("Modèle sauvegardé dans '../models/housing_model.joblib'")
+        save_holdout(*holdout)
+
+        if model_type == "random_forest":
+            print("\nExport de l'artefact de service sans scaler...")
+            export_serving_model(model_info, X_parity)
+        else:
+            # Pas de moteur compilé : l'API doit servir housing_model.joblib
+            remove_serving_artifacts()
 
     return model_info
 
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Entraînement du modèle")
+    parser.add_argument("--samples", type=int, default=2000)
+    parser.add_argument("--model", choices=MODEL_TYPES, default="random_forest")
+    parser.add_argument(
+        "--data",
+        default=DATA_PATH,
+        help="Fichier du jeu de données (.csv ou .parquet pour les gros volumes)",
+    )
+    parser.add_argument("--chunk-size", type=int, default=1_000_000)
+    parser.add_argument(
+        "--compact",
+        action=argparse.BooleanOptionalAction,
+        default=None,
+        help="Chargement float32 par paquets et découpage en place "
+        "(défaut : activé pour un fichier .parquet)",
+    )
+    parser.add_argument(
+        "--interval-quantiles",
+        default=os.getenv("INTERVAL_QUANTILES", "0.05,0.95"),
+        help="Quantiles des arbres pour l'intervalle de confiance",
+    )
+    parser.add_argument(
+        "--calibrate",
+        action=argparse.BooleanOptionalAction,
+        default=False,
+        help="Calibre l'intervalle sur 10 %% des lignes d'entraînement, "
+        "écartées de l'entraînement de la forêt",
+    )
+    parser.add_argument(
+        "--search",
+        action="store_true",
+        help="Choisit les hyperparamètres de la forêt sous budget de latence",
+    )
+    parser.add_argument("--search-iter", type=int, default=None)
+    parser.add_argument("--cv-folds", type=int, default=3)
+    parser.add_argument("--search-workers", type=int, default=None)
+    parser.add_argument("--max-p99-ms", type=float, default=1.0)
+    parser.add_argument("--max-batch-p99-ms", type=float, default=None)
+    parser.add_argument("--max-artifact-mb", type=float, default=50.0)
+    args = parser.parse_args()
+
+    search_budget = None
+    if args.search:
+        search_budget = {
+            "max_p99_ms": args.max_p99_ms,
+            "max_batch_p99_ms": args.max_batch_p99_ms,
+            "max_artifact_mb": args.max_artifact_mb,
+            "n_iter": args.search_iter,
+            "cv_folds": args.cv_folds,
+            "workers": args.search_workers,
+        }
+
     print("Démarrage de l'entraînement du modèle de prédiction immobilière")
-    model_info = train_model()
+    model_info = train_model(
+        args.samples,
+        args.model,
+        args.data,
+        args.chunk_size,
+        tuple(float(q) for q in args.interval_quantiles.split(",")),
+        calibrate=args.calibrate,
+        search_budget=search_budget,
+        compact=args.compact,
+    )
     print("\nEntraînement terminé avec succès!")
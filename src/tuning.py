@@ -0,0 +1,191 @@
+import itertools
+import json
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from sklearn.ensemble import RandomForestRegressor
+from sklearn.model_selection import KFold
+
+from inference import compile_model, predict_with_bounds
+
+SEARCH_SPACE = {
+    "n_estimators": [25, 50, 100, 200],
+    "max_depth": [6, 8, 10, 14],
+    "min_samples_leaf": [1, 5],
+}
+# Au-delà, la validation croisée porte sur un échantillon du jeu d'entraînement
+SEARCH_SAMPLE_SIZE = 200_000
+LATENCY_BATCH_SIZE = 1000
+
+# Jeu de données chargé une fois par processus du pool
+_worker_data = None
+
+
+def _init_worker(X, y):
+    global _worker_data
+    _worker_data = (X, y)
+
+
+def candidate_grid(space=SEARCH_SPACE, n_iter=None, seed=42):
+    """
+    Toutes les combinaisons de l'espace, ou n_iter tirées au hasard
+    """
+    names = list(space)
+    grid = [dict(zip(names, values)) for values in itertools.product(*space.values())]
+    if n_iter is not None and n_iter < len(grid):
+        rng = np.random.default_rng(seed)
+        grid = [grid[i] for i in sorted(rng.choice(len(grid), n_iter, replace=False))]
+    return grid
+
+
+def cross_validate(params, cv_folds=3, seed=42):
+    """
+    RMSE moyen de la configuration en validation croisée
+    """
+    X, y = _worker_data
+    folds = KFold(cv_folds, shuffle=True, random_state=seed)
+    errors = []
+    for train_index, test_index in folds.split(X):
+        model = RandomForestRegressor(**params, random_state=seed, n_jobs=1)
+        model.fit(X[train_index], y[train_index])
+        residuals = model.predict(X[test_index]) - y[test_index]
+        errors.append(float(np.sqrt(np.mean(residuals.astype(np.float64) ** 2))))
+    return float(np.mean(errors))
+
+
+def measure_latency(predict, X, n_calls=1000, batch_size=LATENCY_BATCH_SIZE):
+    """
+    p50/p99 (ms) de `predict` sur une ligne et sur un lot
+    """
+    results = {}
+    batch = np.resize(X, (batch_size, X.shape[1]))
+    for name, rows, calls in (
+        ("single", X[:1], n_calls),
+        ("batch", batch, max(10, n_calls // 20)),
+    ):
+        predict(rows)
+        latencies = []
+        for _ in range(calls):
+            start = time.perf_counter()
+            predict(rows)
+            latencies.append(time.perf_counter() - start)
+        results[f"{name}_p50_ms"] = float(np.percentile(latencies, 50) * 1000)
+        results[f"{name}_p99_ms"] = float(np.percentile(latencies, 99) * 1000)
+    return results
+
+
+def artifact_size_mb(engine):
+    return sum(array.nbytes for array in engine.arrays().values()) / 2**20
+
+
+def pareto_front(candidates, keys=("cv_rmse", "single_p99_ms", "artifact_mb")):
+    """
+    Candidats qu'aucun autre n'égale ou ne bat sur tous les critères à la fois
+    """
+
+    def dominates(a, b):
+        return all(a[k] <= b[k] for k in keys) and any(a[k] < b[k] for k in keys)
+
+    return [
+        c for c in candidates if not any(dominates(other, c) for other in candidates)
+    ]
+
+
+def select_candidate(
+    candidates, max_p99_ms, max_batch_p99_ms=None, max_artifact_mb=None
+):
+    """
+    Le plus précis des candidats qui respectent les budgets.
+    Lève ValueError si aucun ne les respecte.
+    """
+    feasible = [
+        c
+        for c in candidates
+        if c["single_p99_ms"] <= max_p99_ms
+        and (max_batch_p99_ms is None or c["batch_p99_ms"] <= max_batch_p99_ms)
+        and (max_artifact_mb is None or c["artifact_mb"] <= max_artifact_mb)
+    ]
+    if not feasible:
+        raise ValueError(
+            f"Aucune configuration ne respecte les budgets (p99 {max_p99_ms} ms, "
+            f"lot {max_batch_p99_ms} ms, {max_artifact_mb} Mo)"
+        )
+    return min(feasible, key=lambda c: c["cv_rmse"])
+
+
+def search_hyperparameters(
+    X,
+    y,
+    max_p99_ms,
+    max_batch_p99_ms=None,
+    max_artifact_mb=None,
+    space=SEARCH_SPACE,
+    n_iter=None,
+    cv_folds=3,
+    workers=None,
+    interval_quantiles=None,
+):
+    """
+    Validation croisée des configurations en parallèle sur un pool de
+    processus, puis mesure de la latence de service de chaque candidat :
+    predict_with_bounds sur le moteur compilé, avec l'intervalle par
+    quantiles des arbres si `interval_quantiles` est fourni.
+    Renvoie (meilleure configuration, tous les candidats, front de Pareto).
+    """
+    n_rows = min(len(y), SEARCH_SAMPLE_SIZE)
+    X, y = X[:n_rows], y[:n_rows]
+    grid = candidate_grid(space, n_iter)
+    workers = min(workers or os.cpu_count() or 1, len(grid))
+
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=_init_worker,
+        initargs=(X, y),
+    ) as pool:
+        futures = [pool.submit(cross_validate, params, cv_folds) for params in grid]
+        cv_scores = [future.result() for future in futures]
+
+    # Latence mesurée une fois le pool arrêté, un candidat à la fois : le
+    # modèle est réentraîné sur tout l'échantillon puis libéré
+    candidates = []
+    for params, cv_rmse in zip(grid, cv_scores):
+        model = RandomForestRegressor(**params, random_state=42, n_jobs=-1)
+        info = compile_model({"model": model.fit(X, y), "metrics": {"rmse": cv_rmse}})
+        if interval_quantiles is not None:
+            # Le facteur d'échelle ne change pas le coût de la prédiction
+            info["interval"] = {"quantiles": list(interval_quantiles), "scale": 1.0}
+        candidate = {
+            "params": params,
+            "cv_rmse": cv_rmse,
+            "artifact_mb": artifact_size_mb(info["engine"]),
+            **measure_latency(lambda rows: predict_with_bounds(info, rows), X),
+        }
+        candidates.append(candidate)
+        print(
+            f"- {params}: RMSE {cv_rmse:,.0f}€, "
+            f"p99 {candidate['single_p99_ms']:.3f} ms (1 ligne), "
+            f"{candidate['batch_p99_ms']:.2f} ms ({LATENCY_BATCH_SIZE} lignes), "
+            f"{candidate['artifact_mb']:.1f} Mo"
+        )
+
+    best = select_candidate(candidates, max_p99_ms, max_batch_p99_ms, max_artifact_mb)
+    return best, candidates, pareto_front(candidates)
+
+
+def save_search_report(path, best, candidates, front, budgets):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as f:
+        json.dump(
+            {
+                "budgets": budgets,
+                "selected": best,
+                "pareto_front": front,
+                "candidates": candidates,
+            },
+            f,
+            indent=2,
+        )
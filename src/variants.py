@@ -0,0 +1,413 @@
+import asyncio
+import logging
+import random
+import time
+from bisect import bisect_left
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from inference import predict_with_bounds
+
+logger = logging.getLogger(__name__)
+
+PRIMARY = "primary"
+# Classes de latence en ms, 20 par décade de 10 µs à 100 s
+LATENCY_EDGES_MS = np.geomspace(0.01, 100_000, 141)
+_LATENCY_EDGES = LATENCY_EDGES_MS.tolist()
+LATENCY_PERCENTILES = (50, 95, 99)
+
+
+def timed_call(fn, *args):
+    """
+    (résultat, durée de fn) mesurée dans le thread qui exécute fn : la
+    latence d'un modèle est celle de l'appel au modèle, sans l'attente du pool
+    """
+    start = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - start
+
+
+def parse_variants(spec):
+    """
+    "nom=chemin,nom=chemin" -> {nom: chemin}
+    """
+    variants = {}
+    for item in filter(None, (part.strip() for part in spec.split(","))):
+        name, sep, path = item.partition("=")
+        name, path = name.strip(), path.strip()
+        if not sep or not name or not path:
+            raise ValueError(f"Variante invalide: '{item}' (attendu nom=chemin)")
+        if name == PRIMARY or name in variants:
+            raise ValueError(f"Nom de variante réservé ou en double: {name}")
+        variants[name] = path
+    return variants
+
+
+class ModelStats:
+    """
+    Latence des appels au modèle (histogramme à classes fixes) et
+    distribution des prix prédits, pour comparer les modèles entre eux.
+    Pour tous les modèles, la durée observée est celle de l'appel
+    predict_with_bounds sur la matrice passée au modèle.
+    """
+
+    def __init__(self):
+        self.calls = 0
+        self.rows = 0
+        self.seconds = 0.0
+        self.latency_counts = np.zeros(len(LATENCY_EDGES_MS) + 1, np.int64)
+        self.predicted_sum = 0.0
+        self.width_sum = 0.0
+
+    def observe(self, seconds, predictions):
+        predicted, lower, upper = predictions
+        self.calls += 1
+        self.seconds += seconds
+        self.latency_counts[bisect_left(_LATENCY_EDGES, seconds * 1000)] += 1
+        if len(predicted) == 1:
+            # Une ligne (/predict) : pas de réduction NumPy
+            self.rows += 1
+            self.predicted_sum += float(predicted[0])
+            self.width_sum += float(upper[0] - lower[0])
+            return
+        self.rows += len(predicted)
+        self.predicted_sum += float(np.sum(predicted))
+        self.width_sum += float(np.sum(upper) - np.sum(lower))
+
+    def latency_percentile(self, q):
+        """
+        Borne haute de la classe qui contient le q-ième percentile
+        """
+        if not self.calls:
+            return None
+        index = np.searchsorted(np.cumsum(self.latency_counts), q / 100 * self.calls)
+        return float(LATENCY_EDGES_MS[min(index, len(LATENCY_EDGES_MS) - 1)])
+
+    def stats(self, per_call=True):
+        """
+        `per_call=False` ne garde que la latence par ligne, pour un modèle
+        dont les appels ne correspondent pas à des requêtes
+        """
+        rows = max(self.rows, 1)
+        stats = {
+            "calls": self.calls,
+            "rows": self.rows,
+            "latency_ms_per_row": self.seconds * 1000 / rows,
+            "mean_predicted_price": self.predicted_sum / rows if self.rows else None,
+            "mean_interval_width": self.width_sum / rows if self.rows else None,
+        }
+        if per_call:
+            stats["mean_rows_per_call"] = self.rows / max(self.calls, 1)
+            stats["mean_latency_ms"] = self.seconds * 1000 / max(self.calls, 1)
+            stats.update(
+                (f"p{q}_latency_ms", self.latency_percentile(q))
+                for q in LATENCY_PERCENTILES
+            )
+        return stats
+
+
+class PredictionDiff:
+    """
+    Écarts entre les prédictions d'un modèle shadow et celles du modèle
+    principal sur les mêmes lignes, cumulés en sommes
+    """
+
+    def __init__(self):
+        self.rows = 0
+        self.sum_diff = 0.0
+        self.sum_abs = 0.0
+        self.sum_squares = 0.0
+        self.sum_relative = 0.0
+        self.max_abs = 0.0
+        self.within_interval = 0
+
+    def update(self, primary, shadow):
+        predicted, lower, upper = primary
+        shadow_predicted = shadow[0]
+        diff = shadow_predicted - predicted
+        abs_diff = np.abs(diff)
+        self.rows += len(diff)
+        self.sum_diff += float(diff.sum())
+        self.sum_abs += float(abs_diff.sum())
+        self.sum_squares += float(np.dot(diff, diff))
+        self.sum_relative += float((abs_diff / np.maximum(np.abs(predicted), 1)).sum())
+        if len(diff):
+            self.max_abs = max(self.max_abs, float(abs_diff.max()))
+        self.within_interval += int(
+            np.count_nonzero((shadow_predicted >= lower) & (shadow_predicted <= upper))
+        )
+
+    def stats(self):
+        if not self.rows:
+            return {"rows": 0}
+        return {
+            "rows": self.rows,
+            "mean_diff": self.sum_diff / self.rows,
+            "mean_abs_diff": self.sum_abs / self.rows,
+            "rmse_diff": float(np.sqrt(self.sum_squares / self.rows)),
+            "max_abs_diff": self.max_abs,
+            "mean_relative_diff": self.sum_relative / self.rows,
+            "within_primary_interval": self.within_interval / self.rows,
+        }
+
+
+class ShadowMirror:
+    """
+    Rejoue sur un modèle shadow les lignes déjà prédites par le modèle
+    principal, hors du chemin des requêtes.
+
+    record() ajoute seulement une référence aux tableaux dans une file bornée
+    en lignes ; au-delà de capacity les lignes sont abandonnées (et comptées).
+    Une tâche de fond, réveillée dès que max_batch_rows lignes attendent ou
+    toutes les flush_interval secondes, les prédit par lots d'au plus
+    max_batch_rows sur un thread dédié, un lot à la fois : le coût fixe d'un
+    appel au modèle est payé une fois par lot, pas par requête. Tant que
+    busy() est vrai (requêtes en attente devant le modèle principal), la
+    file est vidée sans prédire.
+    """
+
+    def __init__(
+        self,
+        predict_fn,
+        capacity=10_000,
+        max_batch_rows=1000,
+        flush_interval=1.0,
+        busy=None,
+    ):
+        self.predict_fn = predict_fn
+        self.capacity = capacity
+        self.max_batch_rows = max_batch_rows
+        self.flush_interval = flush_interval
+        self.busy = busy
+        self._pending = deque()
+        self.pending_rows = 0
+        self._pool = None
+        self._wakeup = None
+        self._worker = None
+        self.model = ModelStats()
+        self.diff = PredictionDiff()
+        self.mirrored = 0
+        self.dropped = 0
+        self.shed = 0
+        self.errors = 0
+
+    @property
+    def running(self):
+        return self._worker is not None and not self._worker.done()
+
+    def record(self, feature_matrix, predictions):
+        n_rows = len(feature_matrix)
+        if not n_rows:
+            return
+        if self.pending_rows + n_rows > self.capacity:
+            self.dropped += n_rows
+            return
+        self._pending.append((feature_matrix, predictions))
+        self.pending_rows += n_rows
+        if self._wakeup is not None and self.pending_rows >= self.max_batch_rows:
+            self._wakeup.set()
+
+    def _take(self):
+        """
+        Assemble les premières entrées de la file en un seul lot
+        """
+        items, rows = [], 0
+        while self._pending and (
+            not items or rows + len(self._pending[0][0]) <= self.max_batch_rows
+        ):
+            item = self._pending.popleft()
+            items.append(item)
+            rows += len(item[0])
+        self.pending_rows -= rows
+        if len(items) == 1:
+            return items[0]
+        matrix = np.concatenate([matrix for matrix, _ in items])
+        primary = tuple(
+            np.concatenate([np.asarray(p[j]) for _, p in items]) for j in range(3)
+        )
+        return matrix, primary
+
+    async def process(self):
+        """
+        Prédit les lignes en attente et cumule les écarts avec le modèle
+        principal
+        """
+        while self._pending:
+            if self.busy is not None and self.busy():
+                self.shed += self.pending_rows
+                self._pending.clear()
+                self.pending_rows = 0
+                return
+            matrix, primary = self._take()
+            try:
+                if self._pool is None:
+                    shadow, seconds = timed_call(self.predict_fn, matrix)
+                else:
+                    loop = asyncio.get_running_loop()
+                    shadow, seconds = await loop.run_in_executor(
+                        self._pool, timed_call, self.predict_fn, matrix
+                    )
+            except Exception as e:
+                self.errors += len(matrix)
+                logger.error(f"❌ Prédiction shadow impossible: {e}")
+                continue
+            self.model.observe(seconds, shadow)
+            self.diff.update(tuple(np.asarray(p) for p in primary), shadow)
+            self.mirrored += len(matrix)
+
+    async def start(self):
+        if self.running:
+            return
+        self._pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="shadow")
+        self._wakeup = asyncio.Event()
+        self._worker = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self.running:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+        self._worker = None
+        self._wakeup = None
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+    async def _run(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            await self.process()
+
+    def stats(self):
+        return {
+            "capacity": self.capacity,
+            "pending_rows": self.pending_rows,
+            "mirrored": self.mirrored,
+            "dropped": self.dropped,
+            "shed": self.shed,
+            "errors": self.errors,
+            # Les lots regroupent plusieurs requêtes : latence par ligne seulement
+            "latency": self.model.stats(per_call=False),
+            "diff": self.diff.stats(),
+        }
+
+
+class ModelVariants:
+    """
+    Modèles nommés servis à côté du modèle principal : un candidat reçoit
+    une part candidate_share du trafic (A/B), un modèle shadow rejoue en
+    arrière-plan les requêtes servies par le modèle principal. Les variantes
+    sont prédites dans le processus principal, sur leur propre pool de
+    threads, sans toucher à l'exécuteur du modèle principal.
+    """
+
+    def __init__(
+        self,
+        candidate=None,
+        candidate_share=0.0,
+        shadow=None,
+        shadow_capacity=10_000,
+        workers=None,
+        busy=None,
+    ):
+        self.models = {}
+        self.model_stats = {PRIMARY: ModelStats()}
+        self.candidate = candidate
+        self.candidate_share = candidate_share
+        self.shadow = shadow
+        self.shadow_enabled = True
+        self.shadow_capacity = shadow_capacity
+        self.workers = workers
+        self.busy = busy
+        self.shadow_mirror = None
+        self._pool = None
+
+    def add(self, name, info):
+        self.models[name] = info
+        self.model_stats[name] = ModelStats()
+        if name == self.shadow:
+            self.shadow_mirror = ShadowMirror(
+                lambda matrix: predict_with_bounds(info, matrix),
+                self.shadow_capacity,
+                busy=self.busy,
+            )
+
+    def route(self):
+        """
+        Variante qui sert la requête, None pour le modèle principal
+        """
+        if self.candidate_share <= 0 or self.candidate not in self.models:
+            return None
+        if random.random() < self.candidate_share:
+            return self.candidate
+        return None
+
+    def version(self, name):
+        return self.models[name]["model_version"]
+
+    def observe(self, name, seconds, predictions):
+        self.model_stats[name].observe(seconds, predictions)
+
+    async def predict(self, name, feature_matrix):
+        info = self.models[name]
+        if self._pool is None:
+            predictions, seconds = timed_call(predict_with_bounds, info, feature_matrix)
+        else:
+            loop = asyncio.get_running_loop()
+            predictions, seconds = await loop.run_in_executor(
+                self._pool, timed_call, predict_with_bounds, info, feature_matrix
+            )
+        self.observe(name, seconds, predictions)
+        return predictions
+
+    def mirror(self, feature_matrix, predictions):
+        if self.shadow_mirror is not None and self.shadow_enabled:
+            self.shadow_mirror.record(feature_matrix, predictions)
+
+    async def start(self):
+        if self.models and self._pool is None:
+            self._pool = ThreadPoolExecutor(
+                max_workers=self.workers, thread_name_prefix="variant"
+            )
+        if self.shadow_mirror is not None:
+            await self.shadow_mirror.start()
+
+    async def stop(self):
+        if self.shadow_mirror is not None:
+            await self.shadow_mirror.stop()
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+    def routing(self):
+        return {
+            "candidate": self.candidate if self.candidate in self.models else None,
+            "candidate_share": self.candidate_share,
+            "shadow": self.shadow if self.shadow_mirror is not None else None,
+            "shadow_enabled": self.shadow_enabled,
+        }
+
+    def stats(self, primary_version=None):
+        versions = {PRIMARY: primary_version}
+        versions.update((name, self.version(name)) for name in self.models)
+        stats = {
+            **self.routing(),
+            "models": {
+                name: {"model_version": versions[name], **model_stats.stats()}
+                for name, model_stats in self.model_stats.items()
+            },
+        }
+        if self.shadow_mirror is not None:
+            stats["shadow_mirror"] = {
+                "model_version": self.version(self.shadow),
+                **self.shadow_mirror.stats(),
+            }
+        return stats
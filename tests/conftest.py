@@ -0,0 +1,65 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+
+@pytest.fixture(scope="session")
+def trained_model_info():
+    """
+    Petit modèle entraîné en mémoire, au même format que housing_model.joblib
+    """
+    from sklearn.ensemble import RandomForestRegressor
+    from sklearn.preprocessing import StandardScaler
+
+    from drift import reference_statistics
+    from train_model import generate_synthetic_data
+
+    df = generate_synthetic_data(400)
+    X = df[["surface", "rooms", "age", "location_score", "garage"]]
+    y = df["price"]
+
+    scaler = StandardScaler()
+    X_scaled = scaler.fit_transform(X)
+    model = RandomForestRegressor(
+        n_estimators=20, max_depth=8, random_state=42, n_jobs=1
+    )
+    model.fit(X_scaled, y)
+
+    return {
+        "model": model,
+        "scaler": scaler,
+        "features": list(X.columns),
+        "metrics": {"r2_score": 0.9, "mae": 20000.0, "rmse": 30000.0, "mse": 9e8},
+        "feature_importance": [],
+        "training_date": "2024-01-15T10:00:00",
+        "model_version": "1.0.20240115100000",
+        "training_samples": len(X),
+        "reference_stats": reference_statistics(X.to_numpy(), list(X.columns)),
+    }
+
+
+@pytest.fixture
+def client(trained_model_info, monkeypatch, tmp_path):
+    from fastapi.testclient import TestClient
+
+    import main
+
+    monkeypatch.setattr(main, "load_model", lambda: True)
+    serving_info = main.build_serving_engine(dict(trained_model_info))
+    monkeypatch.setattr(main, "model_info", serving_info)
+    monkeypatch.setattr(main, "drift_monitor", None)
+    if main.audit_log is not None:
+        monkeypatch.setattr(main.audit_log, "directory", str(tmp_path / "audit"))
+    with TestClient(main.app) as test_client:
+        yield test_client
+
+
+@pytest.fixture
+def admin_headers(monkeypatch):
+    import main
+
+    monkeypatch.setattr(main, "ADMIN_TOKEN", "secret")
+    return {"X-Admin-Token": "secret"}
@@ -0,0 +1,122 @@
+import asyncio
+import time
+
+import pytest
+
+import main
+from admission import AdmissionController, AdmissionRejected
+
+HOUSE = {"surface": 85, "rooms": 4, "age": 10, "location_score": 7.5, "garage": True}
+
+
+def test_admission_weights_rows_and_sheds():
+    async def scenario():
+        controller = AdmissionController(
+            max_rows=100, max_queue_rows=50, queue_timeout_ms=1000
+        )
+        order = []
+
+        async def request(name, rows, hold=0.01):
+            async with controller.admit(rows):
+                order.append(name)
+                await asyncio.sleep(hold)
+
+        big = asyncio.create_task(request("big", 80, hold=0.05))
+        await asyncio.sleep(0)
+        assert controller.in_flight_rows == 80
+
+        # 30 lignes ne tiennent pas : elles attendent, la suivante est rejetée
+        waiting = asyncio.create_task(request("waiting", 30))
+        await asyncio.sleep(0)
+        assert controller.queued_rows == 30
+        with pytest.raises(AdmissionRejected) as rejected:
+            await request("shed", 25)
+        assert rejected.value.status_code == 429
+        assert rejected.value.retry_after >= 1
+
+        await asyncio.gather(big, waiting)
+        assert order == ["big", "waiting"]
+        assert controller.in_flight_rows == 0 and controller.queued_rows == 0
+        return controller.stats()
+
+    stats = asyncio.run(scenario())
+    assert stats["admitted"] == 2
+    assert stats["rejected"]["queue_full"] == 1
+
+
+def test_admission_deadline_and_queue_timeout():
+    async def scenario():
+        controller = AdmissionController(
+            max_rows=10, max_queue_rows=100, queue_timeout_ms=20
+        )
+        async with controller.admit(10):
+            now = time.perf_counter()
+            for deadline, reason in ((now + 0.01, "deadline"), (None, "queue_timeout")):
+                with pytest.raises(AdmissionRejected) as rejected:
+                    async with controller.admit(1, deadline):
+                        pass
+                assert rejected.value.reason == reason
+                assert rejected.value.status_code == 503
+            assert controller.queued_rows == 0
+
+        with pytest.raises(AdmissionRejected):
+            async with controller.admit(1, time.perf_counter() - 1):
+                pass
+        # Un lot plus grand que la capacité passe seul
+        async with controller.admit(1000):
+            assert controller.in_flight_rows == 10
+        return controller.stats()
+
+    stats = asyncio.run(scenario())
+    assert stats["rejected"] == {"queue_full": 0, "queue_timeout": 1, "deadline": 2}
+
+
+def test_admission_cancelled_waiter_frees_queue():
+    async def scenario():
+        controller = AdmissionController(max_rows=1, queue_timeout_ms=1000)
+        async with controller.admit(1):
+            waiter = asyncio.create_task(controller.admit(1).__aenter__())
+            await asyncio.sleep(0)
+            assert controller.queued_rows == 1
+            waiter.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await waiter
+            assert controller.queued_rows == 0
+        assert controller.in_flight_rows == 0
+
+    asyncio.run(scenario())
+
+
+def test_expired_deadline_is_rejected_before_the_model(client, monkeypatch):
+    calls = []
+    monkeypatch.setattr(main, "predict_rows", lambda m: calls.append(m))
+
+    response = client.post("/predict", json=HOUSE, headers={"X-Deadline-Ms": "0"})
+    assert response.status_code == 503
+    assert response.json()["reason"] == "deadline"
+    assert int(response.headers["Retry-After"]) >= 1
+    assert calls == []
+
+
+def test_saturated_queue_sheds_with_429(client, monkeypatch):
+    controller = AdmissionController(max_rows=10, max_queue_rows=0)
+    monkeypatch.setattr(main, "admission", controller)
+    # Sans file d'attente, un service au repos admet toujours
+    assert not controller.saturated
+    assert client.post("/predict/batch", json=[HOUSE, HOUSE]).status_code == 200
+
+    # Capacité occupée et file pleine : rejet avant même la lecture du corps
+    controller.in_flight_rows = 10
+    assert controller.saturated
+    response = client.post("/predict/batch", json=[{"surface": "invalide"}])
+    assert response.status_code == 429
+    assert "Retry-After" in response.headers
+
+    stats = client.get("/predict/admission/stats").json()
+    assert stats["rejected"]["queue_full"] == 1
+    assert "housing_requests_rejected_total" in client.get("/metrics").text
+
+
+def test_deadline_header_within_budget(client):
+    response = client.post("/predict", json=HOUSE, headers={"X-Deadline-Ms": "5000"})
+    assert response.status_code == 200
@@ -0,0 +1,55 @@
+import numpy as np
+import pytest
+
+from artifact import is_mmap_artifact, load_mmap_artifact, save_mmap_artifact
+from export_model import build_serving_artifact, export_serving_model
+from inference import compile_model
+
+
+def test_mmap_artifact_round_trip(trained_model_info, tmp_path):
+    serving_info = build_serving_artifact(trained_model_info)
+    directory = tmp_path / "housing_model_mmap"
+
+    save_mmap_artifact(serving_info, directory)
+    # Une seconde écriture remplace l'artefact en place
+    save_mmap_artifact(serving_info, directory)
+    assert is_mmap_artifact(directory)
+
+    loaded = load_mmap_artifact(directory)
+    engine = loaded["engine"]
+    assert isinstance(engine.value, np.memmap)
+    assert isinstance(engine.children, np.memmap)
+    assert not engine.value.flags.writeable
+    assert loaded["scaler"] is None
+    assert loaded["training_samples"] == trained_model_info["training_samples"]
+    assert loaded["metrics"]["rmse"] == trained_model_info["metrics"]["rmse"]
+
+    X = np.random.default_rng(0).uniform(1, 100, (300, 5))
+    np.testing.assert_array_equal(engine.predict(X), serving_info["engine"].predict(X))
+
+
+def test_mmap_artifact_requires_folded_model(trained_model_info, tmp_path):
+    with pytest.raises(ValueError):
+        save_mmap_artifact(trained_model_info, tmp_path / "model")
+
+
+def test_float32_mmap_export_is_served_without_copy(trained_model_info, tmp_path):
+    X = np.random.default_rng(0).uniform(1, 100, (50, 5))
+    directory = tmp_path / "housing_model_mmap"
+    export_serving_model(
+        dict(trained_model_info),
+        X,
+        path=str(tmp_path / "serving.joblib"),
+        mmap_dir=str(directory),
+        mmap_dtype="float32",
+    )
+
+    loaded = load_mmap_artifact(directory)
+    mapped = loaded["engine"]
+    served = compile_model(loaded, "float32")["engine"]
+    assert served is mapped and isinstance(served.value, np.memmap)
+    assert served.dtype == np.float32 and served.threshold.dtype == np.float64
+
+    # Précision inchangée : astype partage les tableaux au lieu de les copier
+    same = mapped.astype("float32")
+    assert same.value is mapped.value and same.threshold is mapped.threshold
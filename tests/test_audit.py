@@ -0,0 +1,88 @@
+import asyncio
+import os
+
+import numpy as np
+import pandas as pd
+
+import main
+from audit import AuditLog
+from features import FEATURE_NAMES
+
+HOUSE = {"surface": 85, "rooms": 4, "age": 10, "location_score": 7.5, "garage": True}
+
+
+def predictions_for(matrix):
+    predicted = matrix[:, 0] * 1000
+    return predicted, predicted - 10, predicted + 10
+
+
+def test_record_drops_on_overflow(tmp_path):
+    log = AuditLog(str(tmp_path), FEATURE_NAMES, capacity=5, file_format="ndjson")
+    matrix = np.arange(20, dtype=float).reshape(4, 5)
+    log.record(matrix, predictions_for(matrix), "1.0.0", 0.002, "predict_batch")
+    log.record(matrix, predictions_for(matrix), "1.0.0", 0.002, "predict_batch")
+    assert log.stats()["pending"] == 5
+    assert log.recorded == 5 and log.dropped == 3
+
+    columns = log.drain()
+    np.testing.assert_array_equal(columns["surface"], [0, 5, 10, 15, 0])
+    assert columns["latency_ms"][0] == 2.0
+    assert columns["model_version"] == ["1.0.0"] * 5
+    assert log.stats()["pending"] == 0
+
+
+def test_record_sampling(tmp_path):
+    log = AuditLog(str(tmp_path), FEATURE_NAMES, sample_rate=0.1)
+    matrix = np.ones((10_000, 5))
+    log.record(matrix, predictions_for(matrix), "1.0.0", 0.01, "predict_batch")
+    assert 700 < log.recorded < 1300
+
+    log = AuditLog(str(tmp_path), FEATURE_NAMES, sample_rate=0.0)
+    log.record(matrix, predictions_for(matrix), "1.0.0", 0.01, "predict_batch")
+    assert log.recorded == 0
+
+
+def test_flush_writes_and_rotates(tmp_path):
+    for file_format, reader in (("parquet", pd.read_parquet), ("ndjson", None)):
+        directory = tmp_path / file_format
+        log = AuditLog(str(directory), FEATURE_NAMES, file_format=file_format)
+        log.max_files = 2
+        matrix = np.full((3, 5), 2.0)
+        paths = []
+        for _ in range(3):
+            log.record(matrix, predictions_for(matrix), "1.0.0", 0.001, "predict")
+            paths.append(asyncio.run(log.flush()))
+
+        assert sorted(os.listdir(directory)) == [os.path.basename(p) for p in paths[1:]]
+        assert log.written == 9
+        if reader is None:
+            frame = pd.read_json(paths[-1], lines=True)
+        else:
+            frame = reader(paths[-1])
+        assert list(frame["predicted_price"]) == [2000.0] * 3
+        assert set(FEATURE_NAMES) <= set(frame.columns)
+
+
+def test_workers_sharing_a_directory_keep_their_files(tmp_path):
+    logs = [AuditLog(str(tmp_path), FEATURE_NAMES) for _ in range(2)]
+    matrix = np.ones((2, 5))
+    paths = []
+    for log in logs:
+        # Même seconde, même numéro de séquence
+        log.record(matrix, predictions_for(matrix), "1.0.0", 0.001, "predict")
+        paths.append(asyncio.run(log.flush()))
+
+    assert paths[0] != paths[1]
+    assert sorted(os.listdir(tmp_path)) == sorted(os.path.basename(p) for p in paths)
+
+
+def test_predictions_are_audited(client):
+    client.post("/predict", json=HOUSE)
+    client.post("/predict/batch", json=[HOUSE, HOUSE])
+    stats = client.get("/predict/audit/stats").json()
+    assert stats["enabled"] and stats["recorded"] >= 3
+
+    asyncio.run(main.audit_log.flush())
+    frame = pd.read_parquet(main.audit_log.directory)
+    assert set(frame["endpoint"]) == {"predict", "predict_batch"}
+    assert (frame["model_version"] == "1.0.20240115100000").all()
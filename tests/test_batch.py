@@ -0,0 +1,196 @@
+import numpy as np
+
+HOUSES = [
+    {"surface": 85.0, "rooms": 4, "age": 10.0, "location_score": 7.5, "garage": True},
+    {"surface": 120.0, "rooms": 5, "age": 5.0, "location_score": 9.0, "garage": True},
+    {"surface": 45.0, "rooms": 2, "age": 60.0, "location_score": 3.0, "garage": False},
+]
+
+
+def test_batch_matches_single_predictions(client):
+    response = client.post("/predict/batch", json=HOUSES)
+    assert response.status_code == 200
+    batch = response.json()["predictions"]
+    assert len(batch) == len(HOUSES)
+
+    for house, pred in zip(HOUSES, batch):
+        single = client.post("/predict", json=house).json()
+        assert np.isclose(pred["predicted_price"], single["predicted_price"])
+        assert np.isclose(
+            pred["confidence_interval"]["lower"],
+            single["confidence_interval"]["lower"],
+        )
+        assert pred["confidence_interval"]["lower"] >= 0
+
+
+def test_batch_size_limit(client, monkeypatch):
+    import main
+
+    monkeypatch.setattr(main, "MAX_BATCH_SIZE", 2)
+    response = client.post("/predict/batch", json=HOUSES)
+    assert response.status_code == 400
+
+
+def test_batch_columnar_format(client):
+    records = client.post("/predict/batch", json=HOUSES).json()["predictions"]
+
+    response = client.post("/predict/batch?format=columnar", json=HOUSES)
+    assert response.status_code == 200
+    columns = response.json()
+
+    assert columns["predicted_price"] == [r["predicted_price"] for r in records]
+    assert columns["lower"] == [r["confidence_interval"]["lower"] for r in records]
+    assert columns["upper"] == [r["confidence_interval"]["upper"] for r in records]
+    assert columns["model_version"] == records[0]["model_version"]
+    # Un seul horodatage par lot
+    assert len({r["prediction_timestamp"] for r in records}) == 1
+
+
+def test_batch_unknown_format(client):
+    response = client.post("/predict/batch?format=xml", json=HOUSES)
+    assert response.status_code == 422
+
+
+def test_batch_npy_round_trip(client):
+    import io
+
+    records = client.post("/predict/batch", json=HOUSES).json()["predictions"]
+    matrix = np.array(
+        [
+            [h["surface"], h["rooms"], h["age"], h["location_score"], h["garage"]]
+            for h in HOUSES
+        ],
+        dtype="<f8",
+    )
+    body = io.BytesIO()
+    np.save(body, matrix)
+
+    response = client.post(
+        "/predict/batch",
+        content=body.getvalue(),
+        headers={"Content-Type": "application/x-npy"},
+    )
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-npy"
+    result = np.load(io.BytesIO(response.content))
+    assert result.shape == (3, 3)
+    np.testing.assert_array_equal(result[:, 0], [r["predicted_price"] for r in records])
+
+
+def test_batch_arrow_round_trip(client):
+    import pyarrow as pa
+
+    columns = client.post("/predict/batch?format=columnar", json=HOUSES).json()
+    table = pa.Table.from_pylist(HOUSES)
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+
+    response = client.post(
+        "/predict/batch",
+        content=sink.getvalue().to_pybytes(),
+        headers={"Content-Type": "application/vnd.apache.arrow.stream"},
+    )
+    assert response.status_code == 200
+    result = pa.ipc.open_stream(response.content).read_all()
+    assert result.column_names == ["predicted_price", "lower", "upper"]
+    assert result.column("upper").to_pylist() == columns["upper"]
+    assert result.schema.metadata[b"model_version"] == columns["model_version"].encode()
+
+
+def test_batch_binary_validation(client):
+    import io
+
+    body = io.BytesIO()
+    np.save(body, np.array([[85.0, 4, 10.0, 7.5, 1], [-5.0, 4, 10.0, 7.5, 1]]))
+    response = client.post(
+        "/predict/batch",
+        content=body.getvalue(),
+        headers={"Content-Type": "application/x-npy"},
+    )
+    assert response.status_code == 422
+    assert response.json()["detail"][0]["row"] == 1
+
+    response = client.post(
+        "/predict/batch",
+        content=b"pas un fichier npy",
+        headers={"Content-Type": "application/x-npy"},
+    )
+    assert response.status_code == 400
+
+
+def test_openapi_documents_batch_formats(client):
+    content = client.get("/openapi.json").json()["paths"]["/predict/batch"]["post"][
+        "requestBody"
+    ]["content"]
+    assert {"application/json", "application/x-npy"} <= set(content)
+
+
+def test_batch_partial_validation(client):
+    bad = [
+        {**HOUSES[0], "surface": 900.0},
+        {**HOUSES[0], "rooms": "quatre"},
+        {key: value for key, value in HOUSES[0].items() if key != "age"},
+    ]
+    body = [HOUSES[0], *bad, HOUSES[1]]
+
+    assert client.post("/predict/batch", json=body).status_code == 422
+
+    response = client.post("/predict/batch?validation=partial", json=body)
+    assert response.status_code == 200
+    payload = response.json()
+    assert [p["row"] for p in payload["predictions"]] == [0, 4]
+    errors = {error["row"]: error["msg"] for error in payload["errors"]}
+    assert set(errors) == {1, 2, 3}
+    assert "surface" in errors[1] and "rooms" in errors[2] and "age" in errors[3]
+
+    expected = client.post("/predict/batch", json=[HOUSES[0], HOUSES[1]]).json()
+    assert [p["predicted_price"] for p in payload["predictions"]] == [
+        p["predicted_price"] for p in expected["predictions"]
+    ]
+
+    columns = client.post(
+        "/predict/batch?validation=partial&format=columnar", json=body
+    ).json()
+    assert columns["rows"] == [0, 4]
+
+
+def test_batch_partial_validation_binary(client):
+    import io
+
+    body = io.BytesIO()
+    np.save(body, np.array([[85.0, 4, 10.0, 7.5, 1], [85.0, 2.5, 10.0, 7.5, 1]]))
+    response = client.post(
+        "/predict/batch?validation=partial",
+        content=body.getvalue(),
+        headers={"Content-Type": "application/x-npy"},
+    )
+    assert response.status_code == 200
+    assert response.headers["X-Rejected-Rows"] == "1"
+    predictions = np.load(io.BytesIO(response.content))
+    assert predictions.shape == (2, 3)
+    assert np.isfinite(predictions[0]).all() and np.isnan(predictions[1]).all()
+
+
+def test_batch_boolean_coercion_matches_strict_mode(client):
+    body = [
+        {**HOUSES[0], "garage": "true"},
+        {**HOUSES[0], "garage": "no"},
+        {**HOUSES[0], "garage": 1},
+        {**HOUSES[0], "garage": "peut-être"},
+    ]
+
+    for i, record in enumerate(body):
+        strict = client.post("/predict/batch", json=[record])
+        partial = client.post("/predict/batch?validation=partial", json=[record])
+        assert partial.status_code == 200
+        predictions = partial.json()["predictions"]
+        if strict.status_code == 200:
+            assert i < 3
+            assert [p["predicted_price"] for p in predictions] == [
+                p["predicted_price"] for p in strict.json()["predictions"]
+            ]
+        else:
+            assert i == 3 and strict.status_code == 422
+            assert predictions == []
+            assert "garage" in partial.json()["errors"][0]["msg"]
@@ -0,0 +1,106 @@
+import asyncio
+
+import numpy as np
+
+from batching import MicroBatcher
+
+
+def _double(feature_matrix):
+    predicted = feature_matrix[:, 0] * 2
+    return predicted, predicted - 1, predicted + 1
+
+
+def test_concurrent_requests_are_coalesced():
+    calls = []
+
+    def predict(feature_matrix):
+        calls.append(len(feature_matrix))
+        return _double(feature_matrix)
+
+    async def scenario():
+        batcher = MicroBatcher(predict, max_batch_size=8, max_wait_ms=20)
+        await batcher.start()
+        try:
+            results = await asyncio.gather(
+                *(batcher.submit(np.array([[float(i)]])) for i in range(20))
+            )
+        finally:
+            await batcher.stop()
+        return results, batcher.stats()
+
+    results, stats = asyncio.run(scenario())
+
+    assert [r[0] for r in results] == [2.0 * i for i in range(20)]
+    assert results[3] == (6.0, 5.0, 7.0)
+    assert sum(calls) == 20
+    assert max(calls) <= 8
+    assert len(calls) < 20
+    assert stats["rows"] == 20
+    assert stats["queue_depth"] == 0
+
+
+def test_errors_are_propagated_to_every_caller():
+    def failing(feature_matrix):
+        raise ValueError("boom")
+
+    async def scenario():
+        batcher = MicroBatcher(failing, max_batch_size=4, max_wait_ms=5)
+        await batcher.start()
+        try:
+            return await asyncio.gather(
+                *(batcher.submit(np.array([[1.0]])) for _ in range(3)),
+                return_exceptions=True,
+            )
+        finally:
+            await batcher.stop()
+
+    results = asyncio.run(scenario())
+    assert all(isinstance(r, ValueError) for r in results)
+
+
+def test_stop_drains_queued_and_in_flight_rows():
+    async def slow(feature_matrix):
+        await asyncio.sleep(0.02)
+        return _double(feature_matrix)
+
+    async def scenario():
+        batcher = MicroBatcher(slow, max_batch_size=4, max_wait_ms=50)
+        await batcher.start()
+        requests = [
+            asyncio.create_task(batcher.submit(np.array([[float(i)]])))
+            for i in range(10)
+        ]
+        # Un lot en vol, un en cours de collecte, le reste dans la file
+        await asyncio.sleep(0.01)
+        await asyncio.wait_for(batcher.stop(), 1)
+        results = await asyncio.wait_for(asyncio.gather(*requests), 1)
+        try:
+            await batcher.submit(np.array([[1.0]]))
+        except RuntimeError:
+            rejected = True
+        return results, rejected
+
+    results, rejected = asyncio.run(scenario())
+    assert [r[0] for r in results] == [2.0 * i for i in range(10)]
+    assert rejected
+
+
+def test_stop_does_not_redispatch_single_row_in_flight():
+    calls = []
+
+    async def slow(feature_matrix):
+        calls.append(len(feature_matrix))
+        await asyncio.sleep(0.02)
+        return _double(feature_matrix)
+
+    async def scenario():
+        batcher = MicroBatcher(slow, max_batch_size=4, max_wait_ms=50)
+        await batcher.start()
+        request = asyncio.create_task(batcher.submit(np.array([[3.0]])))
+        # Ligne seule au repos : envoyée aussitôt, encore en vol à l'arrêt
+        await asyncio.sleep(0.005)
+        await asyncio.wait_for(batcher.stop(), 1)
+        return await request
+
+    assert asyncio.run(scenario())[0] == 6.0
+    assert calls == [1]
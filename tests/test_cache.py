@@ -0,0 +1,141 @@
+import asyncio
+
+import numpy as np
+
+from cache import LocalCacheBackend, PredictionCache, RedisCacheBackend
+
+
+class FakeRedis:
+    """
+    Sous-ensemble en mémoire de redis.asyncio utilisé par RedisCacheBackend
+    """
+
+    def __init__(self):
+        self.store = {}
+
+    async def mget(self, keys):
+        if not keys:
+            raise ValueError("wrong number of arguments for 'mget' command")
+        return [self.store.get(key) for key in keys]
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+    async def aclose(self):
+        pass
+
+
+class FakePipeline:
+    def __init__(self, redis):
+        self.redis = redis
+        self.commands = []
+
+    def set(self, key, value, ex=None):
+        self.commands.append((key, value.encode()))
+
+    async def execute(self):
+        self.redis.store.update(self.commands)
+
+
+def _compute_counting(calls):
+    async def compute(feature_matrix):
+        calls.append(len(feature_matrix))
+        predicted = feature_matrix.sum(axis=1)
+        return predicted, predicted - 1, predicted + 1
+
+    return compute
+
+
+def test_batch_sends_only_misses_to_model():
+    cache = PredictionCache(LocalCacheBackend())
+    calls = []
+    compute = _compute_counting(calls)
+    X = np.array([[1.0, 2.0], [3.0, 4.0], [5.0, 6.0]])
+
+    async def scenario():
+        await cache.predict(X[:2], "v1", compute)
+        return await cache.predict(X, "v1", compute)
+
+    predicted, lower, upper = asyncio.run(scenario())
+
+    assert calls == [2, 1]
+    np.testing.assert_array_equal(predicted, [3.0, 7.0, 11.0])
+    np.testing.assert_array_equal(upper, [4.0, 8.0, 12.0])
+    assert cache.stats()["hits"] == 2
+    assert cache.stats()["misses"] == 3
+
+
+def test_cache_is_scoped_per_model_version():
+    cache = PredictionCache(LocalCacheBackend())
+    calls = []
+    compute = _compute_counting(calls)
+    X = np.array([[1.0, 2.0]])
+
+    async def scenario():
+        await cache.predict(X, "v1", compute)
+        await cache.predict(X, "v2", compute)
+
+    asyncio.run(scenario())
+    assert calls == [1, 1]
+
+
+def test_rounding_quantizes_keys():
+    cache = PredictionCache(LocalCacheBackend(), rounding=1)
+    calls = []
+    compute = _compute_counting(calls)
+
+    async def scenario():
+        await cache.predict(np.array([[85.01, 4.0]]), "v1", compute)
+        return await cache.predict(np.array([[84.99, 4.0]]), "v1", compute)
+
+    predicted, _, _ = asyncio.run(scenario())
+    assert calls == [1]
+    assert predicted[0] == 89.0
+
+
+def test_local_backend_lru_and_ttl():
+    backend = LocalCacheBackend(max_size=2, ttl_seconds=60)
+
+    async def scenario():
+        await backend.set_many({"a": (1.0,), "b": (2.0,)})
+        await backend.get_many(["a"])
+        await backend.set_many({"c": (3.0,)})
+        evicted = await backend.get_many(["a", "b", "c"])
+
+        backend.ttl = -1
+        await backend.set_many({"d": (4.0,)})
+        expired = await backend.get_many(["d"])
+        return evicted, expired
+
+    evicted, expired = asyncio.run(scenario())
+    assert evicted == [(1.0,), None, (3.0,)]
+    assert expired == [None]
+
+
+def test_redis_backend_round_trip():
+    redis = FakeRedis()
+    cache = PredictionCache(RedisCacheBackend(redis, ttl_seconds=60))
+    calls = []
+    compute = _compute_counting(calls)
+    X = np.array([[0.1, 0.2]])
+
+    async def scenario():
+        first = await cache.predict(X, "v1", compute)
+        second = await cache.predict(X, "v1", compute)
+        return first, second
+
+    first, second = asyncio.run(scenario())
+    assert calls == [1]
+    assert first[0][0] == second[0][0] == 0.1 + 0.2
+    assert all(key.startswith("housing:prediction:v1:") for key in redis.store)
+
+
+def test_redis_backend_empty_batch_is_not_an_error():
+    cache = PredictionCache(RedisCacheBackend(FakeRedis(), ttl_seconds=60))
+    calls = []
+
+    predicted, _, _ = asyncio.run(
+        cache.predict(np.empty((0, 2)), "v1", _compute_counting(calls))
+    )
+    assert len(predicted) == 0 and calls == []
+    assert cache.stats()["errors"] == 0
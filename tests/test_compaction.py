@@ -0,0 +1,93 @@
+import joblib
+import numpy as np
+
+import main
+from compact_model import compact_model, distill_forest, select_trees, subset_forest
+from forest_engine import CompiledForest
+from train_model import generate_synthetic_data
+
+
+def test_select_trees_prefers_accurate_trees():
+    rng = np.random.default_rng(0)
+    y = rng.uniform(100, 200, 500)
+    noisy = y + rng.normal(0, 50, (8, 500))
+    accurate = y + rng.normal(0, 1, (2, 500))
+    per_tree = np.vstack([noisy[:3], accurate[:1], noisy[3:], accurate[1:]])
+
+    # Un seul arbre précis fait déjà mieux que la forêt complète
+    assert select_trees(per_tree, y)[0] in (3, 9)
+    assert len(select_trees(per_tree, y)) == 1
+    # Sans critère d'arrêt atteignable, max_trees arbres sont retenus
+    assert sorted(select_trees(per_tree, y, max_trees=2, tolerance=-1)) == [3, 9]
+
+
+def test_subset_forest_matches_selected_trees(trained_model_info):
+    model = trained_model_info["model"]
+    X = trained_model_info["scaler"].transform(
+        generate_synthetic_data(50)[trained_model_info["features"]]
+    )
+    indices = [4, 0, 7]
+
+    compact = subset_forest(model, indices)
+
+    per_tree = CompiledForest.from_sklearn(model).predict_trees(X)
+    np.testing.assert_allclose(compact.predict(X), per_tree[indices].mean(axis=0))
+    assert len(model.estimators_) == 20
+
+
+def test_compacted_artifact_is_servable(trained_model_info, tmp_path):
+    data_path = str(tmp_path / "housing_data.csv")
+    generate_synthetic_data(400).to_csv(data_path, index=False)
+    model_path = str(tmp_path / "housing_model.joblib")
+    joblib.dump(trained_model_info, model_path)
+    output_path = str(tmp_path / "housing_model_compact.joblib")
+
+    student_info = compact_model(model_path, data_path, output_path, max_trees=5)
+
+    report = student_info["compaction"]
+    assert report["trees"] <= 5
+    assert report["memory_saving"] > 0
+    assert "r2_delta" in report and "batch_speedup" in report
+
+    served = main.read_model(output_path)
+    predicted, lower, upper = main.predict_with_bounds(
+        served, np.array([[85.0, 4, 10.0, 7.5, 1]])
+    )
+    assert lower[0] <= predicted[0] <= upper[0]
+
+
+def test_legacy_teacher_reuses_the_csv_split(trained_model_info, tmp_path, monkeypatch):
+    import compact_model as module
+
+    data_path = str(tmp_path / "housing_data.csv")
+    generate_synthetic_data(400).to_csv(data_path, index=False)
+    model_path = str(tmp_path / "housing_model.joblib")
+    # Artefact antérieur à compact_data et calibration_samples
+    interval = {"quantiles": [0.05, 0.95], "scale": 1.3}
+    joblib.dump(dict(trained_model_info, interval=interval), model_path)
+    splits = []
+
+    split = module.split_dataset
+
+    def split_dataset(X, y, compact):
+        splits.append((X.dtype, compact))
+        return split(X, y, compact)
+
+    monkeypatch.setattr(module, "split_dataset", split_dataset)
+    student_info = compact_model(
+        model_path, data_path, str(tmp_path / "compact.joblib"), max_trees=5
+    )
+
+    assert splits == [(np.float64, False)]
+    assert student_info["interval"]["scale"] == 1.0
+
+
+def test_distilled_boosting_student_keeps_size_limits(trained_model_info):
+    X = np.random.default_rng(0).uniform(-2, 2, (300, 5))
+
+    student = distill_forest(
+        trained_model_info["model"], X, "hist_gradient_boosting", 7, 3
+    )
+
+    assert student.max_iter == 7 and student.max_depth == 3
+    assert student.n_iter_ <= 7
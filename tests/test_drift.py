@@ -0,0 +1,92 @@
+import numpy as np
+import pytest
+
+from drift import DriftMonitor, ks_distance, psi, reference_statistics
+from features import FEATURE_NAMES
+from train_model import generate_synthetic_data
+
+HOUSE = {"surface": 85, "rooms": 4, "age": 10, "location_score": 7.5, "garage": True}
+
+
+@pytest.fixture(scope="module")
+def training_matrix():
+    return generate_synthetic_data(3000)[FEATURE_NAMES].to_numpy()
+
+
+def test_reference_statistics(training_matrix):
+    stats = reference_statistics(training_matrix, FEATURE_NAMES)
+    surface = stats["surface"]
+    assert surface["count"] == 3000
+    assert surface["mean"] == pytest.approx(training_matrix[:, 0].mean())
+    assert len(surface["histogram"]) == len(surface["histogram_edges"]) + 1
+    assert sum(surface["sketch"]) == pytest.approx(1.0)
+    # garage ne prend que deux valeurs : les classes dupliquées sont fusionnées
+    assert stats["garage"]["histogram_edges"] == sorted(
+        set(stats["garage"]["histogram_edges"])
+    )
+
+
+def test_monitor_matches_reference_on_training_data(training_matrix):
+    reference = reference_statistics(training_matrix, FEATURE_NAMES)
+    monitor = DriftMonitor(reference, FEATURE_NAMES)
+    for row in training_matrix[:500]:
+        monitor.update(row[None, :])
+    monitor.update(training_matrix[500:])
+
+    np.testing.assert_allclose(monitor.mean, training_matrix.mean(axis=0))
+    np.testing.assert_allclose(monitor.m2 / monitor.count, training_matrix.var(axis=0))
+    report = monitor.report()
+    assert report["rows"] == 3000 and report["drifted_features"] == []
+    for feature in report["features"].values():
+        assert feature["psi"] == pytest.approx(0, abs=1e-12)
+        assert feature["ks"] == pytest.approx(0, abs=1e-12)
+
+
+def test_monitor_detects_shift_and_merges(training_matrix):
+    reference = reference_statistics(training_matrix, FEATURE_NAMES)
+    shifted = training_matrix.copy()
+    shifted[:, 2] += 30
+
+    first, second = DriftMonitor(reference, FEATURE_NAMES), DriftMonitor(
+        reference, FEATURE_NAMES
+    )
+    first.update(shifted[:1000])
+    second.update(shifted[1000:])
+    first.merge(second)
+
+    report = first.report()
+    assert report["rows"] == 3000
+    assert report["drifted_features"] == ["age"]
+    assert report["features"]["age"]["mean_shift"] > 1
+    assert report["features"]["age"]["ks"] > 0.3
+
+
+def test_scores():
+    uniform = np.full(4, 0.25)
+    assert psi(uniform, uniform) == 0
+    assert psi(uniform, np.array([0.7, 0.1, 0.1, 0.1])) > 0.25
+    assert ks_distance(uniform, np.array([1.0, 0, 0, 0])) == pytest.approx(0.75)
+
+
+def test_drift_endpoint(client, admin_headers):
+    report = client.get("/model/drift").json()
+    assert report["rows"] == 0
+    assert report["features"]["surface"]["status"] == "insufficient_data"
+
+    client.post("/predict", json=HOUSE)
+    client.post("/predict/batch", json=[HOUSE] * 200)
+    report = client.get("/model/drift").json()
+    assert report["rows"] == 201
+    assert report["features"]["surface"]["live_mean"] == 85
+    assert "rooms" in report["drifted_features"]
+
+    assert client.post("/model/drift/reset", headers=admin_headers).status_code == 200
+    assert client.get("/model/drift").json()["rows"] == 0
+
+
+def test_drift_endpoint_without_reference(client, monkeypatch):
+    import main
+
+    info = {k: v for k, v in main.model_info.items() if k != "reference_stats"}
+    monkeypatch.setattr(main, "model_info", info)
+    assert client.get("/model/drift").status_code == 404
@@ -0,0 +1,43 @@
+import asyncio
+import os
+import threading
+
+import numpy as np
+import pytest
+
+from executor import InferenceExecutor
+
+
+def _run(executor, fn, *args):
+    async def scenario():
+        await executor.start()
+        try:
+            return await executor.run(fn, *args)
+        finally:
+            executor.shutdown()
+
+    return asyncio.run(scenario())
+
+
+def test_inline_runs_in_event_loop_thread():
+    executor = InferenceExecutor("inline")
+    assert _run(executor, threading.get_ident) == threading.get_ident()
+
+
+def test_thread_pool_keeps_loop_free():
+    executor = InferenceExecutor("thread", workers=2)
+    assert _run(executor, threading.get_ident) != threading.get_ident()
+
+
+def test_process_pool_runs_in_worker_process():
+    executor = InferenceExecutor("process", workers=1)
+    assert _run(executor, os.getpid) != os.getpid()
+    np.testing.assert_array_equal(
+        _run(InferenceExecutor("process", workers=1), np.add, np.ones(3), 1),
+        np.full(3, 2.0),
+    )
+
+
+def test_unknown_mode_is_rejected():
+    with pytest.raises(ValueError):
+        InferenceExecutor("gpu")
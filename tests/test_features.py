@@ -0,0 +1,41 @@
+import numpy as np
+
+from features import FEATURE_NAMES, check_constraints, records_to_matrix
+from features import feature_constraints
+
+
+def test_records_to_matrix_fast_path():
+    records = [
+        {"surface": 85.0, "rooms": 4, "age": 10.0, "location_score": 7.5, "garage": 1},
+        {"surface": 45, "rooms": 2, "age": 60, "location_score": 3, "garage": False},
+    ]
+    matrix, errors = records_to_matrix(records)
+    assert errors == {}
+    np.testing.assert_array_equal(matrix[1], [45, 2, 60, 3, 0])
+
+
+def test_records_to_matrix_reports_bad_rows():
+    records = [
+        {"surface": 85.0, "rooms": 4, "age": 10.0, "location_score": 7.5, "garage": 1},
+        ["pas", "un", "objet"],
+        {"surface": "grand", "rooms": 4, "age": 1, "location_score": 5, "garage": 0},
+        {"rooms": 4, "age": 1, "location_score": 5, "garage": 0},
+    ]
+    matrix, errors = records_to_matrix(records, FEATURE_NAMES)
+    assert set(errors) == {1, 2, 3}
+    assert "grand" in errors[2] and "surface manquant" == errors[3]
+    assert np.isfinite(matrix[0]).all() and np.isnan(matrix[2, 0])
+
+
+def test_check_constraints_flags_bounds_integers_and_nan():
+    matrix = np.array(
+        [
+            [85.0, 4, 10.0, 7.5, 1],
+            [85.0, 4.5, 10.0, 7.5, 1],
+            [85.0, 4, 10.0, 11.0, 1],
+            [np.nan, 4, 10.0, 7.5, 1],
+        ]
+    )
+    errors = check_constraints(matrix, feature_constraints())
+    assert set(errors) == {1, 2, 3}
+    assert errors[1].startswith("rooms") and errors[2].startswith("location_score")
@@ -0,0 +1,111 @@
+import numpy as np
+
+from forest_engine import CompiledForest
+
+
+def _sample_matrix(model_info, n_rows=500):
+    rng = np.random.default_rng(0)
+    X = np.column_stack(
+        [
+            rng.uniform(20, 500, n_rows),
+            rng.integers(1, 16, n_rows),
+            rng.uniform(0, 100, n_rows),
+            rng.uniform(1, 10, n_rows),
+            rng.integers(0, 2, n_rows),
+        ]
+    )
+    return model_info["scaler"].transform(X)
+
+
+def test_compiled_forest_is_bit_compatible(trained_model_info):
+    model = trained_model_info["model"]
+    X = _sample_matrix(trained_model_info)
+
+    engine = CompiledForest.from_sklearn(model)
+
+    np.testing.assert_array_equal(engine.predict(X), model.predict(X))
+    np.testing.assert_array_equal(engine.predict(X[:1]), model.predict(X[:1]))
+
+
+def test_compiled_forest_tree_outputs(trained_model_info):
+    model = trained_model_info["model"]
+    X = _sample_matrix(trained_model_info, 50)
+
+    per_tree = CompiledForest.from_sklearn(model).predict_trees(X)
+    expected = np.stack([tree.predict(X.astype(np.float32)) for tree in model])
+
+    np.testing.assert_array_equal(per_tree, expected)
+
+
+def test_compiled_forest_float32(trained_model_info):
+    model = trained_model_info["model"]
+    X = _sample_matrix(trained_model_info)
+
+    engine = CompiledForest.from_sklearn(model, dtype=np.float32)
+    reference = CompiledForest.from_sklearn(model)
+
+    assert engine.predict(X).dtype == np.float32
+    np.testing.assert_array_equal(engine.apply(X), reference.apply(X))
+    np.testing.assert_allclose(engine.predict(X), model.predict(X), rtol=1e-5)
+
+
+def test_folded_scaler_parity(trained_model_info):
+    from export_model import build_serving_artifact, check_parity
+
+    rng = np.random.default_rng(1)
+    X_raw = np.column_stack(
+        [
+            rng.uniform(20, 500, 200),
+            rng.integers(1, 16, 200),
+            rng.uniform(0, 100, 200),
+            rng.uniform(1, 10, 200),
+            rng.integers(0, 2, 200),
+        ]
+    ).astype(np.float64)
+
+    serving_info = build_serving_artifact(trained_model_info)
+
+    assert serving_info["scaler"] is None
+    assert "model" not in serving_info
+    assert check_parity(trained_model_info, serving_info, X_raw) > len(X_raw)
+
+
+def test_folded_float32_engine_parity(trained_model_info):
+    scaler = trained_model_info["scaler"]
+    engine = CompiledForest.from_sklearn(trained_model_info["model"], np.float32)
+    folded = engine.fold_scaler(scaler.mean_, scaler.scale_)
+
+    # Entrées placées exactement sur les seuils repliés et juste au-dessus :
+    # ce sont elles qu'un arrondi des seuils en float32 ferait dévier
+    internal = np.flatnonzero(np.isfinite(folded.threshold))[:300]
+    X_raw = np.tile(scaler.mean_, (2 * len(internal), 1))
+    thresholds = folded.threshold[internal]
+    X_raw[: len(internal)][
+        np.arange(len(internal)), folded.feature[internal]
+    ] = thresholds
+    X_raw[len(internal) :][np.arange(len(internal)), folded.feature[internal]] = (
+        np.nextafter(thresholds, np.inf)
+    )
+
+    assert folded.threshold.dtype == np.float64
+    np.testing.assert_array_equal(
+        folded.apply(X_raw), engine.apply(scaler.transform(X_raw))
+    )
+    np.testing.assert_array_equal(
+        folded.astype(np.float32).apply(X_raw), folded.apply(X_raw)
+    )
+    np.testing.assert_array_equal(
+        folded.predict(X_raw), engine.predict(scaler.transform(X_raw))
+    )
+
+
+def test_compiled_forest_quantiles_single_pass(trained_model_info):
+    engine = CompiledForest.from_sklearn(trained_model_info["model"])
+    X = _sample_matrix(trained_model_info, 50)
+
+    predicted, bounds = engine.predict_quantiles(X, [0.1, 0.9])
+
+    np.testing.assert_array_equal(predicted, engine.predict(X))
+    np.testing.assert_array_equal(
+        bounds, np.quantile(engine.predict_trees(X), [0.1, 0.9], axis=0)
+    )
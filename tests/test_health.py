@@ -0,0 +1,48 @@
+import asyncio
+
+import main
+
+
+def test_ready_after_warm_up(client):
+    assert client.get("/health/live").json() == {"status": "alive"}
+
+    response = client.get("/health/ready")
+    assert response.status_code == 200
+    ready = response.json()
+    assert ready["status"] == "ready"
+    assert ready["model_version"] == "1.0.20240115100000"
+    assert len(ready["canary"]) == 3
+
+    assert client.get("/health").json()["status"] == "healthy"
+
+
+def test_probes_do_not_predict(client, monkeypatch):
+    calls = []
+    monkeypatch.setattr(main, "predict_matrix", lambda m: calls.append(m))
+    for _ in range(5):
+        assert client.get("/health/ready").status_code == 200
+    assert calls == []
+
+
+def test_not_ready_when_canary_fails(client, monkeypatch):
+    def broken(feature_matrix):
+        raise RuntimeError("moteur corrompu")
+
+    monkeypatch.setattr(main, "predict_matrix", broken)
+    assert asyncio.run(main.check_readiness()) is False
+
+    response = client.get("/health/ready")
+    assert response.status_code == 503
+    assert "moteur corrompu" in response.json()["error"]
+    assert client.get("/health").status_code == 503
+    # Le processus reste vivant
+    assert client.get("/health/live").status_code == 200
+
+
+def test_not_ready_without_model(client, monkeypatch):
+    monkeypatch.setattr(main, "model_info", None)
+    asyncio.run(main.check_readiness())
+
+    response = client.get("/health")
+    assert response.status_code == 503
+    assert response.json()["model_loaded"] is False
@@ -0,0 +1,153 @@
+import copy
+import os
+from datetime import datetime
+
+import joblib
+import numpy as np
+import pytest
+
+import main
+from incremental_train import grow_forest, incremental_train, version_path
+from train_model import _simulate, load_holdout
+
+
+def write_delta(path, n_rows, seed):
+    _simulate(np.random.default_rng(seed), n_rows).to_csv(path, index=False)
+    return str(path)
+
+
+def test_grow_forest_keeps_existing_trees(trained_model_info):
+    model = copy.deepcopy(trained_model_info["model"])
+    original = list(model.estimators_)
+    X = np.random.default_rng(0).normal(size=(200, 5))
+    y = X[:, 0] * 1000
+
+    assert grow_forest(model, X, y, n_new_trees=5) == 0
+    assert len(model.estimators_) == 25
+    assert model.estimators_[:20] == original
+    assert model.get_params()["warm_start"] is False
+
+    assert grow_forest(model, X, y, n_new_trees=5, max_trees=22, seed=43) == 8
+    assert len(model.estimators_) == model.n_estimators == 22
+    assert model.estimators_[0] is original[8]
+
+
+def test_incremental_artifact_is_versioned_and_servable(trained_model_info, tmp_path):
+    model_path = str(tmp_path / "housing_model.joblib")
+    joblib.dump(trained_model_info, model_path)
+    output_path = str(tmp_path / "housing_model_next.joblib")
+    holdout_path = str(tmp_path / "holdout.npz")
+    versions_dir = str(tmp_path / "versions")
+    delta_path = write_delta(tmp_path / "delta.csv", 500, seed=7)
+
+    info = incremental_train(
+        delta_path,
+        model_path,
+        output_path,
+        n_new_trees=10,
+        max_trees=25,
+        holdout_path=holdout_path,
+        versions_dir=versions_dir,
+    )
+
+    report = info["incremental"]
+    assert report["rounds"] == 1
+    assert report["parent_version"] == trained_model_info["model_version"]
+    assert report["trees_dropped"] == 5 and report["n_trees"] == 25
+    assert info["training_samples"] == trained_model_info["training_samples"] + 400
+    assert load_holdout(holdout_path)[0].shape == (100, 5)
+    assert os.path.exists(version_path(info["model_version"], versions_dir))
+    assert os.path.exists(version_path(report["parent_version"], versions_dir))
+    # Le modèle parent archivé n'a pas été modifié par warm_start
+    parent = joblib.load(version_path(report["parent_version"], versions_dir))
+    assert len(parent["model"].estimators_) == 20
+
+    served = main.read_model(output_path)
+    predicted, lower, upper = main.predict_with_bounds(
+        served, np.array([[85.0, 4, 10.0, 7.5, 1]])
+    )
+    assert lower[0] <= predicted[0] <= upper[0]
+
+    # Deuxième passe : le jeu de test glissant s'allonge
+    delta_path = write_delta(tmp_path / "delta2.csv", 500, seed=8)
+    info = incremental_train(
+        delta_path,
+        output_path,
+        output_path,
+        n_new_trees=10,
+        holdout_path=holdout_path,
+        versions_dir=versions_dir,
+    )
+    assert info["incremental"]["rounds"] == 2
+    assert info["incremental"]["holdout_samples"] == 200
+
+
+def test_incremental_recalibrates_on_new_rows(trained_model_info, tmp_path):
+    model_path = str(tmp_path / "housing_model.joblib")
+    interval = {"quantiles": [0.05, 0.95], "scale": 1.0}
+    joblib.dump(
+        dict(trained_model_info, interval=interval, calibration_samples=40),
+        model_path,
+    )
+    delta_path = write_delta(tmp_path / "delta.csv", 500, seed=7)
+
+    info = incremental_train(
+        delta_path,
+        model_path,
+        str(tmp_path / "next.joblib"),
+        n_new_trees=10,
+        holdout_path=str(tmp_path / "holdout.npz"),
+        versions_dir=str(tmp_path / "versions"),
+    )
+
+    # 400 lignes d'entraînement dont 40 réservées à la calibration
+    assert info["incremental"]["calibration_samples"] == 40
+    assert info["training_samples"] == trained_model_info["training_samples"] + 360
+    assert info["interval"]["scale"] != 1.0
+    assert 0 <= info["interval"]["coverage"] <= 1
+
+
+def test_passes_in_the_same_second_get_distinct_versions(
+    trained_model_info, tmp_path, monkeypatch
+):
+    import incremental_train as module
+
+    class FrozenDatetime(datetime):
+        @classmethod
+        def now(cls, tz=None):
+            return cls(2024, 2, 1, 12, 0, 0)
+
+    monkeypatch.setattr(module, "datetime", FrozenDatetime)
+    model_path = str(tmp_path / "housing_model.joblib")
+    joblib.dump(trained_model_info, model_path)
+    versions_dir = str(tmp_path / "versions")
+
+    versions = []
+    for seed in (7, 8):
+        info = incremental_train(
+            write_delta(tmp_path / f"delta{seed}.csv", 300, seed=seed),
+            model_path,
+            model_path,
+            n_new_trees=5,
+            holdout_path=str(tmp_path / "holdout.npz"),
+            versions_dir=versions_dir,
+        )
+        versions.append(info["model_version"])
+
+    assert versions == ["1.0.20240201120000", "1.0.20240201120000.2"]
+    first = joblib.load(version_path(versions[0], versions_dir))
+    assert len(first["model"].estimators_) == 25
+    assert first["incremental"]["rounds"] == 1
+
+
+def test_incremental_rejects_non_forest(trained_model_info, tmp_path):
+    from sklearn.linear_model import LinearRegression
+
+    model_path = str(tmp_path / "housing_model.joblib")
+    joblib.dump({**trained_model_info, "model": LinearRegression()}, model_path)
+    with pytest.raises(ValueError):
+        incremental_train(
+            write_delta(tmp_path / "delta.csv", 100, seed=7),
+            model_path,
+            versions_dir=str(tmp_path / "versions"),
+        )
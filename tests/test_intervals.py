@@ -0,0 +1,48 @@
+import numpy as np
+
+from inference import (
+    calibrate_interval,
+    compile_model,
+    interval_coverage,
+    predict_with_bounds,
+)
+from train_model import generate_synthetic_data
+
+FEATURES = ["surface", "rooms", "age", "location_score", "garage"]
+
+
+def held_out(trained_model_info):
+    df = generate_synthetic_data(600).sample(frac=1, random_state=7)
+    X = trained_model_info["scaler"].transform(df[FEATURES])
+    return X, df["price"].to_numpy()
+
+
+def test_calibrated_interval_reaches_nominal_coverage(trained_model_info):
+    info = compile_model(dict(trained_model_info))
+    X, y = held_out(trained_model_info)
+
+    # Calibré sur une moitié, couverture mesurée sur l'autre
+    interval = calibrate_interval(info, X[:300], y[:300], (0.1, 0.9))
+
+    assert interval["quantiles"] == [0.1, 0.9]
+    assert interval["scale"] > 0
+    assert interval_coverage(info, X[:300], y[:300], interval) >= 0.8
+    assert interval_coverage(info, X[300:], y[300:], interval) >= 0.7
+
+
+def test_tree_interval_width_varies_per_row(trained_model_info):
+    info = compile_model(dict(trained_model_info))
+    info["interval"] = {"quantiles": [0.05, 0.95], "scale": 1.0}
+    X, _ = held_out(trained_model_info)
+    X_raw = trained_model_info["scaler"].inverse_transform(X[:200])
+
+    predicted, lower, upper = predict_with_bounds(info, X_raw)
+
+    assert np.all((lower <= predicted) & (predicted <= upper))
+    assert np.ptp(upper - lower) > 0
+
+    # Même intervalle avec le modèle scikit-learn, sans moteur compilé
+    sklearn_info = dict(info, engine=None)
+    np.testing.assert_allclose(
+        predict_with_bounds(sklearn_info, X_raw), (predicted, lower, upper)
+    )
@@ -0,0 +1,42 @@
+HOUSE = {
+    "surface": 85.0,
+    "rooms": 4,
+    "age": 10.0,
+    "location_score": 7.5,
+    "garage": True,
+}
+
+
+def _parse(text):
+    samples = {}
+    for line in text.splitlines():
+        if line and not line.startswith("#"):
+            name, value = line.rsplit(" ", 1)
+            samples[name] = float(value)
+    return samples
+
+
+def test_metrics_expose_per_stage_latency(client):
+    assert client.post("/predict", json=HOUSE).status_code == 200
+    assert client.post("/predict/batch", json=[HOUSE] * 3).status_code == 200
+    client.post("/predict", json={**HOUSE, "rooms": 0})
+
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    text = response.text
+    samples = _parse(text)
+
+    for stage in (
+        "validation",
+        "feature_assembly",
+        "scaling",
+        "model_predict",
+        "serialization",
+    ):
+        name = f'housing_inference_stage_seconds_count{{stage="{stage}"}}'
+        assert samples.get(name, 0) >= 1, stage
+
+    assert samples["housing_inference_batch_size_count"] >= 1
+    errors = 'housing_request_errors_total{endpoint="/predict",status="422"}'
+    assert samples[errors] >= 1
+    assert 'housing_requests_in_flight{endpoint="/predict"}' in text
@@ -0,0 +1,104 @@
+import joblib
+import numpy as np
+import pytest
+
+import main
+from inference import predict_with_bounds
+from model_reload import artifact_fingerprint, validate_candidate
+
+HOUSE = {"surface": 85, "rooms": 4, "age": 10, "location_score": 7.5, "garage": True}
+
+
+def write_artifact(info, path, **overrides):
+    joblib.dump({**info, **overrides}, path)
+    return str(path)
+
+
+def test_validate_candidate_rejects_inconsistent_model(trained_model_info):
+    info = main.build_serving_engine(dict(trained_model_info))
+    assert len(validate_candidate(info, predict_with_bounds)) == 3
+
+    broken = dict(info, metrics={**info["metrics"], "rmse": -1.0})
+    with pytest.raises(ValueError):
+        validate_candidate(broken, predict_with_bounds)
+
+
+def test_artifact_fingerprint(trained_model_info, tmp_path):
+    assert artifact_fingerprint(str(tmp_path / "absent.joblib")) is None
+    path = write_artifact(trained_model_info, tmp_path / "model.joblib")
+    assert artifact_fingerprint(path)[0] == path
+
+
+def test_admin_reload_swaps_model(
+    client, trained_model_info, tmp_path, monkeypatch, admin_headers
+):
+    path = write_artifact(
+        trained_model_info, tmp_path / "model.joblib", model_version="2.0.0"
+    )
+    monkeypatch.setattr(main, "resolve_model_path", lambda: path)
+
+    response = client.post("/admin/model/reload", headers=admin_headers)
+    assert response.status_code == 200
+    assert response.json()["previous_version"] == "1.0.20240115100000"
+    assert response.json()["model_version"] == "2.0.0"
+
+    assert client.get("/model/info").json()["model_version"] == "2.0.0"
+    assert client.post("/predict", json=HOUSE).json()["model_version"] == "2.0.0"
+
+
+def test_reload_restarts_workers_before_swapping(
+    client, trained_model_info, tmp_path, monkeypatch, admin_headers
+):
+    path = write_artifact(
+        trained_model_info, tmp_path / "model.joblib", model_version="2.0.0"
+    )
+    monkeypatch.setattr(main, "resolve_model_path", lambda: path)
+    served_during_restart = []
+
+    async def restart():
+        served_during_restart.append(main.model_info["model_version"])
+
+    monkeypatch.setattr(main.executor, "restart", restart)
+
+    assert client.post("/admin/model/reload", headers=admin_headers).status_code == 200
+    assert served_during_restart == ["1.0.20240115100000"]
+    assert main.model_info["model_version"] == "2.0.0"
+
+
+def test_admin_reload_keeps_previous_model_on_failure(
+    client, trained_model_info, tmp_path, monkeypatch, admin_headers
+):
+    path = write_artifact(
+        trained_model_info,
+        tmp_path / "model.joblib",
+        model_version="2.0.0",
+        metrics={**trained_model_info["metrics"], "rmse": float("nan")},
+    )
+    monkeypatch.setattr(main, "resolve_model_path", lambda: path)
+
+    response = client.post("/admin/model/reload", headers=admin_headers)
+    assert response.status_code == 500
+    assert client.get("/admin/model/reload").json()["status"] == "rejected"
+
+    prediction = client.post("/predict", json=HOUSE).json()
+    assert prediction["model_version"] == "1.0.20240115100000"
+    assert np.isfinite(prediction["confidence_interval"]["upper"])
+
+
+@pytest.mark.parametrize(
+    "path",
+    [
+        "/admin/model/reload",
+        "/admin/model/routing?candidate_share=1",
+        "/model/drift/reset",
+    ],
+)
+def test_admin_endpoints_require_token(client, monkeypatch, path):
+    # Sans ADMIN_TOKEN, l'administration est désactivée
+    monkeypatch.setattr(main, "ADMIN_TOKEN", None)
+    assert client.post(path).status_code == 404
+
+    monkeypatch.setattr(main, "ADMIN_TOKEN", "secret")
+    assert client.post(path).status_code == 403
+    assert client.post(path, headers={"X-Admin-Token": "secre"}).status_code == 403
+    assert main.variants.candidate_share == 0
@@ -0,0 +1,39 @@
+import joblib
+import numpy as np
+import pandas as pd
+
+from inference import predict_with_bounds
+from score import score_file
+
+
+def test_score_file_keeps_row_order(trained_model_info, tmp_path):
+    model_path = tmp_path / "model.joblib"
+    joblib.dump(trained_model_info, model_path)
+
+    rng = np.random.default_rng(3)
+    df = pd.DataFrame(
+        {
+            "surface": rng.uniform(20, 500, 250),
+            "rooms": rng.integers(1, 16, 250),
+            "age": rng.uniform(0, 100, 250),
+            "location_score": rng.uniform(1, 10, 250),
+            "garage": rng.integers(0, 2, 250),
+        }
+    )
+    input_path = tmp_path / "input.csv"
+    output_path = tmp_path / "output.csv"
+    df.to_csv(input_path, index=False)
+
+    report = score_file(
+        str(input_path), str(output_path), str(model_path), chunk_size=40, workers=2
+    )
+
+    assert report["rows"] == 250
+    assert report["rows_per_second"] > 0
+    scored = pd.read_csv(output_path)
+    expected, lower, upper = predict_with_bounds(
+        trained_model_info, df.to_numpy(dtype=np.float64)
+    )
+    np.testing.assert_allclose(scored["predicted_price"], expected)
+    np.testing.assert_allclose(scored["upper"], upper)
+    np.testing.assert_allclose(scored["surface"], df["surface"])
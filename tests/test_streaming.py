@@ -0,0 +1,195 @@
+import asyncio
+import json
+
+import numpy as np
+import pytest
+
+from streaming import LineTooLong, iter_line_chunks
+
+CSV_BODY = (
+    "surface,rooms,age,location_score,garage,price\n"
+    "85.0,4,10.0,7.5,1,300000\n"
+    "120.0,5,5.0,9.0,1,450000\n"
+    "600.0,4,10.0,7.5,1,300000\n"
+    "abc,4,10.0,7.5,1,300000\n"
+    "45.0,2,60.0,3.0,0,120000\n"
+)
+
+
+def test_stream_csv_scores_valid_rows_in_order(client, monkeypatch):
+    import main
+
+    monkeypatch.setattr(main, "STREAM_CHUNK_SIZE", 2)
+    response = client.post(
+        "/predict/stream", content=CSV_BODY, headers={"Content-Type": "text/csv"}
+    )
+    assert response.status_code == 200
+
+    lines = response.text.strip().split("\n")
+    assert lines[0] == "row,predicted_price,lower,upper,error"
+    rows = [line.split(",") for line in lines[1:]]
+    assert [int(r[0]) for r in rows] == [0, 1, 2, 3, 4]
+    assert rows[2][1] == "" and "surface" in lines[3]
+    assert rows[3][1] == "" and "surface='abc'" in lines[4]
+
+    batch = client.post(
+        "/predict/batch",
+        json=[
+            {
+                "surface": 85.0,
+                "rooms": 4,
+                "age": 10.0,
+                "location_score": 7.5,
+                "garage": True,
+            },
+            {
+                "surface": 45.0,
+                "rooms": 2,
+                "age": 60.0,
+                "location_score": 3.0,
+                "garage": False,
+            },
+        ],
+    ).json()["predictions"]
+    assert np.isclose(float(rows[0][1]), batch[0]["predicted_price"])
+    assert np.isclose(float(rows[4][1]), batch[1]["predicted_price"])
+
+
+def test_stream_ndjson(client):
+    records = [
+        {
+            "surface": 85.0,
+            "rooms": 4,
+            "age": 10.0,
+            "location_score": 7.5,
+            "garage": True,
+        },
+        {
+            "surface": 85.0,
+            "rooms": 0,
+            "age": 10.0,
+            "location_score": 7.5,
+            "garage": True,
+        },
+    ]
+    body = "\n".join(json.dumps(r) for r in records) + "\n"
+    response = client.post(
+        "/predict/stream",
+        content=body,
+        headers={"Content-Type": "application/x-ndjson"},
+    )
+    assert response.status_code == 200
+
+    results = [json.loads(line) for line in response.text.strip().split("\n")]
+    assert results[0]["row"] == 0 and results[0]["predicted_price"] > 0
+    assert results[1]["row"] == 1 and "rooms" in results[1]["error"]
+
+
+def test_stream_rejects_unknown_content_type(client):
+    response = client.post(
+        "/predict/stream", content="x", headers={"Content-Type": "text/plain"}
+    )
+    assert response.status_code == 415
+
+
+def test_stream_rejects_csv_without_feature_columns(client):
+    response = client.post(
+        "/predict/stream", content="a,b\n1,2\n", headers={"Content-Type": "text/csv"}
+    )
+    assert response.status_code == 400
+
+
+def test_stream_rejects_overlong_line(client, monkeypatch):
+    import main
+
+    monkeypatch.setattr(main, "STREAM_CHUNK_SIZE", 2)
+    header = CSV_BODY.split("\n")[0] + "\n"
+    response = client.post(
+        "/predict/stream",
+        content=header + "1" * 100_000,
+        headers={"Content-Type": "text/csv"},
+    )
+    assert response.status_code == 413
+
+
+def test_line_chunks_cap_partial_line():
+    async def body():
+        yield CSV_BODY.encode()
+        yield b"1" * 1000
+        yield b"1" * 1000
+
+    async def scenario():
+        chunks = []
+        with pytest.raises(LineTooLong):
+            async for lines in iter_line_chunks(body(), 2, max_line_bytes=1500):
+                chunks.append(lines)
+        return chunks
+
+    # Les paquets complets sont rendus avant l'erreur
+    assert [len(lines) for lines in asyncio.run(scenario())] == [2, 2, 2]
+
+
+def test_stream_chunks_go_through_admission(client, monkeypatch):
+    from contextlib import asynccontextmanager
+
+    import main
+    from admission import AdmissionRejected
+
+    monkeypatch.setattr(main, "STREAM_CHUNK_SIZE", 2)
+    admitted_rows = []
+
+    @asynccontextmanager
+    async def admitted(request, rows):
+        if admitted_rows:
+            raise AdmissionRejected("queue_timeout", 1)
+        admitted_rows.append(rows)
+        yield
+
+    monkeypatch.setattr(main, "admitted", admitted)
+    response = client.post(
+        "/predict/stream", content=CSV_BODY, headers={"Content-Type": "text/csv"}
+    )
+    lines = response.text.strip().split("\n")
+    # Premier paquet : l'en-tête et une ligne ; le suivant est rejeté
+    assert admitted_rows == [1]
+    assert len(lines) == 3
+    assert lines[-1].startswith("1,,,,") and "queue_timeout" in lines[-1]
+
+
+@pytest.mark.parametrize(
+    "content_type, body",
+    [
+        (
+            "application/x-ndjson",
+            '{"surface": 85, "rooms": 4, "age": 10, "location_score": 7.5, '
+            '"garage": "yes"}\n'
+            '{"surface": 85, "rooms": 4, "age": 10, "location_score": 7.5, '
+            '"garage": "peut-être"}\n',
+        ),
+        (
+            "text/csv",
+            "surface,rooms,age,location_score,garage\n"
+            "85,4,10,7.5,yes\n85,4,10,7.5,peut-être\n",
+        ),
+    ],
+)
+def test_stream_coerces_booleans_like_batch(client, content_type, body):
+    house = {"surface": 85, "rooms": 4, "age": 10, "location_score": 7.5}
+    partial = client.post(
+        "/predict/batch?validation=partial",
+        json=[{**house, "garage": "yes"}, {**house, "garage": "peut-être"}],
+    ).json()
+
+    response = client.post(
+        "/predict/stream", content=body, headers={"Content-Type": content_type}
+    )
+    assert response.status_code == 200
+    if content_type == "text/csv":
+        rows = [line.split(",") for line in response.text.strip().split("\n")[1:]]
+        predicted, error = float(rows[0][1]), response.text.strip().split("\n")[2]
+    else:
+        results = [json.loads(line) for line in response.text.strip().split("\n")]
+        predicted, error = results[0]["predicted_price"], results[1]["error"]
+
+    assert np.isclose(predicted, partial["predictions"][0]["predicted_price"])
+    assert partial["errors"][0]["msg"] in error
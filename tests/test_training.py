@@ -0,0 +1,66 @@
+import numpy as np
+from sklearn.model_selection import train_test_split
+
+from train_model import (
+    COMPACT_DTYPES,
+    FEATURES,
+    iter_synthetic_chunks,
+    generate_synthetic_data,
+    load_dataset,
+    split_dataset,
+    split_in_place,
+    write_dataset,
+)
+
+
+def test_chunked_generation_uses_compact_dtypes():
+    chunks = list(iter_synthetic_chunks(2500, chunk_size=1000))
+
+    assert [len(chunk) for chunk in chunks] == [1000, 1000, 500]
+    assert dict(chunks[0].dtypes) == {k: np.dtype(v) for k, v in COMPACT_DTYPES.items()}
+    # Même graine, mêmes données
+    again = next(iter_synthetic_chunks(2500, chunk_size=1000))
+    assert chunks[0].equals(again)
+
+
+def test_parquet_dataset_round_trip(tmp_path):
+    path = str(tmp_path / "housing.parquet")
+    write_dataset(path, 2500, chunk_size=1000)
+
+    X, y = load_dataset(path, chunk_size=700)
+
+    expected = next(iter_synthetic_chunks(2500, chunk_size=1000))
+    assert X.shape == (2500, len(FEATURES)) and X.dtype == np.float32
+    np.testing.assert_array_equal(X[:1000], expected[FEATURES].to_numpy(np.float32))
+    np.testing.assert_array_equal(y[:1000], expected["price"].to_numpy())
+
+
+def test_split_in_place_returns_views():
+    X = np.arange(30, dtype=np.float32).reshape(10, 3)
+    y = X[:, 0].copy()
+
+    X_train, X_test, y_train, y_test = split_in_place(X, y, test_size=0.3)
+
+    assert len(X_test) == 3 and len(X_train) == 7
+    assert np.shares_memory(X_train, X) and np.shares_memory(y_test, y)
+    np.testing.assert_array_equal(X[:, 0], y)
+    assert sorted(y.tolist()) == list(range(0, 30, 3))
+
+
+def test_csv_dataset_defaults_to_float64_train_test_split(tmp_path):
+    path = str(tmp_path / "housing.csv")
+    write_dataset(path, 500)
+
+    X, y = load_dataset(path)
+    X_train, X_test, y_train, y_test = split_dataset(X, y, compact=False)
+
+    df = generate_synthetic_data(500)
+    expected = train_test_split(
+        df[FEATURES].to_numpy(), df["price"].to_numpy(), test_size=0.2, random_state=42
+    )
+    assert X.dtype == np.float64 and y.dtype == np.float64
+    for actual, wanted in zip((X_train, X_test, y_train, y_test), expected):
+        np.testing.assert_allclose(actual, wanted)
+
+    X_compact, _ = load_dataset(path, chunk_size=200, compact=True)
+    assert X_compact.dtype == np.float32 and len(X_compact) == 500
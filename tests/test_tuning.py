@@ -0,0 +1,87 @@
+import numpy as np
+import pytest
+
+from tuning import (
+    candidate_grid,
+    pareto_front,
+    search_hyperparameters,
+    select_candidate,
+)
+
+
+def candidate(rmse, p99, size, batch_p99=1.0):
+    return {
+        "params": {},
+        "cv_rmse": rmse,
+        "single_p99_ms": p99,
+        "batch_p99_ms": batch_p99,
+        "artifact_mb": size,
+    }
+
+
+def test_candidate_grid():
+    space = {"n_estimators": [10, 20, 40], "max_depth": [4, 8]}
+    assert len(candidate_grid(space)) == 6
+    sampled = candidate_grid(space, n_iter=3)
+    assert len(sampled) == 3
+    assert all(params in candidate_grid(space) for params in sampled)
+
+
+def test_pareto_front_and_budgeted_selection():
+    accurate_slow = candidate(100, 2.0, 10)
+    balanced = candidate(110, 0.5, 5)
+    dominated = candidate(120, 0.6, 6)
+    fast = candidate(150, 0.1, 1)
+    candidates = [accurate_slow, balanced, dominated, fast]
+
+    assert pareto_front(candidates) == [accurate_slow, balanced, fast]
+    assert select_candidate(candidates, max_p99_ms=5) is accurate_slow
+    assert select_candidate(candidates, max_p99_ms=1) is balanced
+    assert select_candidate(candidates, max_p99_ms=1, max_artifact_mb=2) is fast
+    with pytest.raises(ValueError):
+        select_candidate(candidates, max_p99_ms=0.01)
+
+
+def test_search_hyperparameters():
+    rng = np.random.default_rng(0)
+    X = rng.uniform(0, 1, (300, 5)).astype(np.float32)
+    y = (X[:, 0] * 1000 + rng.normal(0, 10, 300)).astype(np.float32)
+    space = {"n_estimators": [5, 10], "max_depth": [2, 6]}
+
+    best, candidates, front = search_hyperparameters(
+        X, y, max_p99_ms=1000, space=space, cv_folds=2, workers=1
+    )
+
+    assert len(candidates) == 4
+    assert best["cv_rmse"] == min(c["cv_rmse"] for c in candidates)
+    assert best in front
+    assert {"single_p99_ms", "batch_p99_ms", "artifact_mb"} <= set(best)
+
+
+def test_search_latency_measures_serving_path(monkeypatch):
+    import tuning
+
+    served = []
+    serve = tuning.predict_with_bounds
+
+    def predict_with_bounds(info, rows):
+        served.append((info.get("engine") is not None, info.get("interval")))
+        return serve(info, rows)
+
+    monkeypatch.setattr(tuning, "predict_with_bounds", predict_with_bounds)
+    rng = np.random.default_rng(0)
+    X = rng.uniform(0, 1, (200, 5))
+    y = X[:, 0] * 1000
+
+    search_hyperparameters(
+        X,
+        y,
+        max_p99_ms=1000,
+        space={"n_estimators": [5], "max_depth": [4]},
+        cv_folds=2,
+        workers=1,
+        interval_quantiles=(0.05, 0.95),
+    )
+
+    assert served and all(compiled for compiled, _ in served)
+    assert {tuple(interval["quantiles"]) for _, interval in served} == {(0.05, 0.95)}
@@ -0,0 +1,145 @@
+import asyncio
+import time
+
+import numpy as np
+import pytest
+
+import main
+from variants import ModelVariants, PredictionDiff, ShadowMirror, parse_variants
+
+HOUSE = {"surface": 85, "rooms": 4, "age": 10, "location_score": 7.5, "garage": True}
+
+
+def _predictions(predicted):
+    predicted = np.asarray(predicted, dtype=float)
+    return predicted, predicted - 10, predicted + 10
+
+
+def test_parse_variants():
+    assert parse_variants("") == {}
+    assert parse_variants("small=a.joblib, next = b.joblib") == {
+        "small": "a.joblib",
+        "next": "b.joblib",
+    }
+    with pytest.raises(ValueError):
+        parse_variants("small")
+    with pytest.raises(ValueError):
+        parse_variants("primary=a.joblib")
+
+
+def test_prediction_diff():
+    diff = PredictionDiff()
+    diff.update(_predictions([100, 200]), _predictions([105, 180]))
+    stats = diff.stats()
+    assert stats["rows"] == 2
+    assert stats["mean_diff"] == pytest.approx(-7.5)
+    assert stats["mean_abs_diff"] == pytest.approx(12.5)
+    assert stats["max_abs_diff"] == 20
+    assert stats["within_primary_interval"] == 0.5
+
+
+def test_shadow_mirror_batches_and_bounds_rows():
+    calls = []
+
+    def shadow(matrix):
+        calls.append(len(matrix))
+        return _predictions(matrix[:, 0] + 1)
+
+    mirror = ShadowMirror(shadow, capacity=5, max_batch_rows=3)
+    for value in range(4):
+        mirror.record(np.full((1, 5), value), _predictions([value]))
+    mirror.record(np.zeros((2, 5)), _predictions([0, 0]))
+    assert mirror.pending_rows == 4 and mirror.dropped == 2
+
+    asyncio.run(mirror.process())
+    assert calls == [3, 1]
+    assert mirror.mirrored == 4 and mirror.pending_rows == 0
+    assert mirror.diff.stats()["mean_diff"] == pytest.approx(1)
+    assert mirror.model.stats()["calls"] == 2
+
+
+def test_shadow_mirror_sheds_when_busy():
+    mirror = ShadowMirror(lambda m: pytest.fail("shadow exécuté"), busy=lambda: True)
+    mirror.record(np.zeros((3, 5)), _predictions([0, 0, 0]))
+    asyncio.run(mirror.process())
+    assert mirror.shed == 3 and mirror.mirrored == 0
+
+
+def _variants(trained_model_info, **kwargs):
+    candidate = main.build_serving_engine(
+        {**trained_model_info, "model_version": "2.0.0-candidate"}
+    )
+    registry = ModelVariants(**kwargs)
+    registry.add("candidate", candidate)
+    return registry
+
+
+def test_candidate_receives_its_traffic_share(
+    client, trained_model_info, monkeypatch, admin_headers
+):
+    registry = _variants(trained_model_info, candidate="candidate", candidate_share=1)
+    monkeypatch.setattr(main, "variants", registry)
+
+    assert client.post("/predict", json=HOUSE).json()["model_version"] == (
+        "2.0.0-candidate"
+    )
+    batch = client.post("/predict/batch", json=[HOUSE, HOUSE]).json()
+    assert {p["model_version"] for p in batch["predictions"]} == {"2.0.0-candidate"}
+
+    assert (
+        client.post(
+            "/admin/model/routing?candidate_share=0", headers=admin_headers
+        ).status_code
+        == 200
+    )
+    response = client.post("/predict", json=HOUSE).json()
+    assert response["model_version"] == "1.0.20240115100000"
+
+    stats = client.get("/predict/variants/stats").json()
+    assert stats["enabled"] is True
+    assert stats["models"]["candidate"]["calls"] >= 1
+    assert stats["models"]["primary"]["model_version"] == "1.0.20240115100000"
+
+
+def test_shadow_compares_with_primary(client, trained_model_info, monkeypatch):
+    registry = _variants(trained_model_info, shadow="candidate")
+    monkeypatch.setattr(main, "variants", registry)
+
+    houses = [dict(HOUSE, surface=surface) for surface in (50, 85, 120)]
+    response = client.post("/predict/batch", json=houses).json()
+    assert {p["model_version"] for p in response["predictions"]} == {
+        "1.0.20240115100000"
+    }
+    # Le shadow n'a rien calculé sur le chemin de la requête
+    assert registry.shadow_mirror.pending_rows == 3
+
+    asyncio.run(registry.shadow_mirror.process())
+    shadow = client.get("/predict/variants/stats").json()["shadow_mirror"]
+    assert shadow["model_version"] == "2.0.0-candidate"
+    assert shadow["mirrored"] == 3
+    # Même forêt : prédictions identiques
+    assert shadow["diff"]["max_abs_diff"] == pytest.approx(0)
+    assert shadow["diff"]["within_primary_interval"] == 1
+    # Lots du shadow : pas de latence par appel, comparable aux requêtes
+    assert shadow["latency"]["rows"] == 3
+    assert "latency_ms_per_row" in shadow["latency"]
+    assert "p99_latency_ms" not in shadow["latency"]
+
+
+def test_primary_latency_is_the_model_call(client, trained_model_info, monkeypatch):
+    registry = _variants(trained_model_info)
+    monkeypatch.setattr(main, "variants", registry)
+    predict_matrix_timed = main._predict_matrix_timed
+
+    def slow_dispatch(feature_matrix):
+        # Attente hors modèle (file, exécuteur) : exclue de la mesure
+        time.sleep(0.05)
+        result, _ = predict_matrix_timed(feature_matrix)
+        return result, {"scaling": 0.001, "model_predict": 0.002}
+
+    monkeypatch.setattr(main, "_predict_matrix_timed", slow_dispatch)
+    client.post("/predict/batch", json=[HOUSE, HOUSE])
+
+    primary = client.get("/predict/variants/stats").json()["models"]["primary"]
+    assert primary["calls"] == 1 and primary["mean_rows_per_call"] == 2
+    assert primary["mean_latency_ms"] == pytest.approx(3.0)